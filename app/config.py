@@ -26,6 +26,7 @@ DEFAULT_CONFIG = {
         "temp": "photos/temp",
         "processed": "photos/processed",
         "output": "photos/output",
+        "thumbnails": "photos/thumbnails",
         "models": "models",
         "data": "data",
         "logs": "data/logs"
@@ -36,7 +37,30 @@ DEFAULT_CONFIG = {
         "device_id": 0,
         "width": 1280,
         "height": 720,
-        "flip_horizontal": True
+        "flip_horizontal": True,
+        "source": "device",    # device (USB-Kamera), video (Datei) oder images (Bildfolge)
+        "source_path": "",     # video/images: Datei, Ordner oder Glob-Muster
+        "source_fps": 30,      # video/images: Abspielrate (0 = so schnell wie möglich)
+        "source_loop": True,   # video/images: am Ende von vorne beginnen
+        "buffer_frames": 10,   # Letzte Frames im Speicher (Live-Stream / Sofortaufnahme)
+        "idle_timeout": 5,     # Sekunden ohne Zuschauer, bis die Kamera geschlossen wird
+        "capture_mode": "sharpest",  # Sofortaufnahme: latest oder sharpest (schärfster der letzten N)
+        "sharpest_of": 5,
+        "capture_quality": 90,       # JPEG-Qualität von Aufnahmen
+        "preview_width": 640,        # Live-Stream: maximale Breite
+        "preview_quality": 70,       # Live-Stream: JPEG-Qualität
+        "preview_max_fps": 15,       # Live-Stream: höchstens so viele Frames kodieren
+        "preview_levels": 4,         # Live-Stream: Qualitätsstufen für langsame Clients (1 = aus)
+        "face_detection": {
+            "enabled": True,
+            "every_n": 5,              # Nur jeden N-ten Frame prüfen
+            "width": 320,              # Erkennung auf verkleinerter Kopie
+            "auto_capture": True,      # Automatisch aufnehmen bei ruhigem Einzelgesicht
+            "min_face_width": 0.2,     # Mindestbreite des Gesichts (Anteil der Bildbreite)
+            "stable_detections": 3,    # So viele Erkennungen in Folge ruhig
+            "tolerance": 0.05,         # Erlaubte Bewegung zwischen zwei Erkennungen
+            "cooldown": 5              # Sekunden bis zur nächsten Auto-Aufnahme
+        }
     },
     
     # Verarbeitung
@@ -47,6 +71,15 @@ DEFAULT_CONFIG = {
         "watch_interval": 2
     },
     
+    # Thumbnails (vorberechnete Größenstufen, längste Kante in Pixel)
+    "thumbnails": {
+        "enabled": True,
+        "sizes": [200, 480, 1080],
+        "quality": 80,
+        "variant_tolerance": 1.5,
+        "cache_max_mb": 200
+    },
+    
     # Face Recognition
     "face": {
         "model": "hog",
@@ -91,9 +124,28 @@ DEFAULT_CONFIG = {
         "max_results": 20
     },
     
+    # Datenbank
+    "database": {
+        "save_delay_ms": 250,  # Änderungen innerhalb dieses Fensters werden gebündelt gespeichert
+        "format": "orjson",    # Bilddatenbank: json (lesbar), orjson (schnell), msgpack (binär)
+        "storage": "single",   # single (eine Datei) oder partitioned (eine Datei pro Aufnahmetag)
+        "eager_days": 2,       # partitioned: beim Start geladene Tage (heute, gestern)
+        "max_resident_images": 50000,  # partitioned: ältere Tage darüber hinaus wieder entladen
+        "multi_process": "auto",  # Gemeinsames Journal für mehrere Worker (auto: PHOTO_WORKERS > 1)
+        "journal_poll_ms": 200,   # Multi-Prozess: Intervall für Änderungen anderer Worker
+        "journal_max_kb": 8192    # Multi-Prozess: Journal darüber in die Dateien verdichten
+    },
+    
     # Drucker
     "printers": {
         "enabled": True,
+        "page_cache_mb": 300,  # Fertig gerenderte Druckseiten (Kopien, Nachdrucke)
+        "backend": "auto",     # gdi (Windows-Drucker), spool (Dateien) oder auto (gdi unter Windows)
+        "spool": {
+            "directory": "photos/print_spool",  # Ein Unterordner pro Drucker
+            "format": "png",                    # png (eine Datei pro Kopie) oder pdf
+            "dpi": 300
+        },
         "small": {
             "name": "\\\\DESKTOP-GNK1K6H\\Hanspeter",
             "price": 5.00,
@@ -197,7 +249,7 @@ class Config:
     
     def ensure_directories(self) -> None:
         """Erstellt alle benötigten Ordner"""
-        for key in ["input", "temp", "processed", "output", "models", "data", "logs"]:
+        for key in ["input", "temp", "processed", "output", "thumbnails", "models", "data", "logs"]:
             path = self.get_path(key)
             path.mkdir(parents=True, exist_ok=True)
     
@@ -2,15 +2,71 @@
 JSON Datenbank für Bildanalyse-Daten
 """
 
+import atexit
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from datetime import datetime, timedelta
 import threading
 import hashlib
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 
 from .config import Config
+from .image_index import EPOCH, ImageIndex, encode_cursor, decode_cursor, day_of
+from .statistics import ImageStatistics, PrintStatistics
+from .persistence import SnapshotWriter
+from .interprocess import FileLock, Journal
+from .partitions import PartitionStore
+from .records import ImageRecord, compact, compact_all
+from .serializers import get_serializer, load_file, dump_file, find_data_file
+
+
+# Feldprojektionen für Abfragen (get_image / get_all_images)
+SUMMARY_FIELDS = (
+    "id", "filename", "timestamp", "output_path",
+    "face_count", "person_count", "width", "height"
+)
+
+DETAIL_FIELDS = (
+    "id", "filename", "original_path", "processed_path", "output_path",
+    "thumbnails", "timestamp", "faces", "face_count", "persons",
+    "person_count", "clothing_colors", "width", "height", "created_at"
+)
+
+# Anzahl gemerkter Änderungen für Delta-Abfragen (since=<version>)
+CHANGE_LOG_SIZE = 5000
+
+
+def is_multi_process(config: Config) -> bool:
+    """
+    Laufen mehrere Worker-Prozesse auf denselben Daten?
+    
+    database.multi_process: true/false oder "auto" (PHOTO_WORKERS > 1,
+    wird von run.py für uvicorn gesetzt)
+    """
+    setting = config.get("database.multi_process", "auto")
+    
+    if setting == "auto":
+        try:
+            return int(os.environ.get("PHOTO_WORKERS", "1")) > 1
+        except ValueError:
+            return False
+    
+    return bool(setting)
+
+
+def _close_at_exit(ref: "weakref.ref") -> Callable[[], None]:
+    """atexit-Handler, der eine noch lebende Database schließt"""
+    def close() -> None:
+        database = ref()
+        if database is not None:
+            database.close()
+    return close
 
 
 # ============================================================
@@ -22,17 +78,90 @@ class Database:
     
     def __init__(self, config: Config):
         self.config = config
-        self.db_path = config.root_dir / "data" / "images.json"
+        # Bilddatenbank: Format per Config (json, orjson, msgpack)
+        self.serializer = get_serializer(config.get("database.format", "orjson"))
+        self.db_path = config.root_dir / "data" / f"images{self.serializer.suffix}"
         self.settings_path = config.root_dir / "data" / "settings.json"
         self.print_jobs_path = config.root_dir / "data" / "print_jobs.json"
+        self.partitions_dir = config.root_dir / "data" / "images"
+        
+        # Ablage: eine Datei (single) oder eine Datei pro Aufnahmetag
+        # (partitioned, ältere Tage werden erst bei Bedarf geladen)
+        self.partitions: Optional[PartitionStore] = None
+        if config.get("database.storage", "single") == "partitioned":
+            self.partitions = PartitionStore(self.partitions_dir, self.serializer)
+        
+        self._eager_days = config.get("database.eager_days", 2)
+        self._max_resident = config.get("database.max_resident_images", 50000)
+        
+        # Partitionen: Tag -> IDs der geladenen Bilder, geladene Tage (LRU),
+        # ungespeicherte und gerade geschriebene Tage
+        self._day_ids: Dict[str, set] = {}
+        self._loaded_days: OrderedDict = OrderedDict()
+        self._dirty_days: set = set()
+        self._writing_days: set = set()
+        self._days_generation = 0
         
         # Daten
-        self.images: Dict[str, dict] = {}
+        # Kompakte Datensätze, dicts entstehen erst bei der Ausgabe
+        self.images: Dict[str, ImageRecord] = {}
         self.settings: Dict[str, dict] = {}
         self.print_jobs: List[dict] = []
         
+        # Sekundärindex für Galerie-Abfragen
+        self._index = ImageIndex()
+        
+        # Inkrementell gepflegte Statistiken
+        self._image_stats = ImageStatistics()
+        self._print_stats = PrintStatistics()
+        
         # Thread-Safety
         self._lock = threading.Lock()
+        
+        # Partitionen: Nachladen + Abfrage dürfen nicht durch Verdrängen
+        # unterbrochen werden (äußerer Lock, im single-Modus entfällt er)
+        self._scope_lock = threading.RLock() if self.partitions is not None else nullcontext()
+        
+        # Speichern im Hintergrund (Änderungen innerhalb des Fensters gebündelt)
+        self._writer = SnapshotWriter(config.get("database.save_delay_ms", 250) / 1000)
+        if self.partitions is None:
+            self._writer.register(
+                "images", self.db_path,
+                lambda: self._snapshot(dict, self.images),
+                lambda path, data: dump_file(path, data, self.serializer)
+            )
+        else:
+            self._writer.register("images", self.partitions.manifest_path, self._snapshot_days, self._write_days)
+        self._writer.register("settings", self.settings_path, lambda: self._snapshot(dict, self.settings))
+        self._writer.register("print_jobs", self.print_jobs_path, lambda: self._snapshot(list, self.print_jobs))
+        
+        # Mehrere Worker-Prozesse: Änderungen laufen über ein gemeinsames
+        # Journal, Dateien schreibt nur das Verdichten (unter Dateisperre)
+        self._journal: Optional[Journal] = None
+        if is_multi_process(config):
+            self._file_lock = FileLock(config.root_dir / "data" / "database.lock")
+            self._journal = Journal(config.root_dir / "data" / "database.journal")
+        
+        self._poll_interval = config.get("database.journal_poll_ms", 200) / 1000
+        self._journal_limit = config.get("database.journal_max_kb", 8192) * 1024
+        self._poller: Optional[threading.Thread] = None
+        self._stop_polling = threading.Event()
+        
+        # Benachrichtigung über Änderungen anderer Prozesse: callback(op, entry)
+        self._listeners: List[Callable[[str, dict], None]] = []
+        
+        # Ausstehende Änderungen auch bei Skripten ohne save() schreiben
+        # (schwache Referenz: hält die Instanz nicht bis Programmende am Leben)
+        self._close_at_exit = _close_at_exit(weakref.ref(self))
+        atexit.register(self._close_at_exit)
+        
+        # Änderungsversion (monoton steigend) + Änderungsprotokoll
+        # Start bei der aktuellen Zeit in ms, damit Versionen aus einem
+        # früheren Serverlauf immer älter sind als das neue Protokoll.
+        # Mehrere Prozesse: gemeinsame Version aus dem Journal (_reload)
+        self._version = int(time.time() * 1000)
+        self._changes_floor = self._version
+        self._changes: deque = deque(maxlen=CHANGE_LOG_SIZE)
     
     # ========================================================
     # LADEN / SPEICHERN
@@ -40,34 +169,151 @@ class Database:
     
     def load(self) -> None:
         """Lädt alle Datenbanken"""
+        if self._journal is not None:
+            # Dateien + Journal unter der Sperre lesen (erstes _catch_up lädt)
+            with self._file_lock:
+                self._catch_up()
+            self._start_polling()
+            return
+        
         self._load_images()
         self._load_settings()
         self._load_print_jobs()
     
     def save(self) -> None:
-        """Speichert alle Datenbanken"""
-        self._save_images()
-        self._save_settings()
-        self._save_print_jobs()
+        """Speichert alle Datenbanken sofort (blockierend)"""
+        if self._journal is not None:
+            self._compact()
+            return
+        
+        with self._lock:
+            self._save_images()
+            self._save_settings()
+            self._save_print_jobs()
+        
+        self._writer.flush()
+    
+    def close(self) -> None:
+        """Schreibt ausstehende Änderungen und beendet den Speicher-Thread"""
+        atexit.unregister(self._close_at_exit)
+        
+        self._stop_polling.set()
+        if self._poller is not None:
+            self._poller.join(timeout=5)
+            self._poller = None
+        
+        self._writer.close()
+    
+    def get_persistence_stats(self) -> dict:
+        """Statistiken des Speicher-Threads"""
+        stats = self._writer.get_stats()
+        
+        if self._journal is not None:
+            stats["journal_kb"] = round(self._journal.size() / 1024, 1)
+            stats["process"] = self._journal.process_id
+        
+        return stats
+    
+    def add_listener(self, callback: Callable[[str, dict], None]) -> None:
+        """
+        Meldet Änderungen anderer Worker-Prozesse (nur Multi-Prozess-Modus)
+        
+        callback(op, entry) mit op add, import, remove, clear, settings,
+        print_job, print_job_update, notify oder reload (komplett neu geladen).
+        """
+        self._listeners.append(callback)
+    
+    def notify(self, event: str, **data) -> None:
+        """Sendet eine Nachricht an die anderen Worker-Prozesse (op "notify")"""
+        if self._journal is None:
+            return
+        
+        with self._shared():
+            self._log("notify", event=event, **data)
     
     def _load_images(self) -> None:
-        """Lädt Bilddatenbank"""
-        if self.db_path.exists():
+        """Lädt Bilddatenbank (Format wird automatisch erkannt)"""
+        path = find_data_file(self.db_path.parent, "images", self.serializer)
+        
+        if self.partitions is not None:
+            self._load_partitions(path)
+            return
+        
+        store = PartitionStore(self.partitions_dir, self.serializer)
+        
+        if store.exists() and (path is None or store.manifest_path.stat().st_mtime_ns > path.stat().st_mtime_ns):
+            # Zurück von partitioned: alle Tage in eine Datei zusammenführen
+            print(f"🔄 Tagesdateien aus {store.directory.name}/ werden nach {self.db_path.name} zusammengeführt")
+            store.load_manifest()
+            for day in store.days:
+                self.images.update(compact_all(store.read_day(day)))
+            self._save_images()
+        
+        elif path is not None:
             try:
-                with open(self.db_path, 'r', encoding='utf-8-sig') as f:
-                    self.images = json.load(f)
+                self.images = compact_all(load_file(path))
             except Exception as e:
                 print(f"⚠️ Fehler beim Laden der Bilddatenbank: {e}")
                 self.images = {}
+            
+            if path != self.db_path:
+                # Formatwechsel: beim nächsten Speichern im neuen Format schreiben
+                print(f"🔄 Bilddatenbank wird von {path.name} nach {self.db_path.name} konvertiert")
+                self._save_images()
+        
+        self._index.rebuild(self.images)
+        self._image_stats.rebuild(self.images.values())
     
-    def _save_images(self) -> None:
-        """Speichert Bilddatenbank"""
+    def _load_partitions(self, single_path: Optional[Path]) -> None:
+        """Lädt die aktuellen Tage, ältere nur als Zähler aus dem Manifest"""
+        store = self.partitions
+        
+        if not store.exists():
+            # Umstieg von single: Datei einmalig in Tagesdateien aufteilen
+            if single_path is not None:
+                print(f"🔄 Bilddatenbank wird in Tagesdateien aufgeteilt ({single_path.name} → {store.directory.name}/)")
+                try:
+                    self.images = compact_all(load_file(single_path))
+                except Exception as e:
+                    print(f"⚠️ Fehler beim Laden der Bilddatenbank: {e}")
+                    self.images = {}
+            
+            self._index.rebuild(self.images)
+            self._image_stats.rebuild(self.images.values())
+            
+            for image_id, image in self.images.items():
+                self._track_add(image_id, image)
+            
+            if self.images:
+                self._save_images()
+            return
+        
         try:
-            self.db_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.images, f, indent=2, ensure_ascii=False)
+            store.load_manifest()
         except Exception as e:
-            print(f"❌ Fehler beim Speichern der Bilddatenbank: {e}")
+            print(f"⚠️ Fehler beim Laden des Manifests: {e}")
+            store.clear()
+        
+        for day in self._pinned_days():
+            if day in store.days:
+                images = compact_all(store.read_day(day))
+                self.images.update(images)
+                self._day_ids[day] = set(images)
+                self._loaded_days[day] = None
+        
+        self._index.rebuild(self.images)
+        self._image_stats.rebuild(self.images.values())
+        
+        # Nicht geladene Tage: Zähler aus dem Manifest
+        for day, info in store.days.items():
+            if day not in self._loaded_days:
+                self._image_stats.seed_day(day, info)
+        
+        print(f"📅 {len(self._loaded_days)} von {len(store.days)} Tagen geladen ({len(self.images)} Bilder)")
+    
+    def _save_images(self) -> int:
+        """Plant Speichern der Bilddatenbank (Lock gehalten, gibt Ticket zurück)"""
+        return self._schedule("images")
     
     def _load_settings(self) -> None:
         """Lädt Einstellungen"""
@@ -79,14 +325,9 @@ class Database:
                 print(f"⚠️ Fehler beim Laden der Settings: {e}")
                 self.settings = {}
     
-    def _save_settings(self) -> None:
-        """Speichert Einstellungen"""
-        try:
-            self.settings_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.settings_path, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"❌ Fehler beim Speichern der Settings: {e}")
+    def _save_settings(self) -> int:
+        """Plant Speichern der Einstellungen (Lock gehalten, gibt Ticket zurück)"""
+        return self._schedule("settings")
     
     def _load_print_jobs(self) -> None:
         """Lädt Druckaufträge"""
@@ -97,106 +338,925 @@ class Database:
             except Exception as e:
                 print(f"⚠️ Fehler beim Laden der Druckaufträge: {e}")
                 self.print_jobs = []
+        
+        self._print_stats.rebuild(self.print_jobs)
+    
+    def _save_print_jobs(self) -> int:
+        """Plant Speichern der Druckaufträge (Lock gehalten, gibt Ticket zurück)"""
+        return self._schedule("print_jobs")
+    
+    def _schedule(self, name: str) -> int:
+        """Markiert eine Datei für den Speicher-Thread"""
+        if self._journal is not None:
+            # Multi-Prozess: Änderung steht bereits (fsync) im Journal, die
+            # Dateien schreibt nur _compact() - Ticket 0 ist sofort erfüllt
+            return 0
+        
+        return self._writer.mark(name)
+    
+    def _snapshot(self, copy, data):
+        """Flache Kopie für den Speicher-Thread (Datensätze werden nicht verändert, nur ersetzt)"""
+        with self._lock:
+            return copy(data)
+    
+    def _snapshot_days(self) -> tuple:
+        """Geänderte Tage für den Speicher-Thread (partitioned)"""
+        with self._lock:
+            dirty, self._dirty_days = self._dirty_days, set()
+            self._writing_days |= dirty
+            
+            days = {
+                day: {i: self.images[i] for i in self._day_ids.get(day, ())}
+                for day in dirty
+            }
+            return self._days_generation, days
     
-    def _save_print_jobs(self) -> None:
-        """Speichert Druckaufträge"""
+    def _write_days(self, path: Path, snapshot: tuple) -> None:
+        """Schreibt geänderte Tagesdateien, danach das Manifest"""
+        generation, days = snapshot
+        
         try:
-            self.print_jobs_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.print_jobs_path, 'w', encoding='utf-8') as f:
-                json.dump(self.print_jobs, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"❌ Fehler beim Speichern der Druckaufträge: {e}")
+            results = {day: self.partitions.write_day(day, images) for day, images in days.items()}
+        except Exception:
+            with self._lock:
+                self._writing_days -= set(days)
+                self._dirty_days |= set(days)
+            raise
+        
+        with self._lock:
+            self._writing_days -= set(days)
+            
+            # Nach clear_images() gelten ältere Ergebnisse nicht mehr
+            if generation == self._days_generation:
+                for day, info in results.items():
+                    self.partitions.set_day(day, info)
+            
+            self.partitions.save_manifest()
     
     # ========================================================
-    # BILDER
+    # PARTITIONEN (Nachladen / Verdrängen)
     # ========================================================
     
-    def add_image(self, image_data: dict) -> str:
-        """Fügt ein analysiertes Bild hinzu"""
+    def _pinned_days(self) -> set:
+        """Aktuelle Tage (heute, gestern, ...), die immer geladen bleiben"""
+        today = datetime.now().date()
+        return {(today - timedelta(days=n)).isoformat() for n in range(self._eager_days)}
+    
+    def _track_add(self, image_id: str, image: dict) -> None:
+        """Ordnet ein neues Bild seinem Tag zu (Lock gehalten)"""
+        if self.partitions is None:
+            return
+        
+        day = day_of(image.get("timestamp", ""))
+        self._day_ids.setdefault(day, set()).add(image_id)
+        self._loaded_days[day] = None
+        self._loaded_days.move_to_end(day)
+        self._dirty_days.add(day)
+    
+    def _track_remove(self, image_id: str, image: dict) -> None:
+        """Entfernt ein Bild aus seinem Tag (Lock gehalten)"""
+        if self.partitions is None:
+            return
+        
+        day = day_of(image.get("timestamp", ""))
+        self._day_ids.get(day, set()).discard(image_id)
+        self._dirty_days.add(day)
+    
+    def _ensure_days(self, days: Iterable[str]) -> None:
+        """
+        Lädt fehlende Tage nach (Scope-Lock gehalten)
+        
+        Die Dateien werden ohne Daten-Lock gelesen, danach wird in einem
+        Schritt in Index und Datensätze übernommen. Zuletzt werden die am
+        längsten ungenutzten Tage über dem Budget wieder entladen.
+        """
+        if self.partitions is None:
+            return
+        
+        days = set(days)
+        
         with self._lock:
-            image_id = self._generate_id(image_data.get("filename", ""))
-            
-            self.images[image_id] = {
-                "id": image_id,
-                "filename": image_data.get("filename", ""),
-                "original_path": image_data.get("original_path", ""),
-                "processed_path": image_data.get("processed_path", ""),
-                "output_path": image_data.get("output_path", ""),
-                "timestamp": image_data.get("timestamp", datetime.now().isoformat()),
+            missing = [d for d in days if d in self.partitions.days and d not in self._loaded_days]
+            for day in days:
+                if day in self._loaded_days:
+                    self._loaded_days.move_to_end(day)
+        
+        if missing:
+            loaded = {day: compact_all(self.partitions.read_day(day)) for day in missing}
+            
+            with self._lock:
+                for day, images in loaded.items():
+                    self.images.update(images)
+                    self._index.add_many(images)
+                    self._day_ids[day] = set(images)
+                    self._loaded_days[day] = None
+        
+        self._evict(keep=days)
+    
+    def _evict(self, keep: set) -> None:
+        """
+        Entlädt alte, unveränderte Tage, solange das Budget überschritten ist
+        
+        keep: Tage, die der Aufrufer gerade ändert oder abfragt. Abfragen,
+        deren Tage nicht ins Budget passen, laden nichts (_fits/_stream_query).
+        """
+        with self._lock:
+            if len(self.images) <= self._max_resident:
+                return
+            
+            pinned = keep | self._pinned_days() | self._dirty_days | self._writing_days
+            
+            for day in list(self._loaded_days):
+                if len(self.images) <= self._max_resident:
+                    break
+                # Nur Tage, die vollständig auf der Platte stehen
+                if day in pinned or day not in self.partitions.days:
+                    continue
                 
-                # Analyse-Daten
-                "faces": image_data.get("faces", []),
-                "face_count": image_data.get("face_count", 0),
-                "face_encodings": image_data.get("face_encodings", []),
+                ids = self._day_ids.pop(day, set())
+                del self._loaded_days[day]
+                self._index.remove_many(ids)
+                for image_id in ids:
+                    self.images.pop(image_id, None)
+    
+    def _scope_days(
+        self,
+        search: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        start_minute: int = None,
+        end_minute: int = None,
+        sort: str = "newest",
+        needed: int = None,
+        key: tuple = None
+    ) -> Iterable[str]:
+        """
+        Tage, die für eine Abfrage geladen sein müssen
+        
+        Mit Datumsfilter nur die Tage im Bereich, mit Suche/Uhrzeitfilter
+        oder Namenssortierung alle. Eine reine Zeitliste lädt Tage in
+        Sortierreihenfolge (ab dem Cursor), bis needed Bilder abgedeckt sind.
+        """
+        store = self.partitions
+        
+        with self._lock:
+            known = set(store.days) | set(self._loaded_days)
+            
+            if date_from or date_to:
+                first = day_of(date_from) if date_from else ""
+                last = day_of(date_to) if date_to else ""
+                return [
+                    d for d in known
+                    if d and (not first or d >= first) and (not last or d <= last)
+                ]
+            
+            if search or start_minute is not None or end_minute is not None or sort == "name" or needed is None:
+                return known
+            
+            newest_first = sort != "oldest"
+            start = None
+            if key is not None:
+                start = "" if key[0] == "u" else (EPOCH + timedelta(seconds=key[1])).date().isoformat()
+            
+            days = []
+            covered = 0
+            
+            for day in store.sorted_days(newest_first, extra=self._loaded_days):
+                if start is not None and self._before_cursor(day, start, newest_first):
+                    continue
                 
-                "persons": image_data.get("persons", []),
-                "person_count": image_data.get("person_count", 0),
+                days.append(day)
+                if day == start:
+                    # Tag des Cursors ist nur teilweise übrig
+                    continue
+                covered += len(self._day_ids.get(day, ())) if day in self._loaded_days else store.count(day)
                 
-                "clothing_colors": image_data.get("clothing_colors", []),
+                if covered >= needed:
+                    break
+            
+            return days
+    
+    def _before_cursor(self, day: str, start: str, newest_first: bool) -> bool:
+        """Liegt ein Tag in Sortierreihenfolge vor dem Tag des Cursors?"""
+        if newest_first:
+            # Ohne Timestamp ("") kommt zuletzt
+            return day != "" and (start == "" or day > start)
+        
+        # Ohne Timestamp kommt zuerst
+        return start != "" and (day == "" or day < start)
+    
+    def _fits(self, days: Iterable[str]) -> bool:
+        """
+        Passen die Tage einer Abfrage ins Budget (max_resident_images)?
+        
+        Nur fehlende Tage vergrößern den Speicher: sie müssen zusammen mit
+        den Tagen, die nicht verdrängt werden können, darunter bleiben.
+        """
+        store = self.partitions
+        
+        with self._lock:
+            days = set(days)
+            missing = [d for d in days if d in store.days and d not in self._loaded_days]
+            
+            if not missing:
+                return True
+            
+            kept = (days | self._pinned_days() | self._dirty_days | self._writing_days) & set(self._loaded_days)
+            resident = sum(len(self._day_ids.get(d, ())) for d in kept)
+            
+            return resident + sum(store.count(d) for d in missing) <= self._max_resident
+    
+    def _day_records(self, day: str) -> Dict[str, ImageRecord]:
+        """Bilder eines Tages - geladen aus dem Speicher, sonst nur gelesen (nicht behalten)"""
+        with self._lock:
+            if day in self._loaded_days:
+                return {i: self.images[i] for i in self._day_ids.get(day, ()) if i in self.images}
+        
+        return compact_all(self.partitions.read_day(day))
+    
+    def _ordered_days(self, days: Iterable[str], newest_first: bool) -> List[str]:
+        """Tage einer Abfrage in Sortierreihenfolge"""
+        days = set(days)
+        with self._lock:
+            return [d for d in self.partitions.sorted_days(newest_first, extra=self._loaded_days) if d in days]
+    
+    def _stream_query(
+        self,
+        days: Iterable[str],
+        key: tuple = None,
+        offset: int = 0,
+        limit: int = None,
+        fields: Iterable[str] = None,
+        **filters
+    ) -> dict:
+        """
+        query_images Tag für Tag, ohne die Tage zu laden (zu groß fürs Budget)
+        
+        Jeder Tag wird gelesen, über einen eigenen Index gefiltert und
+        wieder verworfen - nur die Treffer der Seite bleiben. Tage sind
+        disjunkte Zeitbereiche, die Reihenfolge der Tage ergibt also die
+        Zeitsortierung; bei Namenssortierung werden die Seiten gemischt.
+        """
+        sort = filters.get("sort", "newest")
+        wanted = offset + limit + 1 if limit else None
+        fields = tuple(fields) if fields is not None else None
+        
+        total = 0
+        page = []
+        
+        for day in self._ordered_days(days, sort != "oldest"):
+            records = self._day_records(day)
+            if not records:
+                continue
+            
+            index = ImageIndex()
+            index.rebuild(records)
+            count, ids = index.query(cursor=key, **filters)
+            total += count
+            
+            if wanted is not None and sort != "name":
+                ids = islice(ids, max(0, wanted - len(page)))
+            elif wanted is not None:
+                ids = islice(ids, wanted)
+            
+            for image_id in ids:
+                image = records[image_id]
+                page.append((index.cursor_key(image_id, sort), self._project(image, fields) if fields else image.to_dict()))
+            
+            if sort == "name" and wanted is not None:
+                page.sort(key=lambda item: item[0])
+                del page[wanted:]
+        
+        page = page[offset:]
+        next_cursor = None
+        
+        if limit and len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1][0])
+        
+        return {
+            "total": total,
+            "images": [image for _, image in page],
+            "next_cursor": next_cursor
+        }
+    
+    def _load_image_day(self, image_id: str) -> None:
+        """Lädt den Tag eines nicht geladenen Bildes (Tag aus dem Manifest)"""
+        # Ohne Daten-Lock: liest ggf. Tagesdateien älterer Manifeste
+        day = self.partitions.find_day(image_id)
+        
+        if day is not None:
+            self._ensure_days([day])
+    
+    # ========================================================
+    # MEHRERE PROZESSE (Journal)
+    # ========================================================
+    
+    @contextmanager
+    def _shared(self):
+        """
+        Äußerste Sperre für Änderungen im Multi-Prozess-Modus
+        
+        Hält die Dateisperre und holt vorher die Änderungen der anderen
+        Prozesse nach, damit IDs und Ersetzungen auf dem aktuellen Stand
+        beruhen. Reihenfolge: Dateisperre -> Scope-Lock -> Daten-Lock.
+        """
+        if self._journal is None:
+            yield
+            return
+        
+        with self._file_lock:
+            self._catch_up()
+            yield
+    
+    def _log(self, op: str, **data) -> None:
+        """Schreibt eine Änderung ins Journal (Dateisperre gehalten, nach _record_change)"""
+        if self._journal is not None:
+            self._journal.append({"op": op, **data, "version": self._version})
+    
+    def _catch_up(self) -> None:
+        """Übernimmt neue Journal-Einträge der anderen Prozesse (Dateisperre gehalten)"""
+        reset, entries = self._journal.read_new()
+        
+        if reset:
+            # Neue Generation (verdichtet): Dateien sind der neue Stand
+            self._reload()
+            reset, entries = self._journal.read_new()
+        
+        with self._scope_lock:
+            for entry in entries:
+                self._apply(entry)
+        
+        if reset:
+            entries = [{"op": "reload"}]
+        
+        for entry in entries:
+            for callback in self._listeners:
+                try:
+                    callback(entry.get("op"), entry)
+                except Exception as e:
+                    print(f"⚠️ Fehler in Datenbank-Listener: {e}")
+    
+    def _reload(self) -> None:
+        """Verwirft den Stand im Speicher und lädt alle Dateien neu"""
+        with self._scope_lock, self._lock:
+            self.images = {}
+            self.settings = {}
+            self.print_jobs = []
+            self._index.clear()
+            self._image_stats.clear()
+            
+            self._day_ids = {}
+            self._loaded_days.clear()
+            self._dirty_days.clear()
+            self._days_generation += 1
+            if self.partitions is not None:
+                self.partitions.clear()
+            
+            self._load_images()
+            self._load_settings()
+            self._load_print_jobs()
+            
+            # Version des verdichteten Stands (für alle Prozesse gleich),
+            # ältere Versionen sind nicht mehr als Delta auflösbar
+            version = self._journal.version
+            self._version = self._version + 1 if version is None else version
+            self._changes.clear()
+            self._changes_floor = self._version
+    
+    def _apply(self, entry: dict) -> None:
+        """Wendet einen Journal-Eintrag an (Scope-Lock gehalten)"""
+        op = entry.get("op")
+        
+        # Partitionen: betroffene Tage zuerst laden
+        if op == "add":
+            self._ensure_days([day_of(entry["image"].get("timestamp", ""))])
+        elif op == "import":
+            self._ensure_days({day_of(image.get("timestamp", "")) for image in entry["images"].values()})
+        elif op == "remove" and entry["id"] not in self.images:
+            self._load_image_day(entry["id"])
+        
+        # Version des schreibenden Prozesses übernehmen
+        version = entry.get("version")
+        
+        with self._lock:
+            if op == "add":
+                record = compact(entry["image"])
+                self._insert({record["id"]: record})
+                self._record_change("add", record["id"], version)
+            
+            elif op == "import":
+                self._insert(compact_all(entry["images"]))
+                self._record_change("clear", None, version)
+            
+            elif op == "remove":
+                self._remove(entry["id"], version)
+            
+            elif op == "clear":
+                self._clear(version)
+            
+            elif op == "settings":
+                if entry.get("value") is None:
+                    self.settings.pop(entry["key"], None)
+                else:
+                    self.settings[entry["key"]] = entry["value"]
+            
+            elif op == "print_job":
+                self.print_jobs.append(entry["job"])
+                self._print_stats.add(entry["job"])
+            
+            elif op == "print_job_update":
+                self._replace_print_job(entry["id"], entry["changes"])
+            
+            # Auch ohne eigene Änderung (z.B. Bild schon entfernt) gleichziehen
+            if version is not None and version > self._version:
+                self._version = version
+    
+    def _start_polling(self) -> None:
+        """Startet den Thread, der das Journal beobachtet und verdichtet"""
+        if self._poller is not None:
+            return
+        
+        self._stop_polling.clear()
+        self._poller = threading.Thread(target=self._poll, name="db-journal", daemon=True)
+        self._poller.start()
+    
+    def _poll(self) -> None:
+        """Änderungen anderer Prozesse nachholen (nur stat, solange nichts passiert)"""
+        while not self._stop_polling.wait(self._poll_interval):
+            try:
+                if self._journal.changed():
+                    with self._shared():
+                        pass
                 
-                # Meta
-                "width": image_data.get("width", 0),
-                "height": image_data.get("height", 0),
-                "created_at": datetime.now().isoformat()
-            }
+                if self._journal.size() > self._journal_limit:
+                    self._compact()
+            except Exception as e:
+                print(f"⚠️ Fehler beim Lesen des Datenbank-Journals: {e}")
+    
+    def _compact(self) -> None:
+        """
+        Schreibt den vollständigen Stand in die Dateien und leert das Journal
+        
+        Die anderen Prozesse sehen die neue Generation und laden neu.
+        Schlägt das Schreiben fehl, bleibt das Journal erhalten.
+        """
+        with self._file_lock:
+            self._catch_up()
             
-            self._save_images()
-            return image_id
+            if self._journal.empty():
+                return
+            
+            errors = self._writer.errors
+            
+            with self._lock:
+                for name in ("images", "settings", "print_jobs"):
+                    self._writer.mark(name)
+            
+            self._writer.flush()
+            
+            if self._writer.errors == errors:
+                self._journal.reset(self._version)
+                print(f"💾 Datenbank-Journal verdichtet ({self._image_stats.totals['images']} Bilder)")
+            else:
+                print("⚠️ Verdichten fehlgeschlagen, Journal bleibt erhalten")
+    
+    # ========================================================
+    # BILDER
+    # ========================================================
+    
+    def add_image(self, image_data: dict, wait: bool = False) -> str:
+        """
+        Fügt ein analysiertes Bild hinzu
+        
+        Args:
+            image_data: Analyse-Ergebnis
+            wait: Erst zurückkehren, wenn das Bild gespeichert ist
+        """
+        timestamp = image_data.get("timestamp", datetime.now().isoformat())
+        
+        with self._shared(), self._scope_lock:
+            # Partitionen: Tag muss geladen sein, bevor er erweitert wird
+            self._ensure_days([day_of(timestamp)])
+            
+            with self._lock:
+                image_id = self._add_record(image_data, timestamp)
+                ticket = self._save_images()
+        
+        if wait:
+            self._writer.wait("images", ticket)
+        
+        return image_id
+    
+    def _add_record(self, image_data: dict, timestamp: str) -> str:
+        """Legt den Datensatz an und pflegt Index/Statistik (Lock gehalten)"""
+        image_id = self._generate_id(image_data.get("filename", ""))
+        
+        record = ImageRecord.from_dict({
+            "id": image_id,
+            "filename": image_data.get("filename", ""),
+            "original_path": image_data.get("original_path", ""),
+            "processed_path": image_data.get("processed_path", ""),
+            "output_path": image_data.get("output_path", ""),
+            "thumbnails": image_data.get("thumbnails", {}),
+            "timestamp": timestamp,
+            
+            # Analyse-Daten
+            "faces": image_data.get("faces", []),
+            "face_count": image_data.get("face_count", 0),
+            "face_encodings": image_data.get("face_encodings", []),
+            
+            "persons": image_data.get("persons", []),
+            "person_count": image_data.get("person_count", 0),
+            
+            "clothing_colors": image_data.get("clothing_colors", []),
+            
+            # Meta
+            "width": image_data.get("width", 0),
+            "height": image_data.get("height", 0),
+            "created_at": datetime.now().isoformat()
+        })
+        
+        self._insert({image_id: record})
+        self._record_change("add", image_id)
+        self._log("add", image=record)
+        
+        return image_id
+    
+    def import_images(self, images: Dict[str, dict], wait: bool = False) -> int:
+        """
+        Übernimmt fertige Datensätze (Import, Migration), IDs bleiben erhalten
+        
+        Für große Bestände in Blöcken aufrufen (siehe import_images.py).
+        Vorhandene Bilder mit gleicher ID werden ersetzt.
+        
+        Args:
+            images: {id: datensatz}
+            wait: Erst zurückkehren, wenn der Block gespeichert ist
+            
+        Returns:
+            Anzahl übernommener Datensätze
+        """
+        records = {}
+        for key, image in images.items():
+            if isinstance(image, dict):
+                image_id = image.get("id") or key
+                records[image_id] = compact({**image, "id": image_id})
+        
+        with self._shared(), self._scope_lock:
+            # Partitionen: betroffene Tage laden, damit sie vollständig bleiben
+            self._ensure_days({day_of(image.get("timestamp", "")) for image in records.values()})
+            
+            with self._lock:
+                self._insert(records)
+                
+                # Massenänderung: Clients laden komplett neu statt per Delta
+                self._record_change("clear", None)
+                self._log("import", images=records)
+                ticket = self._save_images()
+        
+        if wait:
+            self._writer.wait("images", ticket)
+        
+        return len(records)
     
-    def get_image(self, image_id: str) -> Optional[dict]:
-        """Holt ein Bild nach ID"""
-        return self.images.get(image_id)
+    def get_image(self, image_id: str, fields: Iterable[str] = None) -> Optional[dict]:
+        """
+        Holt ein Bild nach ID
+        
+        Args:
+            image_id: Bild-ID
+            fields: Nur diese Felder zurückgeben (None = alle)
+        """
+        image = self.images.get(image_id)
+        
+        if image is None and self.partitions is not None:
+            with self._scope_lock:
+                self._load_image_day(image_id)
+                image = self.images.get(image_id)
+        
+        if image is None:
+            return None
+        
+        if fields is None:
+            return image.to_dict()
+        
+        return self._project(image, fields)
+    
+    def get_images(self, image_ids: Iterable[str], fields: Iterable[str] = None) -> List[dict]:
+        """
+        Holt mehrere Bilder nach ID (z.B. hinzugefügte Bilder eines Deltas)
+        
+        Args:
+            image_ids: Bild-IDs, unbekannte fehlen im Ergebnis
+            fields: Nur diese Felder zurückgeben (None = alle)
+        """
+        fields = tuple(fields) if fields is not None else None
+        images = (self.get_image(image_id, fields) for image_id in image_ids)
+        return [image for image in images if image is not None]
     
     def get_image_by_filename(self, filename: str) -> Optional[dict]:
-        """Sucht Bild nach Dateiname"""
-        for img in self.images.values():
+        """Sucht Bild nach Dateiname (partitioned: nur geladene Tage)"""
+        # Kopie der Werte: Schreiber ändern das dict parallel
+        for img in list(self.images.values()):
             if img.get("filename") == filename:
-                return img
+                return img.to_dict()
         return None
     
-    def get_all_images(self, limit: int = None, offset: int = 0) -> List[dict]:
-        """Holt alle Bilder (sortiert nach Zeit)"""
-        images = list(self.images.values())
-        images.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+    def get_all_images(self, limit: int = None, offset: int = 0, fields: Iterable[str] = None) -> List[dict]:
+        """
+        Holt alle Bilder (sortiert nach Zeit)
         
-        if limit:
-            return images[offset:offset + limit]
-        return images[offset:]
+        Args:
+            limit: Maximale Anzahl
+            offset: Start-Index
+            fields: Nur diese Felder zurückgeben (None = alle), z.B. SUMMARY_FIELDS
+        """
+        with self._scope_lock:
+            if self.partitions is not None:
+                days = self._scope_days(needed=offset + limit if limit else None)
+                
+                if not self._fits(days):
+                    return self._stream_query(days, offset=offset, limit=limit, fields=fields)["images"]
+                
+                self._ensure_days(days)
+            
+            with self._lock:
+                ids = list(islice(self._index.newest_ids(), offset, offset + limit if limit else None))
+            
+            return self._materialize(ids, fields)
     
-    def delete_image(self, image_id: str) -> bool:
-        """Löscht ein Bild"""
+    def iter_images(self, fields: Iterable[str] = None) -> Iterator[dict]:
+        """
+        Alle Bilder nacheinander, ohne Reihenfolge (z.B. Gesichts-/Farbsuche)
+        
+        partitioned: Tag für Tag - nicht geladene Tage werden nur gelesen
+        und nicht im Speicher behalten, der Speicherbedarf bleibt beim Budget.
+        
+        Args:
+            fields: Nur diese Felder zurückgeben (None = alle)
+        """
+        fields = tuple(fields) if fields is not None else None
+        
+        if self.partitions is None:
+            # Kopie der Werte: Schreiber ändern das dict parallel
+            with self._lock:
+                images = list(self.images.values())
+            for image in images:
+                yield self._project(image, fields) if fields else image.to_dict()
+            return
+        
         with self._lock:
-            if image_id in self.images:
-                del self.images[image_id]
-                self._save_images()
-                return True
-            return False
+            days = list(set(self.partitions.days) | set(self._loaded_days))
+        
+        for day in days:
+            for image in self._day_records(day).values():
+                yield self._project(image, fields) if fields else image.to_dict()
     
-    def clear_images(self) -> int:
-        """Löscht alle Bilder"""
+    def query_images(
+        self,
+        search: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        start_minute: int = None,
+        end_minute: int = None,
+        sort: str = "newest",
+        limit: int = None,
+        offset: int = 0,
+        cursor: str = None,
+        fields: Iterable[str] = None
+    ) -> dict:
+        """
+        Gefilterte Bildabfrage über den Index (Galerie)
+        
+        Args:
+            search: Teilstring im Dateinamen
+            date_from: Datum von (YYYY-MM-DD)
+            date_to: Datum bis (YYYY-MM-DD, inklusive)
+            start_minute: Uhrzeit von (Minute des Tages)
+            end_minute: Uhrzeit bis (Minute des Tages, inklusive)
+            sort: newest, oldest oder name
+            limit: Maximale Anzahl
+            offset: Start-Index (relativ zum Cursor)
+            cursor: next_cursor der vorherigen Seite (Keyset-Pagination)
+            fields: Nur diese Felder zurückgeben (None = alle)
+            
+        Returns:
+            dict mit total (Anzahl Treffer), images (aktuelle Seite) und
+            next_cursor (None auf der letzten Seite)
+            
+        Raises:
+            ValueError: bei ungültigem Cursor
+        """
+        key = decode_cursor(cursor) if cursor else None
+        
+        if key is not None and (key[0] == "n") != (sort == "name"):
+            raise ValueError(f"Cursor passt nicht zur Sortierung '{sort}'")
+        
+        filters = dict(
+            search=search,
+            date_from=date_from,
+            date_to=date_to,
+            start_minute=start_minute,
+            end_minute=end_minute,
+            sort=sort
+        )
+        
+        with self._scope_lock:
+            if self.partitions is not None:
+                needed = offset + limit + 1 if limit else None
+                days = self._scope_days(needed=needed, key=key, **filters)
+                
+                if not self._fits(days):
+                    return self._stream_query(days, key, offset, limit, fields, **filters)
+                
+                self._ensure_days(days)
+            
+            with self._lock:
+                total, ids = self._index.query(cursor=key, **filters)
+                # Ein Element mehr holen: gibt es eine weitere Seite?
+                ids = list(islice(ids, offset, offset + limit + 1 if limit else None))
+                
+                next_cursor = None
+                if limit and len(ids) > limit:
+                    ids = ids[:limit]
+                    next_cursor = encode_cursor(self._index.cursor_key(ids[-1], sort))
+                
+                # Ungefilterte Liste: nicht geladene Tage zählen mit
+                if self.partitions is not None and not (search or date_from or date_to) \
+                        and start_minute is None and end_minute is None:
+                    total = self._image_stats.totals["images"]
+            
+            return {
+                "total": total,
+                "images": self._materialize(ids, fields),
+                "next_cursor": next_cursor
+            }
+    
+    def image_matches(self, image_id: str, **filters) -> bool:
+        """Prüft ein Bild gegen die Filter von query_images (z.B. für Deltas)"""
         with self._lock:
-            count = len(self.images)
-            self.images = {}
-            self._save_images()
-            return count
+            return self._index.matches(image_id, **filters)
+    
+    def delete_image(self, image_id: str, wait: bool = False) -> bool:
+        """Löscht ein Bild"""
+        with self._shared(), self._scope_lock:
+            # Partitionen: Tag des Bildes ggf. erst laden
+            if self.get_image(image_id) is None:
+                return False
+            
+            with self._lock:
+                if not self._remove(image_id):
+                    return False
+                
+                self._log("remove", id=image_id)
+                ticket = self._save_images()
+        
+        if wait:
+            self._writer.wait("images", ticket)
+        
+        return True
+    
+    def clear_images(self, wait: bool = False) -> int:
+        """Löscht alle Bilder"""
+        with self._shared(), self._scope_lock, self._lock:
+            count = self._clear()
+            self._log("clear")
+            ticket = self._save_images()
+        
+        if wait:
+            self._writer.wait("images", ticket)
+        
+        return count
+    
+    def _insert(self, records: Dict[str, ImageRecord]) -> None:
+        """Übernimmt Datensätze in Daten, Index, Statistik und Tage (Lock gehalten)"""
+        for image_id, image in records.items():
+            old = self.images.get(image_id)
+            if old is not None:
+                self._image_stats.remove(old)
+                self._track_remove(image_id, old)
+            
+            self.images[image_id] = image
+            self._image_stats.add(image)
+            self._track_add(image_id, image)
+        
+        if len(records) == 1:
+            self._index.add(*next(iter(records.items())))
+        else:
+            self._index.add_many(records)
+    
+    def _remove(self, image_id: str, version: int = None) -> bool:
+        """Entfernt ein Bild aus Daten, Index, Statistik und Tagen (Lock gehalten)"""
+        image = self.images.pop(image_id, None)
+        
+        if image is None:
+            return False
+        
+        self._image_stats.remove(image)
+        self._index.remove(image_id)
+        self._track_remove(image_id, image)
+        self._record_change("remove", image_id, version)
+        return True
+    
+    def _clear(self, version: int = None) -> int:
+        """Leert Daten, Index, Statistik und Tage (Lock gehalten)"""
+        count = self._image_stats.totals["images"]
+        self.images = {}
+        self._index.clear()
+        self._image_stats.clear()
+        
+        if self.partitions is not None:
+            # Alle Tagesdateien beim nächsten Speichern löschen
+            self._dirty_days |= set(self.partitions.days) | set(self._day_ids)
+            self._day_ids = {}
+            self._loaded_days.clear()
+            self.partitions.clear()
+            self._days_generation += 1
+        
+        self._record_change("clear", None, version)
+        return count
     
     def count_images(self) -> int:
-        """Zählt alle Bilder"""
-        return len(self.images)
+        """Zählt alle Bilder (inkl. nicht geladener Tage)"""
+        return self._image_stats.totals["images"]
     
     def search_images(self, query: str) -> List[dict]:
-        """Sucht Bilder nach Name oder Zeit"""
-        results = []
-        query_lower = query.lower()
+        """Sucht Bilder nach Name oder Zeit (Teilstring, über Trigramm-Index)"""
+        with self._scope_lock:
+            if self.partitions is not None:
+                days = self._scope_days(search=query)
+                
+                if not self._fits(days):
+                    # Tag für Tag (siehe _stream_query), älteste zuerst wie der Index
+                    results = []
+                    for day in self._ordered_days(days, newest_first=False):
+                        records = self._day_records(day)
+                        index = ImageIndex()
+                        index.rebuild(records)
+                        results.extend(records[i].to_dict() for i in index.search(query))
+                    return results
+                
+                self._ensure_days(days)
+            
+            with self._lock:
+                ids = self._index.search(query)
+            
+            return self._materialize(ids)
+    
+    # ========================================================
+    # ÄNDERUNGSVERSION (Delta-Abfragen)
+    # ========================================================
+    
+    def get_version(self) -> int:
+        """Aktuelle Änderungsversion der Bilddatenbank"""
+        return self._version
+    
+    def get_changes_since(self, since: int) -> Optional[dict]:
+        """
+        Ermittelt hinzugefügte/gelöschte Bilder seit einer Version
         
-        for img in self.images.values():
-            filename = img.get("filename", "").lower()
-            timestamp = img.get("timestamp", "").lower()
+        Args:
+            since: Version, die der Client zuletzt gesehen hat
             
-            if query_lower in filename or query_lower in timestamp:
-                results.append(img)
+        Returns:
+            dict mit added/removed (IDs) oder None, wenn kein Delta möglich
+            ist (Version unbekannt, zu alt oder Datenbank geleert)
+        """
+        with self._lock:
+            if since > self._version or since < self._changes_floor:
+                return None
+            
+            changes = [c for c in self._changes if c[0] > since]
+        
+        # Netto-Effekt pro Bild (letzte Operation zählt)
+        last_op: Dict[str, str] = {}
+        for _, op, image_id in changes:
+            if op == "clear":
+                return None
+            last_op.pop(image_id, None)
+            last_op[image_id] = op
+        
+        return {
+            "added": [i for i, op in last_op.items() if op == "add" and i in self.images],
+            "removed": [i for i, op in last_op.items() if op == "remove"]
+        }
+    
+    def _record_change(self, op: str, image_id: Optional[str], version: int = None) -> None:
+        """
+        Protokolliert eine Änderung (Lock muss gehalten werden)
+        
+        Args:
+            version: Version aus dem Journal (Änderung eines anderen Prozesses),
+                sonst die nächste eigene
+        """
+        self._version = self._version + 1 if version is None else version
         
-        return results
+        if len(self._changes) == self._changes.maxlen:
+            # Älteste Änderung fällt heraus - ältere Versionen nicht mehr auflösbar
+            self._changes_floor = self._changes[0][0]
+        
+        self._changes.append((self._version, op, image_id))
     
     # ========================================================
     # SETTINGS (pro Station/Typ)
@@ -207,75 +1267,135 @@ class Database:
         key = f"{station}_{settings_type}"
         return self.settings.get(key, {})
     
-    def save_settings(self, station: str, settings_type: str, data: dict) -> bool:
-        """Speichert Einstellungen"""
-        with self._lock:
+    def save_settings(self, station: str, settings_type: str, data: dict, wait: bool = True) -> bool:
+        """
+        Speichert Einstellungen
+        
+        Args:
+            wait: Erst zurückkehren, wenn die Datei geschrieben ist (Standard,
+                  Einstellungen sind klein und sollen einen Neustart überleben)
+        """
+        with self._shared(), self._lock:
             key = f"{station}_{settings_type}"
             self.settings[key] = {
                 **data,
                 "updated_at": datetime.now().isoformat()
             }
-            self._save_settings()
-            return True
+            self._log("settings", key=key, station=station, type=settings_type, value=self.settings[key])
+            ticket = self._save_settings()
+        
+        if wait:
+            self._writer.wait("settings", ticket)
+        
+        return True
     
-    def delete_settings(self, station: str, settings_type: str) -> bool:
+    def delete_settings(self, station: str, settings_type: str, wait: bool = True) -> bool:
         """Löscht Einstellungen"""
-        with self._lock:
+        with self._shared(), self._lock:
             key = f"{station}_{settings_type}"
-            if key in self.settings:
-                del self.settings[key]
-                self._save_settings()
-                return True
-            return False
+            if key not in self.settings:
+                return False
+            
+            del self.settings[key]
+            self._log("settings", key=key, station=station, type=settings_type, value=None)
+            ticket = self._save_settings()
+        
+        if wait:
+            self._writer.wait("settings", ticket)
+        
+        return True
     
     # ========================================================
     # DRUCKAUFTRÄGE
     # ========================================================
     
-    def add_print_job(self, job: dict) -> str:
+    def add_print_job(self, job: dict, wait: bool = False) -> str:
         """Fügt Druckauftrag hinzu"""
-        with self._lock:
+        with self._shared(), self._lock:
             job_id = f"PJ_{datetime.now().strftime('%Y%m%d%H%M%S')}_{len(self.print_jobs)}"
             
-            self.print_jobs.append({
+            record = {
                 "id": job_id,
                 "image_id": job.get("image_id"),
                 "image_filename": job.get("image_filename"),
                 "printer_type": job.get("printer_type", "small"),
                 "printer_name": job.get("printer_name"),
                 "price": job.get("price", 0),
+                "copies": job.get("copies", 1),
+                "image_path": job.get("image_path"),
                 "status": "pending",
                 "created_at": datetime.now().isoformat()
-            })
+            }
             
-            self._save_print_jobs()
-            return job_id
+            self.print_jobs.append(record)
+            self._print_stats.add(record)
+            self._log("print_job", job=record)
+            
+            ticket = self._save_print_jobs()
+        
+        if wait:
+            self._writer.wait("print_jobs", ticket)
+        
+        return job_id
+    
+    def update_print_job(self, job_id: str, wait: bool = False, **changes) -> Optional[dict]:
+        """
+        Aktualisiert einen Druckauftrag (status, started_at, completed_at, error)
+        
+        Returns:
+            Neuer Datensatz oder None, wenn der Auftrag nicht existiert
+        """
+        with self._shared(), self._lock:
+            record = self._replace_print_job(job_id, changes)
+            
+            if record is None:
+                return None
+            
+            self._log("print_job_update", id=job_id, changes=changes)
+            
+            ticket = self._save_print_jobs()
+        
+        if wait:
+            self._writer.wait("print_jobs", ticket)
+        
+        return dict(record)
+    
+    def get_print_job(self, job_id: str) -> Optional[dict]:
+        """Holt einen Druckauftrag"""
+        with self._lock:
+            for record in reversed(self.print_jobs):
+                if record.get("id") == job_id:
+                    return dict(record)
+        return None
+    
+    def get_open_print_jobs(self) -> List[dict]:
+        """Noch nicht abgeschlossene Druckaufträge (pending/printing), älteste zuerst"""
+        with self._lock:
+            return [dict(r) for r in self.print_jobs if r.get("status") in ("pending", "printing")]
     
     def get_print_jobs(self, limit: int = 50) -> List[dict]:
         """Holt letzte Druckaufträge"""
         return self.print_jobs[-limit:][::-1]
     
+    def _replace_print_job(self, job_id: str, changes: dict) -> Optional[dict]:
+        """Ersetzt den Datensatz mit Änderungen (Lock gehalten, neueste zuerst gesucht)"""
+        for i in range(len(self.print_jobs) - 1, -1, -1):
+            if self.print_jobs[i].get("id") == job_id:
+                self.print_jobs[i] = {**self.print_jobs[i], **changes}
+                return self.print_jobs[i]
+        return None
+    
     def get_print_stats(self) -> dict:
         """Statistiken zu Druckaufträgen"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        total = len(self.print_jobs)
-        today_jobs = [j for j in self.print_jobs if j.get("created_at", "").startswith(today)]
-        today_revenue = sum(j.get("price", 0) for j in today_jobs)
-        
-        # Beliebtester Drucker
-        printer_counts = {}
-        for job in self.print_jobs:
-            pt = job.get("printer_type", "unknown")
-            printer_counts[pt] = printer_counts.get(pt, 0) + 1
-        
-        popular = max(printer_counts, key=printer_counts.get) if printer_counts else "-"
+        today = self._print_stats.day(datetime.now().strftime("%Y-%m-%d"))
         
         return {
-            "total_jobs": total,
-            "today_jobs": len(today_jobs),
-            "today_revenue": today_revenue,
-            "popular_printer": popular
+            "total_jobs": self._print_stats.total_jobs,
+            "today_jobs": today["jobs"],
+            "today_revenue": today["revenue"],
+            "total_revenue": self._print_stats.total_revenue,
+            "popular_printer": self._print_stats.popular_printer(),
+            "printers": {name: dict(counters) for name, counters in self._print_stats.printers.items()}
         }
     
     # ========================================================
@@ -284,21 +1404,71 @@ class Database:
     
     def get_statistics(self) -> dict:
         """Allgemeine Statistiken"""
-        total_faces = sum(img.get("face_count", 0) for img in self.images.values())
-        total_persons = sum(img.get("person_count", 0) for img in self.images.values())
+        totals = self._image_stats.totals
         
         return {
-            "total_images": len(self.images),
-            "total_faces": total_faces,
-            "total_persons": total_persons,
+            "total_images": totals["images"],
+            "total_faces": totals["faces"],
+            "total_persons": totals["persons"],
+            "images_today": self._image_stats.day(datetime.now().strftime("%Y-%m-%d"))["images"],
             "settings_count": len(self.settings),
-            "print_jobs": len(self.print_jobs)
+            "print_jobs": self._print_stats.total_jobs
+        }
+    
+    def get_image_stats(self) -> dict:
+        """
+        Bild-Statistiken (Galerie, Suche)
+        
+        Returns:
+            dict mit Summen, ältestem/neuestem Timestamp und Bildern von heute
+        """
+        totals = self._image_stats.totals
+        
+        with self._lock:
+            oldest_id, newest_id = self._index.time_bounds()
+            
+            oldest = self.images[oldest_id].get("timestamp") if oldest_id else None
+            newest = self.images[newest_id].get("timestamp") if newest_id else None
+            
+            # Nicht geladene Tage: erster/letzter Timestamp aus dem Manifest
+            if self.partitions is not None:
+                for day, info in self.partitions.days.items():
+                    if day in self._loaded_days or not day:
+                        continue
+                    if info.get("first") and (oldest is None or info["first"] < oldest):
+                        oldest = info["first"]
+                    if info.get("last") and (newest is None or info["last"] > newest):
+                        newest = info["last"]
+        
+        return {
+            "total_images": totals["images"],
+            "total_faces": totals["faces"],
+            "total_persons": totals["persons"],
+            "images_with_faces": totals["with_faces"],
+            "images_with_colors": totals["with_colors"],
+            "oldest_image": oldest,
+            "newest_image": newest,
+            "images_today": self._image_stats.day(datetime.now().strftime("%Y-%m-%d"))["images"]
         }
     
     # ========================================================
     # HILFSFUNKTIONEN
     # ========================================================
     
+    def _materialize(self, ids: List[str], fields: Iterable[str] = None) -> List[dict]:
+        """Datensätze zu IDs (optional projiziert)"""
+        images = [self.images[i] for i in ids if i in self.images]
+        
+        if fields is None:
+            return [img.to_dict() for img in images]
+        
+        fields = tuple(fields)
+        return [self._project(img, fields) for img in images]
+    
+    def _project(self, image: ImageRecord, fields: Iterable[str]) -> dict:
+        """dict eines Bild-Datensatzes mit nur den angegebenen Feldern"""
+        return {field: image[field] for field in fields if field in image}
+    
     def _generate_id(self, filename: str) -> str:
         """Generiert eindeutige ID"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
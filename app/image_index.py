@@ -0,0 +1,631 @@
+"""
+Bild-Index - Vorberechnete Spalten für schnelle Galerie-Abfragen
+"""
+
+import base64
+import heapq
+import json
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Referenzpunkt für "Sekunden seit Epoche" (Wandzeit, ohne Zeitzone)
+EPOCH = datetime(1970, 1, 1)
+
+MINUTES_PER_DAY = 24 * 60
+
+# Sortierschlüssel im Zeitindex: (Sekunden, Bild-ID)
+TimeKey = Tuple[float, str]
+
+# Zeichen, die in einem (kleingeschriebenen) ISO-Timestamp vorkommen können
+TIMESTAMP_CHARS = frozenset("0123456789-:t. +z")
+
+
+# ============================================================
+# IMAGE INDEX
+# ============================================================
+
+class ImageIndex:
+    """
+    Sekundärindex über die Bilddatenbank
+
+    Pro Bild werden Sekunden seit Epoche, Minute des Tages und der
+    kleingeschriebene Dateiname vorberechnet. Darüber liegen:
+
+    - ein nach (Zeit, ID) sortierter Zeitindex (Binärsuche für Datumsbereiche)
+    - 1440 Minuten-Buckets, jeder ebenfalls nach (Zeit, ID) sortiert
+      (Uhrzeit-Filter = wenige Buckets, darin wieder Binärsuche)
+
+    - Trigramm-Posting-Listen über Dateiname und Timestamp
+      (Teilstring-Suche = Schnittmenge der Posting-Listen, danach Prüfung)
+
+    Bilder ohne lesbaren Timestamp landen in einer separaten Liste und
+    erscheinen nur in Abfragen ohne Datums-/Uhrzeitfilter.
+    """
+
+    def __init__(self):
+        # ID -> (Zeitschlüssel oder None, Minute oder None, Dateiname klein,
+        #        Dateiname, Timestamp klein, Einfügenummer)
+        self._columns: Dict[str, tuple] = {}
+        self._sequence = 0
+        self._time_keys: List[TimeKey] = []
+        self._minute_keys: List[List[TimeKey]] = [[] for _ in range(MINUTES_PER_DAY)]
+        self._untimed: Dict[str, None] = {}
+
+        # Trigramm (Dateiname bzw. Timestamp) -> IDs
+        self._grams: Dict[str, Set[str]] = {}
+        self._time_grams: Dict[str, Set[str]] = {}
+
+    # ========================================================
+    # PFLEGE
+    # ========================================================
+
+    def rebuild(self, images: Dict[str, dict]) -> None:
+        """Baut den Index komplett neu auf"""
+        self.clear()
+
+        for image_id, image in images.items():
+            columns = self._make_columns(image_id, image, self._next_sequence())
+            self._columns[image_id] = columns
+
+            if columns[0] is None:
+                self._untimed[image_id] = None
+            else:
+                self._time_keys.append(columns[0])
+
+            self._add_grams(image_id, columns)
+
+        # Einmal sortieren, Buckets in sortierter Reihenfolge füllen
+        self._time_keys.sort()
+        for key in self._time_keys:
+            self._minute_keys[self._columns[key[1]][1]].append(key)
+
+    def add(self, image_id: str, image: dict) -> None:
+        """Nimmt ein Bild auf (ersetzt vorhandenen Eintrag, Position bleibt)"""
+        if image_id in self._columns:
+            sequence = self._columns[image_id][5]
+            self.remove(image_id)
+        else:
+            sequence = self._next_sequence()
+
+        columns = self._make_columns(image_id, image, sequence)
+        self._columns[image_id] = columns
+
+        if columns[0] is None:
+            self._untimed[image_id] = None
+        else:
+            insort(self._time_keys, columns[0])
+            insort(self._minute_keys[columns[1]], columns[0])
+
+        self._add_grams(image_id, columns)
+
+    def add_many(self, images: Dict[str, dict]) -> None:
+        """
+        Nimmt viele Bilder auf einmal auf (z.B. eine nachgeladene Partition)
+
+        Statt einzeln einzusortieren werden die Schlüssel angehängt und die
+        betroffenen Listen einmal sortiert (Timsort, vorsortierte Läufe).
+        """
+        touched = set()
+
+        for image_id, image in images.items():
+            if image_id in self._columns:
+                self.remove(image_id)
+
+            columns = self._make_columns(image_id, image, self._next_sequence())
+            self._columns[image_id] = columns
+
+            if columns[0] is None:
+                self._untimed[image_id] = None
+            else:
+                self._time_keys.append(columns[0])
+                self._minute_keys[columns[1]].append(columns[0])
+                touched.add(columns[1])
+
+            self._add_grams(image_id, columns)
+
+        self._time_keys.sort()
+        for minute in touched:
+            self._minute_keys[minute].sort()
+
+    def remove_many(self, image_ids: Iterable[str]) -> None:
+        """Entfernt viele Bilder auf einmal (z.B. eine verdrängte Partition)"""
+        removed = set()
+        touched = set()
+
+        for image_id in image_ids:
+            columns = self._columns.pop(image_id, None)
+            if columns is None:
+                continue
+
+            self._remove_grams(image_id, columns)
+
+            if columns[0] is None:
+                self._untimed.pop(image_id, None)
+            else:
+                removed.add(image_id)
+                touched.add(columns[1])
+
+        if not removed:
+            return
+
+        self._time_keys = [key for key in self._time_keys if key[1] not in removed]
+        for minute in touched:
+            self._minute_keys[minute] = [key for key in self._minute_keys[minute] if key[1] not in removed]
+
+    def remove(self, image_id: str) -> None:
+        """Entfernt ein Bild"""
+        columns = self._columns.pop(image_id, None)
+
+        if columns is None:
+            return
+
+        self._remove_grams(image_id, columns)
+
+        key, minute = columns[0], columns[1]
+
+        if key is None:
+            self._untimed.pop(image_id, None)
+            return
+
+        for keys in (self._time_keys, self._minute_keys[minute]):
+            pos = bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+
+    def clear(self) -> None:
+        """Leert den Index"""
+        self._columns = {}
+        self._time_keys = []
+        self._minute_keys = [[] for _ in range(MINUTES_PER_DAY)]
+        self._untimed = {}
+        self._grams = {}
+        self._time_grams = {}
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    # ========================================================
+    # ABFRAGEN
+    # ========================================================
+
+    def query(
+        self,
+        search: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        start_minute: int = None,
+        end_minute: int = None,
+        sort: str = "newest",
+        cursor: tuple = None
+    ) -> Tuple[int, Iterator[str]]:
+        """
+        Sucht Bilder über den Index
+
+        Args:
+            search: Teilstring im Dateinamen (ohne Groß-/Kleinschreibung)
+            date_from: Datum von (YYYY-MM-DD), ungültige Werte werden ignoriert
+            date_to: Datum bis (YYYY-MM-DD, inklusive)
+            start_minute: Uhrzeit von (Minute des Tages, inklusive)
+            end_minute: Uhrzeit bis (Minute des Tages, inklusive)
+            sort: newest, oldest oder name
+            cursor: Position aus cursor_key() - nur Bilder danach liefern
+
+        Returns:
+            (Anzahl Treffer ohne Cursor, Iterator über die Bild-IDs in Sortierreihenfolge)
+        """
+        lo, hi = self._date_bounds(date_from, date_to)
+        has_time = start_minute is not None and end_minute is not None
+        # Bei Sortierung nach Name: Gleichstand neueste zuerst
+        newest = sort != "oldest"
+
+        # 1. Sortierte Teilbereiche des Zeitindex bestimmen
+        if has_time:
+            runs = [
+                self._slice(self._minute_keys[minute], lo, hi)
+                for minute in range(max(0, start_minute), min(MINUTES_PER_DAY - 1, end_minute) + 1)
+            ]
+        else:
+            runs = [self._slice(self._time_keys, lo, hi)]
+
+        runs = [run for run in runs if run[1] < run[2]]
+
+        # Bilder ohne Timestamp nur ohne Zeitfilter
+        untimed = [] if (has_time or lo is not None or hi is not None) else list(self._untimed)
+
+        columns = self._columns
+
+        # 2a. Ohne Filter/Namenssortierung: Anzahl direkt aus den Teilbereichen,
+        #     Cursor per Binärsuche in jedem Teilbereich
+        if not search and sort != "name":
+            total = sum(end - start for _, start, end in runs) + len(untimed)
+
+            if cursor is not None:
+                runs, untimed = self._after_cursor(runs, untimed, cursor, newest)
+
+            return total, self._merge(runs, untimed, newest)
+
+        # 2b. Mit Suchbegriff: Kandidaten aus dem Trigramm-Index, dann
+        #     Datums-/Uhrzeitfilter prüfen
+        if search:
+            ids = [
+                i for i in self._search_filename(search.lower())
+                if self._in_range(columns[i], lo, hi, start_minute, end_minute)
+            ]
+
+            if sort != "name" and len(ids) * 8 > len(columns):
+                # Viele Treffer: sortierten Zeitindex filtern statt neu sortieren
+                total = len(ids)
+                matched = set(ids)
+
+                if cursor is not None:
+                    runs, untimed = self._after_cursor(runs, untimed, cursor, newest)
+
+                return total, (i for i in self._merge(runs, untimed, newest) if i in matched)
+
+            ids = self._sort_ids(ids, sort)
+        else:
+            ids = sorted(self._merge(runs, untimed, newest), key=lambda i: (columns[i][3], i))
+
+        total = len(ids)
+
+        if cursor is not None:
+            ids = [i for i in ids if self._is_after(i, cursor, sort)]
+
+        return total, iter(ids)
+
+    def search(self, query: str) -> List[str]:
+        """
+        Teilstring-Suche in Dateiname oder Timestamp (ohne Groß-/Kleinschreibung)
+
+        Beide über Trigramm-Posting-Listen; Suchbegriffe mit Zeichen, die
+        in keinem Timestamp vorkommen, prüfen nur den Dateinamen.
+
+        Returns:
+            IDs in Einfügereihenfolge
+        """
+        query = query.lower()
+        columns = self._columns
+
+        if len(query) < 3:
+            return [i for i, c in columns.items() if query in c[2] or query in c[4]]
+
+        matches = set(self._search_filename(query))
+        if TIMESTAMP_CHARS.issuperset(query):
+            matches.update(self._search_grams(self._time_grams, query, 4))
+
+        # Reihenfolge wie in der Datenbank
+        return sorted(matches, key=lambda i: columns[i][5])
+
+    def cursor_key(self, image_id: str, sort: str = "newest") -> Optional[tuple]:
+        """
+        Position eines Bildes in der Sortierreihenfolge (für Keyset-Pagination)
+
+        Returns:
+            ("t", Sekunden, ID), ("u", ID) für Bilder ohne Timestamp,
+            ("n", Dateiname, ID) bei Sortierung nach Name oder None
+        """
+        columns = self._columns.get(image_id)
+
+        if columns is None:
+            return None
+
+        if sort == "name":
+            return ("n", columns[3], image_id)
+
+        if columns[0] is None:
+            return ("u", image_id)
+
+        return ("t", columns[0][0], image_id)
+
+    def matches(
+        self,
+        image_id: str,
+        search: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        start_minute: int = None,
+        end_minute: int = None
+    ) -> bool:
+        """Prüft ein einzelnes Bild gegen dieselben Filter wie query()"""
+        columns = self._columns.get(image_id)
+
+        if columns is None:
+            return False
+
+        if search and search.lower() not in columns[2]:
+            return False
+
+        lo, hi = self._date_bounds(date_from, date_to)
+        return self._in_range(columns, lo, hi, start_minute, end_minute)
+
+    def time_bounds(self) -> Tuple[Optional[str], Optional[str]]:
+        """IDs des ältesten und neuesten Bildes (mit lesbarem Timestamp)"""
+        if not self._time_keys:
+            return None, None
+        return self._time_keys[0][1], self._time_keys[-1][1]
+
+    def newest_ids(self) -> Iterator[str]:
+        """Alle IDs, neueste zuerst (ohne Timestamp am Ende)"""
+        keys = self._time_keys
+        return chain((keys[k][1] for k in range(len(keys) - 1, -1, -1)), list(self._untimed))
+
+    # ========================================================
+    # HILFSFUNKTIONEN
+    # ========================================================
+
+    def _next_sequence(self) -> int:
+        """Fortlaufende Einfügenummer"""
+        self._sequence += 1
+        return self._sequence
+
+    def _make_columns(self, image_id: str, image: dict, sequence: int) -> tuple:
+        """Berechnet die Index-Spalten eines Bildes"""
+        filename = image.get("filename", "") or ""
+        timestamp = image.get("timestamp", "") or ""
+        dt = parse_timestamp(timestamp)
+
+        if dt is None:
+            return (None, None, filename.lower(), filename, timestamp.lower(), sequence)
+
+        return (
+            (to_seconds(dt), image_id),
+            dt.hour * 60 + dt.minute,
+            filename.lower(),
+            filename,
+            timestamp.lower(),
+            sequence
+        )
+
+    def _add_grams(self, image_id: str, columns: tuple) -> None:
+        """Trägt ein Bild in die Trigramm-Posting-Listen ein (Dateiname, Timestamp)"""
+        for grams, text in ((self._grams, columns[2]), (self._time_grams, columns[4])):
+            for gram in trigrams(text):
+                postings = grams.get(gram)
+                if postings is None:
+                    grams[gram] = {image_id}
+                else:
+                    postings.add(image_id)
+
+    def _remove_grams(self, image_id: str, columns: tuple) -> None:
+        """Entfernt ein Bild aus den Trigramm-Posting-Listen"""
+        for grams, text in ((self._grams, columns[2]), (self._time_grams, columns[4])):
+            for gram in trigrams(text):
+                postings = grams.get(gram)
+                if postings is not None:
+                    postings.discard(image_id)
+                    if not postings:
+                        del grams[gram]
+
+    def _search_filename(self, needle: str) -> Iterator[str]:
+        """
+        IDs, deren Dateiname needle enthält (needle bereits klein)
+
+        Kürzere Suchbegriffe als 3 Zeichen durchsuchen die vorberechnete
+        Spalte direkt.
+        """
+        if len(needle) < 3:
+            return (i for i, c in self._columns.items() if needle in c[2])
+
+        return self._search_grams(self._grams, needle, 2)
+
+    def _search_grams(self, grams: Dict[str, Set[str]], needle: str, column: int) -> Iterator[str]:
+        """
+        IDs, deren Spalte needle enthält (needle mit mindestens 3 Zeichen)
+
+        Schnittmenge der Posting-Listen (kleinste zuerst), danach Prüfung
+        gegen die vorberechnete Spalte.
+        """
+        columns = self._columns
+
+        postings = []
+        for gram in trigrams(needle):
+            ids = grams.get(gram)
+            if not ids:
+                return iter(())
+            postings.append(ids)
+
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+        # Trigramme garantieren keinen zusammenhängenden Treffer
+        return (i for i in candidates if needle in columns[i][column])
+
+    def _in_range(
+        self,
+        columns: tuple,
+        lo: Optional[float],
+        hi: Optional[float],
+        start_minute: Optional[int],
+        end_minute: Optional[int]
+    ) -> bool:
+        """Prüft Datums- und Uhrzeitfilter für vorberechnete Spalten"""
+        key, minute = columns[0], columns[1]
+        has_time = start_minute is not None and end_minute is not None
+
+        if key is None:
+            return not has_time and lo is None and hi is None
+
+        if lo is not None and key[0] < lo:
+            return False
+        if hi is not None and key[0] >= hi:
+            return False
+        if has_time and not (start_minute <= minute <= end_minute):
+            return False
+
+        return True
+
+    def _sort_ids(self, ids: List[str], sort: str) -> List[str]:
+        """Sortiert IDs wie query() (ohne Timestamp: Ende bei neueste, Anfang bei älteste)"""
+        columns = self._columns
+
+        if sort == "name":
+            return sorted(ids, key=lambda i: (columns[i][3], i))
+
+        timed = sorted((i for i in ids if columns[i][0] is not None), key=lambda i: columns[i][0],
+                       reverse=sort != "oldest")
+        untimed = []
+        if self._untimed:
+            wanted = set(ids)
+            untimed = [i for i in self._untimed if i in wanted]
+
+        return timed + untimed if sort != "oldest" else untimed + timed
+
+    def _slice(self, keys: List[TimeKey], lo: Optional[float], hi: Optional[float]) -> tuple:
+        """Teilbereich [lo, hi) einer sortierten Schlüsselliste per Binärsuche"""
+        start = bisect_left(keys, (lo,)) if lo is not None else 0
+        end = bisect_left(keys, (hi,)) if hi is not None else len(keys)
+        return keys, start, end
+
+    def _merge(self, runs: List[tuple], untimed: List[str], newest: bool) -> Iterator[str]:
+        """Führt sortierte Teilbereiche zu einem sortierten ID-Strom zusammen"""
+        iterators = [_iter_run(keys, start, end, newest) for keys, start, end in runs]
+
+        if not iterators:
+            merged = iter(())
+        elif len(iterators) == 1:
+            merged = iterators[0]
+        else:
+            merged = heapq.merge(*iterators, reverse=newest)
+
+        ids = (key[1] for key in merged)
+        return chain(ids, untimed) if newest else chain(untimed, ids)
+
+    def _after_cursor(self, runs: List[tuple], untimed: List[str], cursor: tuple, newest: bool) -> tuple:
+        """Schneidet die Teilbereiche hinter dem Cursor ab (Binärsuche)"""
+        if cursor[0] == "u":
+            # Cursor bei Bildern ohne Timestamp
+            position = untimed.index(cursor[1]) + 1 if cursor[1] in untimed else len(untimed)
+            untimed = untimed[position:]
+            # Neueste zuerst: Bilder ohne Timestamp stehen am Ende
+            return ([] if newest else runs), untimed
+
+        key = (cursor[1], cursor[2])
+        bounded = []
+
+        for keys, start, end in runs:
+            if newest:
+                end = min(end, bisect_left(keys, key))
+            else:
+                start = max(start, bisect_right(keys, key))
+            if start < end:
+                bounded.append((keys, start, end))
+
+        # Älteste zuerst: Bilder ohne Timestamp stehen am Anfang
+        return bounded, (untimed if newest else [])
+
+    def _is_after(self, image_id: str, cursor: tuple, sort: str) -> bool:
+        """Liegt ein Bild in Sortierreihenfolge hinter dem Cursor?"""
+        position = self.cursor_key(image_id, sort)
+
+        if cursor[0] == "n":
+            return position[1:] > cursor[1:]
+
+        newest = sort != "oldest"
+
+        if position[0] != cursor[0]:
+            # Bilder ohne Timestamp: am Ende (neueste) bzw. am Anfang (älteste)
+            return (position[0] == "u") == newest
+
+        if position[0] == "u":
+            order = list(self._untimed)
+            return order.index(image_id) > order.index(cursor[1]) if cursor[1] in self._untimed else newest
+
+        return position[1:] < cursor[1:] if newest else position[1:] > cursor[1:]
+
+    def _date_bounds(self, date_from: str, date_to: str) -> Tuple[Optional[float], Optional[float]]:
+        """Datumsfilter als halboffenes Intervall [lo, hi) in Sekunden"""
+        lo = hi = None
+
+        if date_from:
+            try:
+                start = datetime.fromisoformat(date_from)
+                day = datetime(start.year, start.month, start.day)
+                # Nur ganze Tage ab dem angegebenen Zeitpunkt
+                if start != day:
+                    day += timedelta(days=1)
+                lo = to_seconds(day)
+            except ValueError:
+                pass
+
+        if date_to:
+            try:
+                end = datetime.fromisoformat(date_to)
+                hi = to_seconds(datetime(end.year, end.month, end.day) + timedelta(days=1))
+            except ValueError:
+                pass
+
+        return lo, hi
+
+
+# ============================================================
+# HILFSFUNKTIONEN
+# ============================================================
+
+def parse_timestamp(timestamp: str) -> Optional[datetime]:
+    """Parst einen ISO-Timestamp (Zeitzone wird ignoriert, Wandzeit zählt)"""
+    if not timestamp:
+        return None
+
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).replace(tzinfo=None)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def trigrams(text: str) -> Set[str]:
+    """Alle Trigramme eines Textes"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def encode_cursor(key: tuple) -> str:
+    """Kodiert eine Cursor-Position als URL-sicheren String"""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Dekodiert einen Cursor aus encode_cursor()
+
+    Raises:
+        ValueError: bei ungültigem Cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Ungültiger Cursor: {cursor}")
+
+    valid = (
+        isinstance(key, list) and key and (
+            (key[0] == "t" and len(key) == 3 and isinstance(key[1], (int, float)) and isinstance(key[2], str)) or
+            (key[0] == "u" and len(key) == 2 and isinstance(key[1], str)) or
+            (key[0] == "n" and len(key) == 3 and isinstance(key[1], str) and isinstance(key[2], str))
+        )
+    )
+
+    if not valid:
+        raise ValueError(f"Ungültiger Cursor: {cursor}")
+
+    return tuple(key)
+
+
+def _iter_run(keys: List[TimeKey], start: int, end: int, reverse: bool) -> Iterator[TimeKey]:
+    """Iteriert einen Teilbereich [start, end) einer Schlüsselliste"""
+    if reverse:
+        return (keys[k] for k in range(end - 1, start - 1, -1))
+    return (keys[k] for k in range(start, end))
+
+
+def day_of(timestamp: str) -> str:
+    """Aufnahmetag (YYYY-MM-DD) eines Timestamps, "" wenn nicht lesbar"""
+    dt = parse_timestamp(timestamp)
+    return dt.date().isoformat() if dt else ""
+
+
+def to_seconds(dt: datetime) -> float:
+    """Sekunden seit 1970-01-01 (Wandzeit)"""
+    return (dt - EPOCH).total_seconds()
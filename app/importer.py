@@ -0,0 +1,189 @@
+"""
+Importer - Liest Bilddatenbanken Datensatz für Datensatz (ohne alles zu laden)
+"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from .serializers import MSGPACK_AVAILABLE, UTF8_BOM, detect_format
+
+if MSGPACK_AVAILABLE:
+    import msgpack
+
+
+# Lesegröße pro Schritt
+CHUNK_SIZE = 1024 * 1024
+
+# Obergrenze für einen einzelnen Datensatz (sonst: Datei defekt)
+MAX_RECORD_CHARS = 64 * 1024 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+# ============================================================
+# RECORD READER
+# ============================================================
+
+class RecordReader:
+    """
+    Iteriert über die Einträge einer Bilddatenbank-Datei ({id: datensatz})
+
+    JSON wird inkrementell geparst (raw_decode pro Eintrag auf einem
+    gleitenden Puffer), MessagePack über den Unpacker. Im Speicher liegt
+    jeweils nur der aktuelle Puffer und ein Datensatz.
+
+    Beispiel:
+        reader = RecordReader(path)
+        for image_id, image in reader:
+            print(image_id, reader.bytes_read, reader.size)
+    """
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.size = self.path.stat().st_size
+        self.bytes_read = 0
+
+        with open(self.path, "rb") as f:
+            self.format = detect_format(f.read(64))
+
+    def __iter__(self) -> Iterator[Tuple[str, dict]]:
+        if self.format == "msgpack":
+            return self._iter_msgpack()
+        return self._iter_json()
+
+    # ========================================================
+    # MESSAGEPACK
+    # ========================================================
+
+    def _iter_msgpack(self) -> Iterator[Tuple[str, dict]]:
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError(f"{self.path.name} ist im msgpack-Format, aber msgpack ist nicht installiert")
+
+        with open(self.path, "rb") as f:
+            unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False, read_size=self.chunk_size)
+
+            try:
+                count = unpacker.read_map_header()
+            except msgpack.UnpackValueError as e:
+                raise ValueError(f"{self.path.name}: keine Bilddatenbank (erwartet Map): {e}")
+
+            for _ in range(count):
+                key = unpacker.unpack()
+                value = unpacker.unpack()
+                self.bytes_read = f.tell()
+                yield key, value
+
+        self.bytes_read = self.size
+
+    # ========================================================
+    # JSON
+    # ========================================================
+
+    def _iter_json(self) -> Iterator[Tuple[str, dict]]:
+        with open(self.path, "rb") as f:
+            stream = _JsonStream(f, self.chunk_size, self)
+
+            if stream.peek() != "{":
+                raise ValueError(f"{self.path.name}: keine Bilddatenbank (erwartet JSON-Objekt)")
+            stream.pos += 1
+
+            first = True
+            while True:
+                char = stream.peek()
+
+                if char == "}":
+                    break
+                if not first:
+                    stream.expect(",")
+                    char = stream.peek()
+                if char != '"':
+                    stream.fail("Schlüssel erwartet")
+
+                key = stream.decode()
+                stream.expect(":")
+                stream.peek()
+                value = stream.decode()
+
+                first = False
+                yield key, value
+
+        self.bytes_read = self.size
+
+
+class _JsonStream:
+    """Gleitender Textpuffer über einer Binärdatei (UTF-8, optional mit BOM)"""
+
+    def __init__(self, f, chunk_size: int, reader: RecordReader):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.reader = reader
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+
+        # BOM überspringen
+        if self.f.read(len(UTF8_BOM)) != UTF8_BOM:
+            self.f.seek(0)
+
+    def fill(self, size: int = None) -> bool:
+        """Liest den nächsten Block (False am Dateiende)"""
+        raw = self.f.read(size or self.chunk_size)
+
+        if not raw:
+            self.eof = True
+            return False
+
+        self.reader.bytes_read += len(raw)
+
+        # Verarbeiteten Teil verwerfen
+        if self.pos:
+            self.consumed += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        self.buf += self.text.decode(raw)
+        return True
+
+    def peek(self) -> str:
+        """Nächstes Zeichen nach Leerraum ("" am Dateiende)"""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Überspringt ein erwartetes Trennzeichen"""
+        if self.peek() != char:
+            self.fail(f"'{char}' erwartet")
+        self.pos += 1
+
+    def decode(self):
+        """Dekodiert den nächsten JSON-Wert (lädt bei Bedarf nach)"""
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Unvollständig: Rest mindestens verdoppeln (sonst quadratisch bei großen Datensätzen)
+                pending = len(self.buf) - self.pos
+                if pending < MAX_RECORD_CHARS and self.fill(max(self.chunk_size, pending)):
+                    continue
+                self.fail("ungültiges oder unvollständiges JSON")
+
+            # Zahl am Pufferende könnte abgeschnitten sein
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def fail(self, message: str) -> None:
+        raise ValueError(f"{self.reader.path.name}: {message} (Zeichen {self.consumed + self.pos})")
@@ -0,0 +1,238 @@
+"""
+Interprocess - Dateisperren und Änderungsjournal für mehrere Worker-Prozesse
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .persistence import atomic_write
+from .records import to_plain
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+# ============================================================
+# FILE LOCK
+# ============================================================
+
+class FileLock:
+    """
+    Exklusive Sperre über Prozessgrenzen (msvcrt unter Windows, flock sonst)
+
+    Innerhalb eines Prozesses reentrant: nur die äußerste Anforderung
+    sperrt die Datei, Threads warten vorher auf einen RLock.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Sperrt (blocking=False: False, wenn ein anderer Prozess sperrt)"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+
+        if self._depth == 0:
+            try:
+                locked = self._lock_file(blocking)
+            except Exception:
+                self._thread_lock.release()
+                raise
+
+            if not locked:
+                self._thread_lock.release()
+                return False
+
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        """Gibt die Sperre frei"""
+        self._depth -= 1
+
+        if self._depth == 0:
+            self._unlock_file()
+
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def _lock_file(self, blocking: bool) -> bool:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a+b")
+
+        if os.name == "nt":
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    if not blocking:
+                        return False
+                    time.sleep(0.01)
+
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock_file(self) -> None:
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+
+# ============================================================
+# JOURNAL
+# ============================================================
+
+class Journal:
+    """
+    Gemeinsames Änderungsprotokoll (JSON Lines) aller Worker
+
+    Die erste Zeile enthält die Generation und die Änderungsversion der
+    Bilddatenbank beim Verdichten. Jede Änderung wird angehängt
+    und von den anderen Prozessen nachgelesen. Beim Verdichten werden die
+    Änderungen in die Datenbankdateien geschrieben und das Journal mit
+    neuer Generation geleert - Prozesse mit alter Generation laden dann
+    komplett neu.
+
+    Alle Lese-/Schreibzugriffe erfolgen unter einem gemeinsamen FileLock.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Kennung dieses Prozesses (PIDs können nach Neustart wiederkehren)
+        self.process_id = uuid.uuid4().hex[:12]
+
+        # Eigener Lesestand
+        self.generation: Optional[str] = None
+        self.version: Optional[int] = None
+        self.offset = 0
+        self._start = 0
+        self._signature: Tuple[int, int] = (-1, -1)
+
+    def changed(self) -> bool:
+        """Hat sich die Datei seit dem letzten Lesen geändert? (ohne Sperre, nur stat)"""
+        return self._stat() != self._signature
+
+    def read_new(self) -> Tuple[bool, List[dict]]:
+        """
+        Liest neue Einträge anderer Prozesse (Sperre gehalten)
+
+        Returns:
+            (reset, entries) - reset=True, wenn eine neue Generation
+            begonnen hat: eigener Stand ist verloren, komplett neu laden
+            und danach erneut read_new() aufrufen
+        """
+        generation = None
+
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                header = f.readline()
+                generation, version = self._parse_header(header)
+
+                if generation is not None and generation == self.generation:
+                    f.seek(self.offset)
+                    data = f.read()
+
+        if generation is None:
+            # Neu oder unlesbar: neue Generation beginnen
+            self.reset()
+            return True, []
+
+        if generation != self.generation:
+            self.generation = generation
+            self.version = version
+            self.offset = self._start = len(header)
+            self._signature = (-1, -1)
+            return True, []
+
+        # Nur vollständige Zeilen (ein Schreiber kann mitten in einer Zeile sein)
+        end = data.rfind(b"\n") + 1
+        entries = []
+
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print("⚠️ Ungültiger Journal-Eintrag übersprungen")
+                continue
+            if entry.get("process") != self.process_id:
+                entries.append(entry)
+
+        self.offset += end
+        self._signature = self._stat()
+        return False, entries
+
+    def append(self, entry: dict) -> None:
+        """Hängt einen Eintrag an (Sperre gehalten, vorher read_new aufrufen)"""
+        line = json.dumps({**entry, "process": self.process_id}, ensure_ascii=False, default=to_plain).encode("utf-8") + b"\n"
+
+        with open(self.path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.offset += len(line)
+        self._signature = self._stat()
+
+    def reset(self, version: Optional[int] = None) -> None:
+        """
+        Beginnt eine neue Generation (Sperre gehalten, Daten sind verdichtet)
+
+        Args:
+            version: Änderungsversion des verdichteten Stands (None = neues
+                Journal: aktuelle Zeit in ms, damit Versionen aus einem
+                früheren Serverlauf immer älter sind)
+        """
+        self.generation = uuid.uuid4().hex
+        self.version = int(time.time() * 1000) if version is None else version
+        header = json.dumps({"generation": self.generation, "version": self.version}).encode("utf-8") + b"\n"
+
+        atomic_write(self.path, lambda f: f.write(header), binary=True)
+
+        self.offset = self._start = len(header)
+        self._signature = self._stat()
+
+    def empty(self) -> bool:
+        """Enthält das Journal keine Einträge? (Stand des letzten Lesens)"""
+        return self.offset <= self._start
+
+    def size(self) -> int:
+        """Größe des Journals in Bytes (eigener Lesestand)"""
+        return self.offset
+
+    def _parse_header(self, header: bytes) -> Tuple[Optional[str], Optional[int]]:
+        try:
+            data = json.loads(header)
+            return data.get("generation"), data.get("version")
+        except (ValueError, AttributeError):
+            return None, None
+
+    def _stat(self) -> Tuple[int, int]:
+        try:
+            stat = self.path.stat()
+            return stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            return -1, -1
@@ -2,6 +2,7 @@
 FastAPI Hauptanwendung - Photo Software
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -20,7 +21,7 @@ ROOT_DIR = APP_DIR.parent
 
 # Imports
 from .config import Config
-from .database import Database
+from .database import Database, is_multi_process
 
 # ============================================================
 # LIFESPAN - Start/Stop Events
@@ -44,6 +45,11 @@ async def lifespan(app: FastAPI):
     app.state.db.load()
     print("Datenbank geladen ({} Bilder)".format(app.state.db.count_images()))
     
+    # Mehrere Worker: Änderungen der anderen Prozesse an eigene Clients melden
+    if is_multi_process(app.state.config):
+        app.state.db.add_listener(forward_changes(app, asyncio.get_running_loop()))
+        print("Multi-Prozess-Modus (gemeinsames Datenbank-Journal)")
+    
     # Ordner erstellen
     app.state.config.ensure_directories()
     print("Ordner erstellt/geprüft")
@@ -51,6 +57,11 @@ async def lifespan(app: FastAPI):
     # File Watcher
     app.state.watcher_running = False
     
+    # Druckwarteschlange (reiht offene Aufträge vom letzten Lauf wieder ein)
+    from .services.print_queue import get_print_queue
+    get_print_queue(app)
+    print("Druckwarteschlange gestartet")
+    
     # Module prüfen
     app.state.modules = check_modules()
     print("Module geprüft")
@@ -69,17 +80,64 @@ async def lifespan(app: FastAPI):
     # === SHUTDOWN ===
     print("\nServer wird beendet...")
     
-    # Datenbank speichern
+    # Offene Push-Streams (SSE) sauber beenden
+    from .services.events import close_event_streams
+    close_event_streams(app)
+    
+    # Kamera-Streams beenden (gibt die Kamera frei)
+    from .services.camera_feed import stop_camera_feeds
+    stop_camera_feeds(app)
+    
+    # Laufende Drucke abschließen, wartende bleiben gespeichert
+    app.state.print_queue.stop()
+    
+    # Datenbank speichern + Speicher-Thread beenden
     app.state.db.save()
+    app.state.db.close()
     print("Datenbank gespeichert")
     
-    # Config speichern
-    app.state.config.save()
-    print("Konfiguration gespeichert")
+    # Config speichern (mehrere Worker: nur über die API, sonst überschreibt
+    # jeder Worker beim Beenden die Änderungen der anderen)
+    if not is_multi_process(app.state.config):
+        app.state.config.save()
+        print("Konfiguration gespeichert")
     
     print("Auf Wiedersehen!")
 
 
+def forward_changes(app: FastAPI, loop: asyncio.AbstractEventLoop):
+    """
+    Listener für Datenbank-Änderungen anderer Worker
+    
+    Die Push-Clients (SSE) hängen an genau einem Worker - Änderungen aus
+    den anderen Prozessen werden deshalb hier erneut veröffentlicht.
+    """
+    from .services.events import get_broadcaster, compact_image
+    from .routes.admin import stop_local_watcher
+    
+    broadcaster = get_broadcaster(app)
+    
+    def on_change(op: str, entry: dict) -> None:
+        if op == "add":
+            broadcaster.publish("image_added", compact_image(entry["image"]))
+        elif op == "remove":
+            broadcaster.publish("image_removed", {"id": entry["id"]})
+        elif op == "clear":
+            broadcaster.publish("images_cleared", {})
+        elif op in ("import", "reload"):
+            broadcaster.publish("images_changed", {})
+        elif op == "settings":
+            broadcaster.publish("settings_changed", {
+                "station": entry["station"],
+                "type": entry["type"],
+                "settings": entry["value"] or app.state.config.get(entry["type"], {})
+            })
+        elif op == "notify" and entry.get("event") == "watcher_stop":
+            loop.call_soon_threadsafe(stop_local_watcher, app)
+    
+    return on_change
+
+
 def check_modules() -> dict:
     """Prüft verfügbare Module"""
     modules = {
@@ -201,7 +259,8 @@ def run():
         "app.main:app",
         host=host,
         port=port,
-        reload=debug
+        reload=debug,
+        timeout_graceful_shutdown=5
     )
 
 
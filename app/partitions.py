@@ -0,0 +1,181 @@
+"""
+Partitionen - Bilddatenbank aufgeteilt nach Aufnahmetag
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .persistence import write_json
+from .serializers import SERIALIZERS, Serializer, dump_file, load_file
+from .statistics import summarize
+
+
+MANIFEST_NAME = "manifest.json"
+
+# Dateiname für Bilder ohne lesbaren Timestamp
+UNDATED_NAME = "undatiert"
+
+
+# ============================================================
+# PARTITION STORE
+# ============================================================
+
+class PartitionStore:
+    """
+    Verwaltet die Tagesdateien (data/images/YYYY-MM-DD.<format>)
+
+    Das Manifest enthält pro Tag die Zähler (Bilder, Gesichter, Personen,
+    ...), den ersten/letzten Timestamp, den Dateinamen und die Bild-IDs.
+    Damit sind Statistiken und Seitengrößen bekannt und jedes Bild über
+    seine ID auffindbar, ohne die Tage zu laden.
+    """
+
+    def __init__(self, directory: Path, serializer: Serializer):
+        """
+        Args:
+            directory: Ordner der Tagesdateien
+            serializer: Format der Tagesdateien
+        """
+        self.directory = Path(directory)
+        self.serializer = serializer
+        self.manifest_path = self.directory / MANIFEST_NAME
+
+        # Tag ("" = ohne Timestamp) -> Zusammenfassung + Dateiname + IDs
+        self.days: Dict[str, dict] = {}
+
+        # Bild-ID -> Tag (aus den IDs im Manifest)
+        self._id_days: Dict[str, str] = {}
+
+    def exists(self) -> bool:
+        """Gibt es bereits partitionierte Daten?"""
+        return self.manifest_path.exists()
+
+    def load_manifest(self) -> None:
+        """Liest das Manifest"""
+        with open(self.manifest_path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+
+        self.clear()
+        for day, info in data.get("days", {}).items():
+            self.set_day(day, info)
+
+    def save_manifest(self) -> None:
+        """Schreibt das Manifest (atomar)"""
+        write_json(self.manifest_path, {
+            "version": 1,
+            "format": self.serializer.name,
+            "days": dict(sorted(self.days.items()))
+        })
+
+    def set_day(self, day: str, info: Optional[dict]) -> None:
+        """Übernimmt den Manifest-Eintrag eines Tages (None = Tag ist leer)"""
+        old = self.days.pop(day, None)
+
+        for image_id in (old or {}).get("ids", ()):
+            if self._id_days.get(image_id) == day:
+                del self._id_days[image_id]
+
+        if info is not None:
+            self.days[day] = info
+            for image_id in info.get("ids", ()):
+                self._id_days[image_id] = day
+
+    def clear(self) -> None:
+        """Vergisst alle Tage (Manifest wird beim nächsten Speichern neu geschrieben)"""
+        self.days = {}
+        self._id_days = {}
+
+    def find_day(self, image_id: str) -> Optional[str]:
+        """
+        Tag eines Bildes laut Manifest
+
+        Tage aus älteren Manifesten ohne IDs werden dafür gelesen.
+
+        Returns:
+            Tag oder None (Bild unbekannt)
+        """
+        day = self._id_days.get(image_id)
+        if day is not None:
+            return day
+
+        for day, info in list(self.days.items()):
+            if "ids" not in info and image_id in self.read_day(day):
+                return day
+
+        return None
+
+    def sorted_days(self, newest_first: bool = True, extra: Iterable[str] = ()) -> List[str]:
+        """
+        Tage in Sortierreihenfolge der Galerie
+
+        Tage ohne Timestamp ("") stehen bei "neueste zuerst" am Ende,
+        bei "älteste zuerst" am Anfang - wie im Index.
+
+        Args:
+            newest_first: Sortierrichtung
+            extra: Zusätzliche Tage (z.B. noch nicht gespeicherte)
+        """
+        days = sorted(set(self.days).union(extra), reverse=newest_first)
+
+        if "" in days and newest_first:
+            days.remove("")
+            days.append("")
+
+        return days
+
+    def count(self, day: str) -> int:
+        """Anzahl Bilder eines Tages laut Manifest"""
+        return self.days.get(day, {}).get("images", 0)
+
+    # ========================================================
+    # TAGESDATEIEN
+    # ========================================================
+
+    def read_day(self, day: str) -> Dict[str, dict]:
+        """Lädt alle Bilder eines Tages"""
+        info = self.days.get(day)
+
+        if info is None:
+            return {}
+
+        path = self.directory / info.get("file", self._filename(day))
+
+        if not path.exists():
+            print(f"⚠️ Partition fehlt: {path.name}")
+            return {}
+
+        return load_file(path)
+
+    def write_day(self, day: str, images: Dict[str, dict]) -> Optional[dict]:
+        """
+        Schreibt die Bilder eines Tages (leer = Datei löschen)
+
+        Returns:
+            Neuer Manifest-Eintrag oder None (Tag ist leer). Das Manifest
+            selbst wird vom Aufrufer aktualisiert und mit save_manifest()
+            geschrieben.
+        """
+        filename = self._filename(day)
+        info = None
+
+        if images:
+            dump_file(self.directory / filename, images, self.serializer)
+            info = {**summarize(images.values()), "file": filename, "ids": sorted(images)}
+
+        # Leerer Tag oder Formatwechsel: übrige Dateien des Tages entfernen
+        for serializer in SERIALIZERS.values():
+            other = f"{day or UNDATED_NAME}{serializer.suffix}"
+            if other != filename or not images:
+                self._unlink(other)
+
+        return info
+
+    def _filename(self, day: str) -> str:
+        return f"{day or UNDATED_NAME}{self.serializer.suffix}"
+
+    def _unlink(self, filename: str) -> None:
+        try:
+            (self.directory / filename).unlink()
+        except FileNotFoundError:
+            pass
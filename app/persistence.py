@@ -0,0 +1,225 @@
+"""
+Persistenz - Snapshot-Speicherung im Hintergrund mit Gruppen-Commit
+"""
+
+import os
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+# ============================================================
+# DATEI-HILFSFUNKTIONEN
+# ============================================================
+
+def atomic_write(path: Path, write: Callable[[Any], None], binary: bool = False) -> None:
+    """
+    Schreibt eine Datei atomar (temporäre Datei + Umbenennen)
+
+    Ein Absturz während des Schreibens hinterlässt entweder die alte
+    oder die neue Datei, nie eine halb geschriebene.
+
+    Args:
+        path: Zieldatei
+        write: Funktion, die in das geöffnete Dateiobjekt schreibt
+        binary: Binär- statt Textmodus
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.tmp")
+
+    if binary:
+        f = open(temp_path, "wb")
+    else:
+        f = open(temp_path, "w", encoding="utf-8")
+
+    with f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Speichert JSON atomar"""
+    atomic_write(path, lambda f: json.dump(data, f, indent=2, ensure_ascii=False))
+
+
+# ============================================================
+# SNAPSHOT WRITER
+# ============================================================
+
+class SnapshotWriter:
+    """
+    Speichert Datenbank-Dateien in einem Hintergrund-Thread
+
+    Schreibende Aufrufer markieren ein Ziel nur als geändert (mark) und
+    kehren sofort zurück. Der Thread wartet ein kurzes Zeitfenster ab,
+    fasst alle Änderungen darin zu einem Schreibvorgang zusammen, holt
+    sich einen Snapshot (kurz unter dem Lock der Datenbank) und
+    serialisiert ihn ohne Lock.
+
+    Jede Markierung liefert ein Ticket; wait() blockiert, bis ein
+    Schreibvorgang mit diesem Stand abgeschlossen ist.
+    """
+
+    def __init__(self, delay: float = 0.25):
+        """
+        Args:
+            delay: Sammelfenster in Sekunden
+        """
+        self.delay = delay
+
+        # Name -> (Pfad, Snapshot-Funktion, Schreibfunktion)
+        self._targets: Dict[str, tuple] = {}
+        self._requested: Dict[str, int] = {}
+        self._written: Dict[str, int] = {}
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # Statistiken
+        self.writes = 0
+        self.marks = 0
+        self.errors = 0
+        self.last_write_ms = 0.0
+
+    def register(
+        self,
+        name: str,
+        path: Path,
+        snapshot: Callable[[], Any],
+        write: Callable[[Path, Any], None] = write_json
+    ) -> None:
+        """
+        Meldet eine Datei an
+
+        Args:
+            name: Kurzname (z.B. "images")
+            path: Zieldatei
+            snapshot: Liefert eine Kopie der Daten (nimmt selbst den Lock)
+            write: Schreibt die Kopie in die Datei
+        """
+        with self._cond:
+            self._targets[name] = (path, snapshot, write)
+            self._requested.setdefault(name, 0)
+            self._written.setdefault(name, 0)
+
+    def mark(self, name: str) -> int:
+        """
+        Markiert eine Datei als geändert (blockiert nicht)
+
+        Returns:
+            Ticket für wait()
+        """
+        with self._cond:
+            self._requested[name] += 1
+            self.marks += 1
+            ticket = self._requested[name]
+
+            if self._thread is None:
+                # Thread erst bei der ersten Änderung starten (auch nach close())
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            else:
+                self._cond.notify_all()
+
+        return ticket
+
+    def wait(self, name: str, ticket: int, timeout: float = None) -> bool:
+        """
+        Wartet, bis der Stand eines Tickets auf der Platte ist
+
+        Darf nicht aufgerufen werden, während der Lock der Datenbank
+        gehalten wird (der Snapshot braucht ihn).
+
+        Returns:
+            True wenn geschrieben, False bei Timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written[name] >= ticket, timeout)
+
+    def flush(self) -> None:
+        """Schreibt alle ausstehenden Änderungen sofort (im aufrufenden Thread)"""
+        self._write_pending()
+
+    def close(self) -> None:
+        """Schreibt ausstehende Änderungen und beendet den Thread"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout=10)
+
+        with self._cond:
+            self._thread = None
+            self._stopped = False
+
+        self._write_pending()
+
+    def get_stats(self) -> dict:
+        """Statistiken (Markierungen vs. tatsächliche Schreibvorgänge)"""
+        return {
+            "marks": self.marks,
+            "writes": self.writes,
+            "errors": self.errors,
+            "last_write_ms": round(self.last_write_ms, 1),
+            "pending": [n for n in self._targets if self._requested[n] > self._written[n]]
+        }
+
+    # ========================================================
+    # HINTERGRUND-THREAD
+    # ========================================================
+
+    def _pending(self) -> bool:
+        return any(self._requested[n] > self._written[n] for n in self._targets)
+
+    def _run(self) -> None:
+        """Sammelt Änderungen und schreibt sie gebündelt"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._pending())
+
+                if self._stopped:
+                    return
+
+                # Sammelfenster: weitere Änderungen abwarten
+                deadline = time.monotonic() + self.delay
+                while not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        """Schreibt alle Dateien mit ausstehenden Änderungen"""
+        with self._write_lock:
+            for name in list(self._targets):
+                with self._cond:
+                    ticket = self._requested[name]
+                    if ticket <= self._written[name]:
+                        continue
+                    path, snapshot, write = self._targets[name]
+
+                start = time.perf_counter()
+                try:
+                    write(path, snapshot())
+                    self.writes += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Fehler beim Speichern von {path.name}: {e}")
+
+                self.last_write_ms = (time.perf_counter() - start) * 1000
+
+                with self._cond:
+                    self._written[name] = max(self._written[name], ticket)
+                    self._cond.notify_all()
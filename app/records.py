@@ -0,0 +1,188 @@
+"""
+Records - Kompakte Darstellung der Bild-Datensätze im Speicher
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+
+# Felder eines Bild-Datensatzes (Reihenfolge wie Database.add_image)
+IMAGE_FIELDS = (
+    "id", "filename", "original_path", "processed_path", "output_path",
+    "thumbnails", "timestamp", "faces", "face_count", "face_encodings",
+    "persons", "person_count", "clothing_colors", "width", "height", "created_at"
+)
+
+# Float-Listen ab dieser Länge werden als array('d') gehalten (Face-Encodings)
+MIN_ARRAY_LENGTH = 8
+
+# Kurze Strings (Farbnamen, Schlüssel, "hell"/"dunkel", ...) werden interniert
+MAX_INTERN_LENGTH = 32
+
+
+# ============================================================
+# EINFRIEREN / AUFTAUEN
+# ============================================================
+
+class _Shape(tuple):
+    """Schlüssel eines eingefrorenen dicts (geteilt zwischen allen gleich aufgebauten dicts)"""
+    __slots__ = ()
+
+
+_shapes: Dict[Tuple[str, ...], _Shape] = {}
+
+
+def _shape(keys: Tuple[str, ...]) -> _Shape:
+    shape = _shapes.get(keys)
+    if shape is None:
+        shape = _shapes[keys] = _Shape(sys.intern(k) if isinstance(k, str) else k for k in keys)
+    return shape
+
+
+def freeze(value: Any) -> Any:
+    """
+    Kompakte, unveränderliche Form eines JSON-Werts
+
+    - dict  -> (shape, wert1, wert2, ...) mit geteiltem Schlüssel-Tupel
+    - list  -> tuple, reine Float-Listen -> array('d')
+    - str   -> interniert (wenn kurz)
+    """
+    if isinstance(value, dict):
+        return (_shape(tuple(value)),) + tuple(freeze(v) for v in value.values())
+
+    if isinstance(value, list):
+        if len(value) >= MIN_ARRAY_LENGTH and all(type(v) is float for v in value):
+            return array("d", value)
+        return tuple(freeze(v) for v in value)
+
+    if isinstance(value, str) and len(value) <= MAX_INTERN_LENGTH:
+        return sys.intern(value)
+
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Wandelt eine eingefrorene Form zurück in dict/list"""
+    cls = type(value)
+
+    if cls is tuple:
+        if value and type(value[0]) is _Shape:
+            return dict(zip(value[0], map(thaw, value[1:])))
+        return list(map(thaw, value))
+
+    if cls is array:
+        return value.tolist()
+
+    return value
+
+
+# ============================================================
+# IMAGE RECORD
+# ============================================================
+
+class ImageRecord(Mapping):
+    """
+    Bild-Datensatz mit __slots__ statt dict
+
+    Verschachtelte Daten (Gesichter, Personen, Farben) liegen eingefroren
+    vor, Face-Encodings als array('d'). Lesen funktioniert wie bei einem
+    dict (get, [], in, **); echte dicts entstehen erst in to_dict(), also
+    wenn ein Datensatz ausgegeben oder gespeichert wird.
+
+    Datensätze werden nicht verändert, nur ersetzt.
+    """
+
+    __slots__ = IMAGE_FIELDS + ("_extra",)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ImageRecord":
+        """Erzeugt einen Datensatz aus einem dict (z.B. aus der Datei)"""
+        record = cls.__new__(cls)
+        extra = None
+
+        for key, value in data.items():
+            if key in _FIELD_SET:
+                object.__setattr__(record, key, freeze(value))
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = freeze(value)
+
+        object.__setattr__(record, "_extra", extra)
+        return record
+
+    def to_dict(self) -> dict:
+        """Vollständiges dict (für API-Antworten und Speichern)"""
+        return {key: thaw(value) for key, value in self._raw_items()}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            try:
+                return thaw(getattr(self, key))
+            except AttributeError:
+                return default
+
+        if self._extra and key in self._extra:
+            return thaw(self._extra[key])
+
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self._raw_items())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._raw_items())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ImageRecord ist unveränderlich")
+
+    def __repr__(self) -> str:
+        return f"ImageRecord({self.get('id')!r})"
+
+    def _raw_items(self) -> Iterator[Tuple[str, Any]]:
+        for key in IMAGE_FIELDS:
+            try:
+                yield key, getattr(self, key)
+            except AttributeError:
+                pass
+
+        if self._extra:
+            yield from self._extra.items()
+
+
+_FIELD_SET = frozenset(IMAGE_FIELDS)
+
+_MISSING = object()
+
+
+def compact(data: Any) -> Any:
+    """ImageRecord für ein dict (bereits kompakte Datensätze bleiben unverändert)"""
+    if isinstance(data, ImageRecord) or not isinstance(data, dict):
+        return data
+    return ImageRecord.from_dict(data)
+
+
+def compact_all(images: Dict[str, dict]) -> Dict[str, ImageRecord]:
+    """Wandelt {id: dict} um, die dicts werden dabei schrittweise freigegeben"""
+    result = {}
+    for key in list(images):
+        result[key] = compact(images.pop(key))
+    return result
+
+
+def to_plain(obj: Any) -> Any:
+    """default-Hook für Serializer: ImageRecord -> dict"""
+    if isinstance(obj, ImageRecord):
+        return obj.to_dict()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
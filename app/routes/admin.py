@@ -12,6 +12,10 @@ from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
+from ..services.events import get_broadcaster, compact_image
+from ..database import DETAIL_FIELDS, is_multi_process
+from ..interprocess import FileLock
+
 # Router erstellen
 router = APIRouter()
 
@@ -99,6 +103,7 @@ async def get_admin_status(request: Request):
         "modules": request.app.state.modules,
         "watcher_running": getattr(request.app.state, 'watcher_running', False),
         "statistics": db.get_statistics(),
+        "persistence": db.get_persistence_stats(),
         "uptime_formatted": uptime_formatted,
         "paths": {
             "input": str(config.get_path("input")),
@@ -145,6 +150,7 @@ async def save_settings(request: Request, station: str, settings_type: str):
         success = db.save_settings(station, settings_type, data)
         
         if success:
+            _publish_settings(request, station, settings_type)
             return {"success": True, "message": "Einstellungen gespeichert"}
         else:
             return {"success": False, "message": "Speichern fehlgeschlagen"}
@@ -160,6 +166,9 @@ async def delete_settings(request: Request, station: str, settings_type: str):
     
     success = db.delete_settings(station, settings_type)
     
+    if success:
+        _publish_settings(request, station, settings_type)
+    
     return {
         "success": success,
         "message": "Einstellungen gelöscht" if success else "Keine Einstellungen gefunden"
@@ -185,6 +194,9 @@ async def start_processing(request: Request):
         
         result = processor.process_all_pending()
         
+        if result["processed"]:
+            get_broadcaster(request.app).publish("images_changed", {"processed": result["processed"]})
+        
         return {
             "success": True,
             "processed": result["processed"],
@@ -220,6 +232,7 @@ async def process_single(request: Request):
         result = processor.process_image(image_path, station)
         
         if result:
+            get_broadcaster(request.app).publish("image_added", compact_image(result))
             return {"success": True, "result": result}
         else:
             return {"success": False, "error": "Verarbeitung fehlgeschlagen"}
@@ -261,11 +274,20 @@ async def start_watcher(request: Request):
     if getattr(request.app.state, 'watcher_running', False):
         return {"success": False, "message": "Watcher läuft bereits"}
     
+    # Mehrere Worker: nur einer darf den Eingangsordner überwachen
+    lock = _watcher_lock(request.app)
+    if lock is not None and not lock.acquire(blocking=False):
+        return {"success": False, "message": "Watcher läuft bereits in einem anderen Worker"}
+    
     try:
         analyzer = ImageAnalyzer(config)
         processor = ImageProcessor(config, db, analyzer)
         watcher = FileWatcher(config, processor)
         
+        # Neue Bilder an verbundene Anzeigen pushen
+        broadcaster = get_broadcaster(request.app)
+        watcher.on_new_image = lambda result: broadcaster.publish("image_added", compact_image(result))
+        
         success = watcher.start()
         
         if success:
@@ -273,34 +295,84 @@ async def start_watcher(request: Request):
             request.app.state.watcher_running = True
             return {"success": True, "message": "Watcher gestartet"}
         else:
+            if lock is not None:
+                lock.release()
             return {"success": False, "message": "Watcher konnte nicht gestartet werden"}
             
     except Exception as e:
+        if lock is not None:
+            lock.release()
         return {"success": False, "error": str(e)}
 
 
 @router.post("/api/watcher/stop")
 async def stop_watcher(request: Request):
     """Stoppt Ordner-Überwachung"""
-    watcher = getattr(request.app.state, 'watcher', None)
-    
-    if watcher:
-        watcher.stop()
-        request.app.state.watcher_running = False
+    if stop_local_watcher(request.app):
         return {"success": True, "message": "Watcher gestoppt"}
     
+    if _watcher_elsewhere(request.app):
+        # Läuft in einem anderen Worker: Stopp über das Datenbank-Journal
+        request.app.state.db.notify("watcher_stop")
+        return {"success": True, "message": "Watcher wird im anderen Worker gestoppt"}
+    
     return {"success": False, "message": "Kein Watcher aktiv"}
 
 
 @router.post("/api/watcher/toggle")
 async def toggle_watcher(request: Request):
     """Wechselt Watcher-Status"""
-    if getattr(request.app.state, 'watcher_running', False):
+    if getattr(request.app.state, 'watcher_running', False) or _watcher_elsewhere(request.app):
         return await stop_watcher(request)
     else:
         return await start_watcher(request)
 
 
+def stop_local_watcher(app) -> bool:
+    """Stoppt den Watcher dieses Prozesses (False, wenn keiner läuft)"""
+    watcher = getattr(app.state, 'watcher', None)
+    
+    if not watcher or not getattr(app.state, 'watcher_running', False):
+        return False
+    
+    watcher.stop()
+    app.state.watcher_running = False
+    
+    lock = _watcher_lock(app)
+    if lock is not None:
+        lock.release()
+    
+    return True
+
+
+def _watcher_lock(app) -> Optional[FileLock]:
+    """Prozessübergreifende Sperre für den Watcher (nur bei mehreren Workern)"""
+    config = app.state.config
+    
+    if not is_multi_process(config):
+        return None
+    
+    lock = getattr(app.state, 'watcher_lock', None)
+    if lock is None:
+        lock = app.state.watcher_lock = FileLock(config.root_dir / "data" / "watcher.lock")
+    
+    return lock
+
+
+def _watcher_elsewhere(app) -> bool:
+    """Läuft der Watcher in einem anderen Worker-Prozess?"""
+    lock = _watcher_lock(app)
+    
+    if lock is None or getattr(app.state, 'watcher_running', False):
+        return False
+    
+    if lock.acquire(blocking=False):
+        lock.release()
+        return False
+    
+    return True
+
+
 # ============================================================
 # BILDER API
 # ============================================================
@@ -310,21 +382,40 @@ async def get_images(
     request: Request,
     limit: int = 50,
     offset: int = 0,
-    station: str = None
+    station: str = None,
+    fields: str = None,
+    cursor: str = None
 ):
-    """Gibt alle verarbeiteten Bilder zurück"""
+    """
+    Gibt alle verarbeiteten Bilder zurück
+    
+    Args:
+        station: Nur Bilder mit diesem Teilstring im Dateinamen
+        fields: Kommagetrennte Feldliste (Standard: alle außer Face-Encodings)
+        cursor: next_cursor der vorherigen Seite (ersetzt offset)
+    """
     db = request.app.state.db
     
-    images = db.get_all_images(limit=limit, offset=offset)
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DETAIL_FIELDS)
     
-    # Nach Station filtern
-    if station:
-        images = [img for img in images if station.lower() in img.get("filename", "").lower()]
+    # Stations-Filter vor der Pagination (über den Index)
+    try:
+        result = db.query_images(
+            search=station,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            fields=projection
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "success": True,
-        "count": len(images),
-        "images": images
+        "count": len(result["images"]),
+        "total": result["total"],
+        "next_cursor": result["next_cursor"],
+        "images": result["images"]
     }
 
 
@@ -335,6 +426,9 @@ async def delete_image(request: Request, image_id: str):
     
     success = db.delete_image(image_id)
     
+    if success:
+        get_broadcaster(request.app).publish("image_removed", {"id": image_id})
+    
     return {
         "success": success,
         "message": "Bild gelöscht" if success else "Bild nicht gefunden"
@@ -348,6 +442,8 @@ async def delete_all_images(request: Request):
     
     count = db.clear_images()
     
+    get_broadcaster(request.app).publish("images_cleared", {})
+    
     return {
         "success": True,
         "deleted": count,
@@ -363,6 +459,7 @@ async def delete_all_images(request: Request):
 async def get_printers(request: Request):
     """Gibt Drucker-Konfiguration zurück"""
     from ..services.printer import PrinterManager
+    from ..services.print_queue import get_print_queue
     
     config = request.app.state.config
     db = request.app.state.db
@@ -373,7 +470,8 @@ async def get_printers(request: Request):
         "success": True,
         "enabled": manager.enabled,
         "printers": manager.get_all_printers(),
-        "stats": manager.get_stats()
+        "stats": manager.get_stats(),
+        "queue": get_print_queue(request.app).get_stats()
     }
 
 
@@ -406,7 +504,9 @@ async def update_printer(request: Request, printer_type: str):
             text_font_name=data.get("text_font_name"),
             text_size=data.get("text_size"),
             text_color=data.get("text_color"),
-            enable_print_date=data.get("enable_print_date")
+            enable_print_date=data.get("enable_print_date"),
+            photos_per_sheet=data.get("photos_per_sheet"),
+            sheet_timeout=data.get("sheet_timeout")
         )
         
         if success:
@@ -445,7 +545,7 @@ async def test_printer(request: Request, printer_type: str):
     if not printer_info:
         return {"success": False, "message": "Unbekannter Drucker-Typ"}
     
-    result = PrinterManager.test_printer(printer_info["name"])
+    result = manager.test_printer(printer_info["name"])
     
     return result
 
@@ -459,13 +559,18 @@ async def get_camera_info(request: Request):
     """Gibt Kamera-Informationen zurück"""
     from ..services.camera import CameraHandler
     
+    from ..services.camera_feed import get_camera_feed
+    
     config = request.app.state.config
     camera = CameraHandler(config)
+    feed = get_camera_feed(request.app)
     
     return {
         "success": True,
         "info": camera.get_info(),
-        "available_cameras": CameraHandler.list_cameras()
+        "stream": feed.get_stats(),
+        # Laufender Feed hält die Kamera - Suche würde sie kurz öffnen
+        "available_cameras": [feed.device_id] if feed.is_running() else CameraHandler.list_cameras()
     }
 
 
@@ -488,6 +593,12 @@ async def update_camera_settings(request: Request):
         
         config.save()
         
+        # Laufende Streams mit neuen Einstellungen neu aufbauen lassen
+        # (wartet auf die Capture-Threads - nicht im Event-Loop)
+        from starlette.concurrency import run_in_threadpool
+        from ..services.camera_feed import stop_camera_feeds
+        await run_in_threadpool(stop_camera_feeds, request.app)
+        
         return {"success": True, "message": "Kamera-Einstellungen gespeichert"}
         
     except Exception as e:
@@ -498,12 +609,16 @@ async def update_camera_settings(request: Request):
 async def test_camera(request: Request):
     """Macht Testaufnahme"""
     from ..services.camera import CameraHandler
+    from ..services.camera_feed import get_camera_feed
+    from starlette.concurrency import run_in_threadpool
+    import base64
     
-    config = request.app.state.config
-    camera = CameraHandler(config)
+    # Über den gemeinsamen Feed - die Kamera kann gerade gestreamt werden
+    captured = await run_in_threadpool(get_camera_feed(request.app).capture, "latest")
+    image_base64 = None
     
-    image_base64 = camera.capture_base64()
-    camera.close()
+    if captured is not None:
+        image_base64 = base64.b64encode(CameraHandler.encode_jpeg(captured[1])).decode('utf-8')
     
     if image_base64:
         return {
@@ -625,7 +740,32 @@ async def update_config(request: Request):
         
         config.save()
         
+        if any(key.split(".")[0] == "carousel" for key in data):
+            get_broadcaster(request.app).publish(
+                "settings_changed",
+                {"station": "config", "type": "carousel", "settings": config.get("carousel", {})}
+            )
+        
         return {"success": True, "message": "Konfiguration gespeichert"}
         
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+
+# ============================================================
+# HILFSFUNKTIONEN
+# ============================================================
+
+def _publish_settings(request: Request, station: str, settings_type: str) -> None:
+    """Meldet geänderte Einstellungen an verbundene Anzeigen"""
+    settings = request.app.state.db.get_settings(station, settings_type)
+
+    # Gleiche Fallback-Logik wie get_settings
+    if not settings:
+        settings = request.app.state.config.get(settings_type, {})
+
+    get_broadcaster(request.app).publish("settings_changed", {
+        "station": station,
+        "type": settings_type,
+        "settings": settings
+    })
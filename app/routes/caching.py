@@ -0,0 +1,41 @@
+"""
+HTTP-Caching - ETag / Conditional Requests für API-Antworten
+"""
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Prüft If-None-Match gegen ein ETag
+
+    Args:
+        request: Anfrage
+        etag: ETag der aktuellen Antwort (mit Anführungszeichen)
+
+    Returns:
+        True wenn der Client die aktuelle Version bereits hat
+    """
+    if_none_match = request.headers.get("if-none-match")
+
+    if not if_none_match:
+        return False
+
+    # Schwache Vergleichsfunktion (RFC 9110): W/ ignorieren
+    current = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == current:
+            return True
+
+    return False
+
+
+def not_modified(etag: str, headers: dict = None) -> Response:
+    """304-Antwort ohne Inhalt"""
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
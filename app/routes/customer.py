@@ -8,12 +8,13 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Form
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 
-# Services importieren (für Background Tasks)
-from ..services.printer import PrinterManager
+from .caching import etag_matches, not_modified
+from ..database import SUMMARY_FIELDS, DETAIL_FIELDS
 
 # Router erstellen
 router = APIRouter()
@@ -22,6 +23,12 @@ router = APIRouter()
 templates_path = Path(__file__).parent.parent / "templates"
 templates = Jinja2Templates(directory=str(templates_path))
 
+# Browser muss bei jeder Abfrage per ETag revalidieren
+CAROUSEL_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+
+# Felder, die das Karussell braucht
+CAROUSEL_FIELDS = ("id", "filename", "timestamp", "output_path", "face_count", "person_count")
+
 
 # ============================================================
 # KUNDEN SEITEN
@@ -34,7 +41,7 @@ async def customer_page(request: Request):
     db = request.app.state.db
     
     # Letzte Bilder für Karussell
-    images = db.get_all_images(limit=50)
+    images = db.get_all_images(limit=50, fields=SUMMARY_FIELDS)
     
     # Carousel Settings aus Config holen
     carousel_settings = config.get("carousel", {})
@@ -63,9 +70,16 @@ async def search_page(request: Request):
 @router.get("/api/carousel/images")
 async def get_carousel_images(
     request: Request,
-    limit: int = 50
+    limit: int = 50,
+    since: Optional[int] = None
 ):
-    """Gibt Bilder für Karussell zurück"""
+    """
+    Gibt Bilder für Karussell zurück
+
+    Mit since=<version> werden nur die seit dieser Version hinzugefügten
+    Bilder und gelöschten IDs geliefert (delta=true). Ist kein Delta
+    möglich, kommt die vollständige Liste (delta=false).
+    """
     db = request.app.state.db
     config = request.app.state.config
 
@@ -76,27 +90,85 @@ async def get_carousel_images(
     # Limit auf max_images beschränken
     effective_limit = min(limit, max_images)
 
-    images = db.get_all_images(limit=effective_limit)
+    # Unveränderte Abfragen mit 304 beantworten
+    version = db.get_version()
+    settings_stamp = carousel_settings.get("updated_at", "") if carousel_settings else ""
+    etag = f'W/"{version}-{effective_limit}-{since}-{settings_stamp}"'
+
+    if etag_matches(request, etag):
+        return not_modified(etag, CAROUSEL_CACHE_HEADERS)
+
+    headers = {"ETag": etag, **CAROUSEL_CACHE_HEADERS}
+
+    changes = db.get_changes_since(since) if since is not None else None
+
+    if changes is not None:
+        added = db.get_images(changes["added"], fields=CAROUSEL_FIELDS)
+        added.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+
+        return JSONResponse({
+            "success": True,
+            "version": version,
+            "delta": True,
+            "added": added[:effective_limit],
+            "removed": changes["removed"],
+            "settings": carousel_settings or {}
+        }, headers=headers)
 
     # Nur relevante Daten für Karussell
-    carousel_images = []
-    for img in images:
-        carousel_images.append({
-            "id": img.get("id"),
-            "filename": img.get("filename"),
-            "timestamp": img.get("timestamp"),
-            "output_path": img.get("output_path"),
-            "face_count": img.get("face_count", 0),
-            "person_count": img.get("person_count", 0),
-            "clothing_colors": img.get("clothing_colors", [])
-        })
+    carousel_images = db.get_all_images(limit=effective_limit, fields=CAROUSEL_FIELDS)
 
-    return {
+    return JSONResponse({
         "success": True,
+        "version": version,
+        "delta": False,
         "count": len(carousel_images),
         "images": carousel_images,
         "settings": carousel_settings or {}
-    }
+    }, headers=headers)
+
+
+@router.get("/api/carousel/events")
+async def carousel_events(request: Request):
+    """
+    Push-Kanal für Karussell-Anzeigen (Server-Sent Events)
+
+    Ereignisse: image_added, image_removed, images_cleared, images_changed,
+    settings_changed, resync
+    """
+    from ..services.events import get_broadcaster
+
+    broadcaster = get_broadcaster(request.app)
+    subscription = broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            # Reconnect-Intervall für den Browser
+            yield "retry: 3000\n\n"
+
+            while True:
+                if await request.is_disconnected():
+                    break
+
+                message = await subscription.get(timeout=15)
+
+                if message is None:
+                    # Server fährt herunter
+                    break
+
+                # Leere Nachricht = Keepalive-Kommentar
+                yield message or ": ping\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @router.get("/api/carousel/settings")
@@ -116,77 +188,199 @@ async def get_carousel_settings(request: Request):
 
 @router.get("/api/camera/stream")
 async def camera_stream(request: Request):
-    """MJPEG Kamera-Stream"""
-    from ..services.camera import CameraHandler
+    """MJPEG Kamera-Stream (alle Clients teilen sich einen Aufnahme-Thread)"""
+    from ..services.camera_feed import get_camera_feed
+    
+    feed = get_camera_feed(request.app)
+    subscription = feed.subscribe()
+    
+    async def frames():
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
+                
+                frame = await subscription.get(timeout=5)
+                
+                if frame is None:
+                    # Kamera beendet oder Server fährt herunter
+                    break
+                if not frame:
+                    continue
+                
+                yield (
+                    b'--frame\r\n'
+                    b'Content-Type: image/jpeg\r\n\r\n' +
+                    frame +
+                    b'\r\n'
+                )
+        finally:
+            feed.unsubscribe(subscription)
     
-    config = request.app.state.config
-    camera = CameraHandler(config)
+    return StreamingResponse(
+        frames(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/api/camera/faces")
+async def camera_faces(request: Request):
+    """
+    Gesichter in der Live-Vorschau (Server-Sent Events, neben dem MJPEG-Stream)
+    
+    Ereignisse: faces (normierte Boxen [x, y, w, h]), auto_capture
+    (capture_id eines automatisch aufgenommenen Fotos, für die Suche oder
+    /api/camera/capture/{capture_id})
+    """
+    from ..services.camera_feed import get_camera_feed
+    
+    feed = get_camera_feed(request.app)
+    
+    if not feed.detection_available():
+        return JSONResponse({"success": False, "message": "Live-Gesichtserkennung nicht verfügbar"}, status_code=503)
+    
+    subscription = feed.subscribe_faces()
+    
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            
+            while True:
+                if await request.is_disconnected():
+                    break
+                
+                message = await subscription.get(timeout=15)
+                
+                if message is None:
+                    break
+                
+                yield message or ": ping\n\n"
+        finally:
+            feed.unsubscribe_faces(subscription)
     
     return StreamingResponse(
-        camera.generate_frames(),
-        media_type="multipart/x-mixed-replace; boundary=frame"
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.get("/api/camera/capture/{capture_id}")
+async def get_captured_photo(request: Request, capture_id: str):
+    """Gibt eine (automatische) Aufnahme als JPEG zurück"""
+    from ..services.camera import CameraHandler
+    from ..services.camera_feed import get_camera_feed
+    
+    frame = get_camera_feed(request.app).captured(capture_id)
+    
+    if frame is None:
+        raise HTTPException(status_code=404, detail="Aufnahme nicht mehr vorhanden")
+    
+    quality = request.app.state.config.get("camera.capture_quality", 90)
+    
+    return Response(
+        content=CameraHandler.encode_jpeg(frame, quality),
+        media_type="image/jpeg",
+        headers={"Cache-Control": "no-store"}
     )
 
 
 @router.post("/api/camera/capture")
-async def capture_photo(request: Request):
-    """Nimmt Foto für Suche auf"""
+async def capture_photo(request: Request, mode: str = None):
+    """
+    Nimmt Foto für Suche auf (sofort aus dem laufenden Kamera-Feed)
+    
+    mode: "latest" (neuester Frame) oder "sharpest" (schärfster der
+    letzten Frames), Standard camera.capture_mode. Die capture_id kann
+    statt des Bildes an die Suche übergeben werden.
+    """
     from ..services.camera import CameraHandler
+    from ..services.camera_feed import get_camera_feed
+    import base64
     
     config = request.app.state.config
-    camera = CameraHandler(config)
+    feed = get_camera_feed(request.app)
     
-    image_base64 = camera.capture_base64()
-    camera.close()
+    # Wartet nur, wenn die Kamera erst geöffnet wird
+    captured = await run_in_threadpool(feed.capture, mode)
     
-    if image_base64:
-        return {
-            "success": True,
-            "image": f"data:image/jpeg;base64,{image_base64}",
-            "image_data": image_base64
-        }
-    else:
+    if captured is None:
         return {"success": False, "message": "Aufnahme fehlgeschlagen"}
+    
+    capture_id, frame = captured
+    image_bytes = CameraHandler.encode_jpeg(frame, config.get("camera.capture_quality", 90))
+    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+    
+    return {
+        "success": True,
+        "image": f"data:image/jpeg;base64,{image_base64}",
+        "image_data": image_base64,
+        "capture_id": capture_id
+    }
 
 
 # ============================================================
 # SUCH API
 # ============================================================
 
+def _face_encoding(request: Request, data: dict) -> Optional[list]:
+    """
+    Face Encoding für die Suche
+    
+    Mit capture_id wird der gemerkte Kamera-Frame direkt verwendet (ohne
+    JPEG/Base64-Umweg), sonst das übermittelte Base64-Bild.
+    """
+    from ..services.analyzer import ImageAnalyzer
+    import base64
+    
+    analyzer = ImageAnalyzer(request.app.state.config)
+    capture_id = data.get("capture_id")
+    
+    if capture_id:
+        from ..services.camera_feed import get_camera_feed
+        
+        frame = get_camera_feed(request.app).captured(capture_id)
+        if frame is not None:
+            return analyzer.get_face_encoding_from_array(frame, bgr=True)
+    
+    image_data = data.get("image")
+    if not image_data:
+        return None
+    
+    # Base64 dekodieren und temporär speichern
+    if image_data.startswith("data:"):
+        image_data = image_data.split(",")[1]
+    
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
+        f.write(base64.b64decode(image_data))
+        temp_path = f.name
+    
+    try:
+        return analyzer.get_face_encoding(temp_path)
+    finally:
+        os.unlink(temp_path)
+
+
 @router.post("/api/search/face")
 async def search_by_face(request: Request):
     """Sucht nach Gesicht"""
     from ..services.searcher import ImageSearcher
-    from ..services.analyzer import ImageAnalyzer
-    import base64
-    import tempfile
     
     config = request.app.state.config
     db = request.app.state.db
     
     try:
         data = await request.json()
-        image_data = data.get("image")  # Base64 encoded
         
-        if not image_data:
+        if not data.get("image") and not data.get("capture_id"):
             return {"success": False, "message": "Kein Bild übermittelt"}
         
-        # Base64 dekodieren und temporär speichern
-        if image_data.startswith("data:"):
-            image_data = image_data.split(",")[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
-            f.write(image_bytes)
-            temp_path = f.name
-        
         # Face Encoding extrahieren
-        analyzer = ImageAnalyzer(config)
-        encoding = analyzer.get_face_encoding(temp_path)
-        
-        # Temp-Datei löschen
-        os.unlink(temp_path)
+        encoding = _face_encoding(request, data)
         
         if not encoding:
             return {
@@ -240,9 +434,6 @@ async def search_by_color(request: Request):
 async def search_combined(request: Request):
     """Kombinierte Suche (Gesicht + Farben)"""
     from ..services.searcher import ImageSearcher
-    from ..services.analyzer import ImageAnalyzer
-    import base64
-    import tempfile
     
     config = request.app.state.config
     db = request.app.state.db
@@ -257,19 +448,8 @@ async def search_combined(request: Request):
         encoding = None
         
         # Face Encoding extrahieren falls Bild vorhanden
-        if image_data:
-            if image_data.startswith("data:"):
-                image_data = image_data.split(",")[1]
-            
-            image_bytes = base64.b64decode(image_data)
-            
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
-                f.write(image_bytes)
-                temp_path = f.name
-            
-            analyzer = ImageAnalyzer(config)
-            encoding = analyzer.get_face_encoding(temp_path)
-            os.unlink(temp_path)
+        if image_data or data.get("capture_id"):
+            encoding = _face_encoding(request, data)
         
         # Suche durchführen
         searcher = ImageSearcher(config, db)
@@ -296,11 +476,16 @@ async def search_combined(request: Request):
 # ============================================================
 
 @router.post("/api/print")
-async def print_image(background_tasks: BackgroundTasks, request: Request):
-    """Druckt ein Bild"""
-    from ..services.printer import PrinterManager
-
-    config = request.app.state.config
+async def print_image(request: Request):
+    """
+    Nimmt einen Druckauftrag an
+    
+    Der Auftrag ist gespeichert, bevor die Antwort kommt, und wird von der
+    Druckwarteschlange gedruckt. Status: /api/print/jobs/{job_id} oder
+    /api/print/events.
+    """
+    from ..services.print_queue import get_print_queue
+    
     db = request.app.state.db
 
     try:
@@ -324,20 +509,18 @@ async def print_image(background_tasks: BackgroundTasks, request: Request):
         if not image_path or not Path(image_path).exists():
             return {"success": False, "message": f"Bilddatei nicht gefunden: {image_path}"}
 
-        # Druckauftrag im Hintergrund starten
-        background_tasks.add_task(
-            perform_print_job,
-            config,
-            db,
-            image_path,
-            printer_type,
-            copies
-        )
+        # Speichern + einreihen (wartet auf die Platte)
+        print_queue = get_print_queue(request.app)
+        result = await run_in_threadpool(print_queue.submit, image_id, image_path, printer_type, copies)
+
+        if not result["success"]:
+            return result
 
-        # Sofortige Rückmeldung
         return {
             "success": True,
             "message": "Druckauftrag wurde gestartet",
+            "job_id": result["job"]["id"],
+            "position": result["position"],
             "printer_type": printer_type,
             "copies": copies
         }
@@ -346,19 +529,52 @@ async def print_image(background_tasks: BackgroundTasks, request: Request):
         return {"success": False, "error": str(e)}
 
 
-def perform_print_job(config, db, image_path: str, printer_type: str, copies: int):
-    """Führt Druckauftrag im Hintergrund aus"""
-    try:
-        manager = PrinterManager(config, db)
-        result = manager.print_image(image_path, printer_type, copies)
+@router.get("/api/print/jobs/{job_id}")
+async def get_print_job(request: Request, job_id: str):
+    """Status eines Druckauftrags (pending, printing, completed, failed)"""
+    from ..services.print_queue import get_print_queue
+    
+    job = get_print_queue(request.app).get_job(job_id)
+    
+    if job is None:
+        return JSONResponse({"success": False, "message": "Druckauftrag nicht gefunden"}, status_code=404)
+    
+    return {"success": True, "job": job}
 
-        if result["success"]:
-            print(f"✅ Hintergrund-Druck erfolgreich: {Path(image_path).name}")
-        else:
-            print(f"❌ Hintergrund-Druck fehlgeschlagen: {result.get('error', 'Unbekannter Fehler')}")
 
-    except Exception as e:
-        print(f"❌ Hintergrund-Druck Fehler: {e}")
+@router.get("/api/print/events")
+async def print_events(request: Request):
+    """Statusänderungen aller Druckaufträge (Server-Sent Events, Ereignis print_job)"""
+    from ..services.print_queue import get_print_queue
+    
+    print_queue = get_print_queue(request.app)
+    subscription = print_queue.events.subscribe()
+    
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            
+            while True:
+                if await request.is_disconnected():
+                    break
+                
+                message = await subscription.get(timeout=15)
+                
+                if message is None:
+                    break
+                
+                yield message or ": ping\n\n"
+        finally:
+            print_queue.events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @router.get("/api/print/price")
@@ -411,10 +627,10 @@ async def get_print_options(request: Request):
 
 @router.get("/api/image/{image_id}")
 async def get_image_data(request: Request, image_id: str):
-    """Gibt Bild-Daten zurück"""
+    """Gibt Bild-Daten zurück (ohne Face-Encodings)"""
     db = request.app.state.db
     
-    image_data = db.get_image(image_id)
+    image_data = db.get_image(image_id, fields=DETAIL_FIELDS)
     
     if not image_data:
         raise HTTPException(status_code=404, detail="Bild nicht gefunden")
@@ -3,13 +3,19 @@ Gallery API Routes - Einfache Galerie + Karussell
 """
 
 import os
+import hashlib
 from pathlib import Path
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Optional
 
 from fastapi import APIRouter, Request, HTTPException, Query
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+
+from .caching import etag_matches, not_modified
+from ..database import SUMMARY_FIELDS, DETAIL_FIELDS
 
 # Router erstellen
 router = APIRouter()
@@ -18,6 +24,12 @@ router = APIRouter()
 templates_path = Path(__file__).parent.parent / "templates"
 templates = Jinja2Templates(directory=str(templates_path))
 
+# Thumbnails ändern sich nie (neue Verarbeitung = neue Bild-ID)
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bildlisten: Browser muss bei jeder Abfrage per ETag revalidieren
+GALLERY_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+
 
 # ============================================================
 # GALERIE SEITEN
@@ -29,7 +41,7 @@ async def gallery_page(request: Request):
     config = request.app.state.config
     db = request.app.state.db
     
-    images = db.get_all_images(limit=100)
+    images = db.get_all_images(limit=100, fields=SUMMARY_FIELDS)
     
     return templates.TemplateResponse("gallery.html", {
         "request": request,
@@ -54,7 +66,9 @@ async def get_gallery_images(
     start_minute: int = Query(None, ge=0, le=59),
     end_hour: int = Query(None, ge=0, le=23),
     end_minute: int = Query(None, ge=0, le=59),
-    sort: str = "newest"
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    since: Optional[int] = None
 ):
     """
     Gibt Galerie-Bilder zurück mit Filter-Optionen
@@ -70,92 +84,104 @@ async def get_gallery_images(
         end_hour: Endstunde (0-23)
         end_minute: Endminute (0-59)
         sort: Sortierung (newest, oldest, name)
+        cursor: next_cursor der vorherigen Seite (ersetzt offset)
+        since: Änderungsversion - liefert nur hinzugefügte/gelöschte Bilder
     """
     db = request.app.state.db
 
-    # Alle Bilder holen
-    all_images = db.get_all_images()
+    # Unveränderte Abfragen mit 304 beantworten
+    version = db.get_version()
+    query_hash = hashlib.md5(str(request.url.query).encode()).hexdigest()[:12]
+    etag = f'W/"{version}-{query_hash}"'
 
-    # Filtern
-    filtered = all_images
+    if etag_matches(request, etag):
+        return not_modified(etag, GALLERY_CACHE_HEADERS)
 
-    # Nach Name suchen
-    if search:
-        search_lower = search.lower()
-        filtered = [
-            img for img in filtered
-            if search_lower in img.get("filename", "").lower()
-        ]
+    headers = {"ETag": etag, **GALLERY_CACHE_HEADERS}
 
-    # Nach Datum filtern
-    if date_from:
-        try:
-            from_date = datetime.fromisoformat(date_from)
-            filtered = [
-                img for img in filtered
-                if datetime.fromisoformat(img.get("timestamp", "2000-01-01")[:10]) >= from_date
-            ]
-        except:
-            pass
+    # Uhrzeit-Filter als Minute des Tages (nur wenn beide Stunden gesetzt)
+    time_from = time_to = None
+    if start_hour is not None and end_hour is not None:
+        time_from = start_hour * 60 + (start_minute or 0)
+        time_to = end_hour * 60 + (end_minute or 0)
+
+    filters = dict(
+        search=search,
+        date_from=date_from,
+        date_to=date_to,
+        start_minute=time_from,
+        end_minute=time_to
+    )
 
-    if date_to:
-        try:
-            to_date = datetime.fromisoformat(date_to)
-            filtered = [
-                img for img in filtered
-                if datetime.fromisoformat(img.get("timestamp", "2099-12-31")[:10]) <= to_date
-            ]
-        except:
-            pass
+    # Delta seit Version
+    changes = db.get_changes_since(since) if since is not None else None
 
-    # Nach Uhrzeit filtern
-    if start_hour is not None and end_hour is not None:
-        filtered = [
-            img for img in filtered
-            if _is_time_in_range(img.get("timestamp", ""), start_hour, start_minute or 0, end_hour, end_minute or 0)
+    if changes is not None:
+        added = [
+            img for img in db.get_images(changes["added"], fields=SUMMARY_FIELDS)
+            if db.image_matches(img["id"], **filters)
         ]
+        _sort_images(added, sort)
 
-    # Sortieren
-    if sort == "oldest":
-        filtered.sort(key=lambda x: x.get("timestamp", ""))
-    elif sort == "name":
-        filtered.sort(key=lambda x: x.get("filename", ""))
-    else:  # newest (default)
-        filtered.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        return JSONResponse({
+            "success": True,
+            "version": version,
+            "delta": True,
+            "added": [_gallery_image(img) for img in added],
+            "removed": changes["removed"]
+        }, headers=headers)
 
-    # Pagination
-    total = len(filtered)
-    paginated = filtered[offset:offset + limit]
+    # Gefiltert, sortiert und paginiert über den Index
+    try:
+        result = db.query_images(**filters, sort=sort, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Nur relevante Daten
-    gallery_images = []
-    for img in paginated:
-        gallery_images.append({
-            "id": img.get("id"),
-            "filename": img.get("filename"),
-            "timestamp": img.get("timestamp"),
-            "time_formatted": _format_time(img.get("timestamp")),
-            "output_path": img.get("output_path"),
-            "face_count": img.get("face_count", 0),
-            "person_count": img.get("person_count", 0)
-        })
+    gallery_images = [_gallery_image(img) for img in result["images"]]
 
-    return {
+    return JSONResponse({
         "success": True,
-        "total": total,
+        "version": version,
+        "delta": False,
+        "total": result["total"],
         "limit": limit,
         "offset": offset,
         "count": len(gallery_images),
+        "next_cursor": result["next_cursor"],
         "images": gallery_images
+    }, headers=headers)
+
+
+def _sort_images(images: list, sort: str) -> None:
+    """Sortiert Bilder in-place (newest, oldest, name)"""
+    if sort == "oldest":
+        images.sort(key=lambda x: x.get("timestamp", ""))
+    elif sort == "name":
+        images.sort(key=lambda x: x.get("filename", ""))
+    else:  # newest (default)
+        images.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+
+
+def _gallery_image(img: dict) -> dict:
+    """Nur relevante Daten für die Galerie"""
+    return {
+        "id": img.get("id"),
+        "filename": img.get("filename"),
+        "timestamp": img.get("timestamp"),
+        "time_formatted": _format_time(img.get("timestamp")),
+        "output_path": img.get("output_path"),
+        "face_count": img.get("face_count", 0),
+        "person_count": img.get("person_count", 0)
     }
 
 
 @router.get("/api/image/{image_id}")
 async def get_single_image(request: Request, image_id: str):
-    """Gibt einzelnes Bild mit Details zurück"""
+    """Gibt einzelnes Bild mit Details zurück (ohne Face-Encodings)"""
     db = request.app.state.db
     
-    image = db.get_image(image_id)
+    image = db.get_image(image_id, fields=DETAIL_FIELDS)
     
     if not image:
         raise HTTPException(status_code=404, detail="Bild nicht gefunden")
@@ -237,12 +263,16 @@ async def serve_image(request: Request, image_id: str, original: bool = True):
 
 
 @router.get("/thumbnail/{image_id}")
-async def serve_thumbnail(request: Request, image_id: str, size: int = 200, original: bool = False):
-    """Liefert Thumbnail aus (generiert bei Bedarf)"""
-    from PIL import Image
-    import io
-    from fastapi.responses import Response
+async def serve_thumbnail(
+    request: Request,
+    image_id: str,
+    size: int = Query(200, ge=16, le=2000),
+    original: bool = False
+):
+    """Liefert Thumbnail aus (vorberechnete Stufe oder Disk-Cache, sonst generiert)"""
+    from ..services.thumbnails import pick_thumbnail, pick_source, render_thumbnail
 
+    config = request.app.state.config
     db = request.app.state.db
 
     image_data = db.get_image(image_id)
@@ -250,32 +280,60 @@ async def serve_thumbnail(request: Request, image_id: str, size: int = 200, orig
     if not image_data:
         raise HTTPException(status_code=404, detail="Bild nicht gefunden")
 
+    # 1. Vorberechnete Stufe verwenden (falls passend)
+    variant = "original" if original else "output"
+    thumbnails = (image_data.get("thumbnails") or {}).get(variant, {})
+    tolerance = config.get("thumbnails.variant_tolerance", 1.5)
+    thumb_path = pick_thumbnail(thumbnails, size, tolerance)
+
+    if thumb_path and Path(thumb_path).exists():
+        return _conditional_file_response(request, thumb_path)
+
     # Wähle Pfad basierend auf Parameter
     if original:
         image_path = image_data.get("original_path")
     else:
         image_path = image_data.get("output_path") or image_data.get("original_path")
 
-    if not image_path or not Path(image_path).exists():
+    # Aus nächstgrößerer Stufe erzeugen ist billiger als aus dem Vollbild
+    source_path = pick_source(thumbnails, size)
+    if not source_path or not Path(source_path).exists():
+        source_path = image_path
+
+    if not source_path or not Path(source_path).exists():
         raise HTTPException(status_code=404, detail="Bilddatei nicht gefunden")
-    
+
+    # 2. Disk-Cache (Schlüssel enthält Änderungszeit der Quelle)
+    cache = _get_thumbnail_cache(request)
+    source_mtime = Path(source_path).stat().st_mtime_ns
+    cache_key = f"{image_id}|{size}|{int(original)}|{source_mtime}"
+
+    cached_path = cache.get(cache_key)
+    if cached_path:
+        try:
+            return _conditional_file_response(request, cached_path)
+        except FileNotFoundError:
+            # Gerade verdrängt: neu erzeugen
+            pass
+
+    # 3. Erzeugen und cachen (Dekodieren/Skalieren nicht im Event-Loop)
+    quality = config.get("thumbnails.quality", 80)
+
+    def render():
+        data = render_thumbnail(source_path, size, quality)
+        return data, cache.put(cache_key, data)
+
     try:
-        # Thumbnail erstellen
-        img = Image.open(image_path)
-        img.thumbnail((size, size))
-        
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=80)
-        buffer.seek(0)
-        
-        return Response(
-            content=buffer.getvalue(),
-            media_type="image/jpeg"
-        )
-        
+        data, cached_path = await run_in_threadpool(render)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    try:
+        return _conditional_file_response(request, cached_path)
+    except FileNotFoundError:
+        # Sofort wieder verdrängt (Cache voll): direkt ausliefern
+        return Response(data, media_type="image/jpeg", headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL})
+
 
 # ============================================================
 # STATISTIKEN
@@ -286,35 +344,17 @@ async def get_gallery_stats(request: Request):
     """Gibt Galerie-Statistiken zurück"""
     db = request.app.state.db
     
-    all_images = db.get_all_images()
-    
-    if not all_images:
-        return {
-            "success": True,
-            "stats": {
-                "total_images": 0,
-                "total_faces": 0,
-                "total_persons": 0,
-                "oldest_image": None,
-                "newest_image": None
-            }
-        }
-    
-    total_faces = sum(img.get("face_count", 0) for img in all_images)
-    total_persons = sum(img.get("person_count", 0) for img in all_images)
-    
-    # Sortiert nach Zeit
-    sorted_images = sorted(all_images, key=lambda x: x.get("timestamp", ""))
+    stats = db.get_image_stats()
     
     return {
         "success": True,
         "stats": {
-            "total_images": len(all_images),
-            "total_faces": total_faces,
-            "total_persons": total_persons,
-            "oldest_image": sorted_images[0].get("timestamp") if sorted_images else None,
-            "newest_image": sorted_images[-1].get("timestamp") if sorted_images else None,
-            "images_today": _count_today(all_images)
+            "total_images": stats["total_images"],
+            "total_faces": stats["total_faces"],
+            "total_persons": stats["total_persons"],
+            "oldest_image": stats["oldest_image"],
+            "newest_image": stats["newest_image"],
+            "images_today": stats["images_today"]
         }
     }
 
@@ -323,52 +363,66 @@ async def get_gallery_stats(request: Request):
 # HILFSFUNKTIONEN
 # ============================================================
 
-def _format_time(timestamp: str) -> str:
-    """Formatiert Timestamp für Anzeige"""
-    if not timestamp:
-        return "-"
-    
-    try:
-        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        return dt.strftime("%d.%m.%Y %H:%M")
-    except:
-        return timestamp[:16] if len(timestamp) > 16 else timestamp
+def _get_thumbnail_cache(request: Request):
+    """Gibt den prozessweiten Thumbnail-Cache zurück (lazy erstellt)"""
+    cache = getattr(request.app.state, "thumbnail_cache", None)
 
+    if cache is None:
+        from ..services.disk_cache import DiskCache
 
-def _count_today(images: list) -> int:
-    """Zählt Bilder von heute"""
-    today = datetime.now().strftime("%Y-%m-%d")
+        config = request.app.state.config
+        max_mb = config.get("thumbnails.cache_max_mb", 200)
+        cache = DiskCache(config.get_path("thumbnails") / "cache", int(max_mb * 1024 * 1024), ".jpg")
+        request.app.state.thumbnail_cache = cache
 
-    count = 0
-    for img in images:
-        ts = img.get("timestamp", "")
-        if ts.startswith(today):
-            count += 1
+    return cache
 
-    return count
 
+def _conditional_file_response(request: Request, path) -> Response:
+    """
+    Liefert eine Datei mit ETag/Last-Modified aus
 
-def _is_time_in_range(timestamp: str, start_hour: int, start_minute: int, end_hour: int, end_minute: int) -> bool:
-    """Prüft ob Timestamp innerhalb der Uhrzeit-Range liegt"""
-    if not timestamp:
-        return False
+    Bei passendem If-None-Match bzw. If-Modified-Since wird 304 ohne
+    Inhalt zurückgegeben.
 
-    try:
-        # Parse timestamp
-        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    Raises:
+        FileNotFoundError: Datei existiert nicht (mehr), z.B. aus dem Cache verdrängt
+    """
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": THUMBNAIL_CACHE_CONTROL
+    }
 
-        # Extrahiere Stunde und Minute
-        hour = dt.hour
-        minute = dt.minute
+    if_modified_since = request.headers.get("if-modified-since")
 
-        # Konvertiere alles zu Minuten seit Mitternacht für einfacheren Vergleich
-        current_minutes = hour * 60 + minute
-        start_minutes = start_hour * 60 + start_minute
-        end_minutes = end_hour * 60 + end_minute
+    if request.headers.get("if-none-match") is not None:
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+            if int(stat.st_mtime) <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
 
-        # Prüfe ob im Bereich
-        return start_minutes <= current_minutes <= end_minutes
+    # Gleiches stat wie für die Header (kein zweites stat beim Senden)
+    return FileResponse(path, media_type="image/jpeg", headers=headers, stat_result=stat)
+
+
+def _format_time(timestamp: str) -> str:
+    """Formatiert Timestamp für Anzeige"""
+    if not timestamp:
+        return "-"
+    
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return dt.strftime("%d.%m.%Y %H:%M")
+    except:
+        return timestamp[:16] if len(timestamp) > 16 else timestamp
 
-    except Exception as e:
-        print(f"Fehler beim Parsen des Timestamps '{timestamp}': {e}")
-        return False
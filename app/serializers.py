@@ -0,0 +1,172 @@
+"""
+Serializer - Austauschbare Dateiformate für die Bilddatenbank
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .persistence import atomic_write
+from .records import to_plain
+
+# Schnelles JSON (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Binärformat (optional)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+# ============================================================
+# SERIALIZER
+# ============================================================
+
+class Serializer:
+    """Standard-JSON (lesbar, eingerückt)"""
+
+    name = "json"
+    suffix = ".json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=to_plain).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw.decode("utf-8-sig"))
+
+
+class OrjsonSerializer(Serializer):
+    """orjson (kompaktes JSON, mehrfach schneller als json)"""
+
+    name = "orjson"
+    suffix = ".json"
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=to_plain, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, raw: bytes) -> Any:
+        if raw.startswith(UTF8_BOM):
+            raw = raw[len(UTF8_BOM):]
+        return orjson.loads(raw)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack (binär, kleinere Dateien)"""
+
+    name = "msgpack"
+    suffix = ".msgpack"
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=to_plain, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Any:
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+SERIALIZERS: Dict[str, type] = {
+    "json": Serializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer
+}
+
+
+def available_formats() -> list:
+    """Formate, die in dieser Installation nutzbar sind"""
+    formats = ["json"]
+    if ORJSON_AVAILABLE:
+        formats.append("orjson")
+    if MSGPACK_AVAILABLE:
+        formats.append("msgpack")
+    return formats
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Gibt den Serializer für ein Format zurück
+
+    Ist das Paket für das Format nicht installiert, wird auf JSON
+    zurückgefallen (bzw. Standard-json statt orjson).
+    """
+    if name not in SERIALIZERS:
+        print(f"⚠️ Unbekanntes Datenbankformat '{name}', verwende json")
+        name = "json"
+
+    if name == "msgpack" and not MSGPACK_AVAILABLE:
+        print("⚠️ msgpack nicht installiert, verwende JSON")
+        name = "orjson"
+
+    if name == "orjson" and not ORJSON_AVAILABLE:
+        name = "json"
+
+    return SERIALIZERS[name]()
+
+
+# ============================================================
+# DATEIEN
+# ============================================================
+
+def detect_format(raw: bytes) -> str:
+    """
+    Erkennt das Format anhand des Inhalts
+
+    JSON beginnt (nach BOM/Leerzeichen) mit { oder [, alles andere wird
+    als MessagePack behandelt.
+    """
+    head = raw[len(UTF8_BOM):] if raw.startswith(UTF8_BOM) else raw
+    head = head.lstrip()[:1]
+
+    if not head or head in (b"{", b"["):
+        return "orjson" if ORJSON_AVAILABLE else "json"
+
+    return "msgpack"
+
+
+def load_file(path: Path) -> Any:
+    """Lädt eine Datei (Format wird automatisch erkannt)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    fmt = detect_format(raw)
+
+    if fmt == "msgpack" and not MSGPACK_AVAILABLE:
+        raise RuntimeError(f"{Path(path).name} ist im msgpack-Format, aber msgpack ist nicht installiert")
+
+    return SERIALIZERS[fmt]().loads(raw)
+
+
+def dump_file(path: Path, data: Any, serializer: Serializer) -> None:
+    """Speichert eine Datei atomar im Format des Serializers"""
+    raw = serializer.dumps(data)
+    atomic_write(path, lambda f: f.write(raw), binary=True)
+
+
+def find_data_file(directory: Path, stem: str, preferred: Serializer) -> Optional[Path]:
+    """
+    Sucht die Datendatei
+
+    Nach einem Formatwechsel kann neben der aktuellen Datei noch eine
+    im alten Format liegen - es zählt die zuletzt geschriebene, bei
+    gleichem Stand die im bevorzugten Format.
+    """
+    candidates = [directory / f"{stem}{preferred.suffix}"]
+    for serializer in SERIALIZERS.values():
+        path = directory / f"{stem}{serializer.suffix}"
+        if path not in candidates:
+            candidates.append(path)
+
+    existing = [path for path in candidates if path.exists()]
+
+    if not existing:
+        return None
+
+    # max() liefert bei Gleichstand den ersten (bevorzugten) Kandidaten
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
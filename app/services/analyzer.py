@@ -733,6 +733,31 @@ class ImageAnalyzer:
         
         try:
             image = face_recognition.load_image_file(image_path)
+        except Exception as e:
+            print(f"❌ Encoding Fehler: {e}")
+            return None
+        
+        return self.get_face_encoding_from_array(image)
+    
+    def get_face_encoding_from_array(self, image: np.ndarray, bgr: bool = False) -> Optional[List[float]]:
+        """
+        Extrahiert Face Encoding aus einem bereits dekodierten Bild
+        
+        Args:
+            image: Bild als Array (RGB, z.B. Kamera-Frame)
+            bgr: Array ist BGR (OpenCV) statt RGB
+            
+        Returns:
+            Face Encoding als Liste oder None
+        """
+        if not FACE_RECOGNITION_AVAILABLE:
+            return None
+        
+        try:
+            if bgr:
+                # dlib braucht ein zusammenhängendes RGB-Array
+                image = np.ascontiguousarray(image[:, :, ::-1])
+            
             encodings = face_recognition.face_encodings(image)
             
             if encodings:
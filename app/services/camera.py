@@ -23,6 +23,8 @@ except ImportError:
 # PIL
 from PIL import Image
 
+from .camera_sources import open_source
+
 
 # ============================================================
 # CAMERA HANDLER
@@ -44,6 +46,9 @@ class CameraHandler:
         self.height = config.get("camera.height", 720)
         self.flip_horizontal = config.get("camera.flip_horizontal", True)
         
+        # Quelle: device (USB-Kamera), video oder images (virtuelle Kamera)
+        self.source = config.get("camera.source", "device")
+        
         # Kamera-Instanz
         self._camera = None
         self._lock = threading.Lock()
@@ -82,24 +87,24 @@ class CameraHandler:
                     self._camera = None
 
             try:
-                # Kamera öffnen
-                self._camera = cv2.VideoCapture(self.device_id, cv2.CAP_DSHOW)  # Windows DirectShow Backend
+                # Kamera öffnen (USB-Kamera oder Datei-Quelle)
+                self._camera = open_source(self.config)
 
                 if not self._camera.isOpened():
-                    print(f"❌ Kamera {self.device_id} konnte nicht geöffnet werden")
+                    print(f"❌ Kamera {self.describe()} konnte nicht geöffnet werden")
                     self._camera = None
                     return False
 
-                # Wartezeit für Initialisierung
-                import time
-                time.sleep(0.5)
+                if self.source == "device":
+                    # Wartezeit für Initialisierung
+                    time.sleep(0.5)
 
-                # Auflösung setzen
-                self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-                self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+                    # Auflösung setzen
+                    self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+                    self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
 
-                # Buffer-Größe reduzieren für bessere Performance
-                self._camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                    # Buffer-Größe reduzieren für bessere Performance
+                    self._camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
                 # Tatsächliche Auflösung prüfen
                 actual_width = int(self._camera.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -108,7 +113,7 @@ class CameraHandler:
                 # Test-Frame lesen um sicherzustellen dass Kamera funktioniert
                 ret, test_frame = self._camera.read()
                 if not ret or test_frame is None:
-                    print(f"❌ Kamera {self.device_id} liefert keine Bilder")
+                    print(f"❌ Kamera {self.describe()} liefert keine Bilder")
                     try:
                         self._camera.release()
                     except:
@@ -116,7 +121,7 @@ class CameraHandler:
                     self._camera = None
                     return False
 
-                print(f"📷 Kamera geöffnet: {actual_width}x{actual_height}")
+                print(f"📷 Kamera geöffnet: {self.describe()} {actual_width}x{actual_height}")
                 return True
 
             except Exception as e:
@@ -139,6 +144,12 @@ class CameraHandler:
                 self._camera = None
                 print("📷 Kamera geschlossen")
     
+    def describe(self) -> str:
+        """Kurzbeschreibung der Quelle für Meldungen"""
+        if self.source == "device":
+            return str(self.device_id)
+        return f"{self.source}:{self.config.get('camera.source_path', '')}"
+    
     def is_open(self) -> bool:
         """Prüft ob Kamera geöffnet ist"""
         return self._camera is not None and self._camera.isOpened()
@@ -158,34 +169,82 @@ class CameraHandler:
             if not self.open():
                 return None
         
+        frame = self.read_frame()
+        
+        if frame is None:
+            print("❌ Konnte kein Bild aufnehmen")
+            return None
+        
+        try:
+            return self.encode_jpeg(frame)
+        except Exception as e:
+            print(f"❌ Aufnahmefehler: {e}")
+            return None
+    
+    def read_frame(self):
+        """
+        Liest einen Frame (BGR-Array, bereits gespiegelt)
+        
+        Returns:
+            numpy-Array oder None
+        """
         with self._lock:
+            if self._camera is None:
+                return None
+            
             try:
-                # Frame lesen
                 ret, frame = self._camera.read()
-                
-                if not ret or frame is None:
-                    print("❌ Konnte kein Bild aufnehmen")
-                    return None
-                
-                # Horizontal spiegeln
-                if self.flip_horizontal:
-                    frame = cv2.flip(frame, 1)
-                
-                # BGR -> RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Zu PIL Image
-                image = Image.fromarray(frame_rgb)
-                
-                # Als JPEG-Bytes
-                buffer = io.BytesIO()
-                image.save(buffer, format="JPEG", quality=90)
-                
-                return buffer.getvalue()
-                
             except Exception as e:
                 print(f"❌ Aufnahmefehler: {e}")
                 return None
+        
+        if not ret or frame is None:
+            return None
+        
+        # Horizontal spiegeln
+        if self.flip_horizontal:
+            frame = cv2.flip(frame, 1)
+        
+        return frame
+    
+    @staticmethod
+    def encode_preview(frame, max_width: int = 640, quality: int = 70) -> Optional[bytes]:
+        """
+        Kodiert einen BGR-Frame für den Live-Stream
+        
+        Direkt aus dem OpenCV-Array (cv2.imencode), ohne Farbkonvertierung
+        und PIL - verkleinert auf max_width.
+        """
+        height, width = frame.shape[:2]
+        
+        if max_width and width > max_width:
+            # INTER_AREA ist nur bei ganzzahligem Faktor schnell (sonst ~10x
+            # langsamer) - daher halbieren, den Rest linear verkleinern
+            while width >= 2 * max_width:
+                width, height = width // 2, height // 2
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            
+            if width > max_width:
+                size = (max_width, height * max_width // width)
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        return buffer.tobytes() if ok else None
+    
+    @staticmethod
+    def encode_jpeg(frame, quality: int = 90) -> bytes:
+        """Kodiert einen BGR-Frame als JPEG"""
+        # BGR -> RGB
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # Zu PIL Image
+        image = Image.fromarray(frame_rgb)
+        
+        # Als JPEG-Bytes
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality)
+        
+        return buffer.getvalue()
     
     def capture_to_file(self, output_path: str) -> bool:
         """
@@ -352,6 +411,7 @@ class CameraHandler:
             "open": self.is_open(),
             "streaming": self._streaming,
             "device_id": self.device_id,
+            "source": self.source,
             "settings": {
                 "width": self.width,
                 "height": self.height,
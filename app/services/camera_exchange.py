@@ -0,0 +1,223 @@
+"""
+Kamera-Austausch - eine Kamera für mehrere Worker-Prozesse
+
+Nur der Prozess mit data/camera-<id>.lock öffnet die Kamera. Die anderen
+Worker zeigen deren Bilder über Dateien in data/camera/<id>/:
+
+- watching:        mtime = letzter Zuschauer in einem anderen Worker
+- preview.jpg:     neueste Vorschau (nur solange jemand von außen zusieht)
+- faces.json:      letzte Gesichts-Ereignisse mit laufender Nummer
+- captures/<id>:   Aufnahmen als JPEG (capture_id in jedem Worker gültig)
+- requests/<id>:   Aufnahme-Wünsche anderer Worker (Inhalt: mode)
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..interprocess import FileLock
+from ..persistence import atomic_write
+from .camera import CameraHandler, OPENCV_AVAILABLE
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+# Zuschauer anderer Worker gelten so lange als aktiv (Sekunden)
+WATCH_TIMEOUT = 3.0
+
+# Abstand zwischen zwei Prüfungen auf Zuschauer/Aufnahme-Wünsche (Sekunden)
+POLL_INTERVAL = 0.1
+
+# Gemerkte Gesichts-Ereignisse in faces.json
+MAX_FACE_EVENTS = 10
+
+# Aufnahmen auf der Platte (älteste werden gelöscht)
+MAX_CAPTURE_FILES = 32
+
+_CAPTURE_ID = re.compile(r"CAP_[0-9A-Za-z_]+")
+
+
+# ============================================================
+# AUSTAUSCH
+# ============================================================
+
+class CameraExchange:
+    """
+    Dateien zwischen dem Prozess mit der Kamera und den übrigen Workern
+
+    Die Sperre wird nur gehalten, solange der Aufnahme-Thread die Kamera
+    offen hat - danach kann ein anderer Worker mit Zuschauern übernehmen.
+    """
+
+    def __init__(self, data_dir: Path, device_id: int):
+        """
+        Args:
+            data_dir: Datenordner (data/)
+            device_id: Kamera (eigene Sperre und eigener Ordner pro Gerät)
+        """
+        self.lock = FileLock(Path(data_dir) / f"camera-{device_id}.lock")
+        self.folder = Path(data_dir) / "camera" / str(device_id)
+        self.captures = self.folder / "captures"
+        self.requests = self.folder / "requests"
+
+        for folder in (self.captures, self.requests):
+            folder.mkdir(parents=True, exist_ok=True)
+
+        self._watched = False
+        self._watched_checked = 0.0
+        self._requests_checked = 0.0
+        self._face_seq = 0
+        self._face_events: list = []
+
+    # ========================================================
+    # KAMERA-PROZESS
+    # ========================================================
+
+    def begin(self) -> None:
+        """Kamera übernommen: Ereignis-Nummern des Vorgängers fortsetzen"""
+        self._face_events = self._load_face_events()
+        self._face_seq = self.last_face_seq(self._face_events)
+
+    def watched(self) -> bool:
+        """Sieht ein anderer Worker zu? (höchstens alle POLL_INTERVAL geprüft)"""
+        now = time.monotonic()
+
+        if now - self._watched_checked >= POLL_INTERVAL:
+            self._watched_checked = now
+            try:
+                self._watched = time.time() - (self.folder / "watching").stat().st_mtime < WATCH_TIMEOUT
+            except OSError:
+                self._watched = False
+
+        return self._watched
+
+    def write_preview(self, jpeg: bytes) -> None:
+        """Neueste Vorschau für die anderen Worker"""
+        try:
+            _replace(self.folder / "preview.jpg", jpeg)
+        except OSError:
+            # Unter Windows evtl. gerade geöffnet - nächster Frame
+            pass
+
+    def publish_face_event(self, event_type: str, data: dict) -> None:
+        """Gesichts-Ereignis für die anderen Worker (die letzten MAX_FACE_EVENTS)"""
+        self._face_seq += 1
+        self._face_events = (self._face_events + [[self._face_seq, event_type, data]])[-MAX_FACE_EVENTS:]
+
+        try:
+            _replace(self.folder / "faces.json", json.dumps(self._face_events).encode("utf-8"))
+        except OSError:
+            pass
+
+    def take_requests(self) -> List[Tuple[str, str]]:
+        """Offene Aufnahme-Wünsche [(capture_id, mode)] (höchstens alle POLL_INTERVAL)"""
+        now = time.monotonic()
+        if now - self._requests_checked < POLL_INTERVAL:
+            return []
+
+        self._requests_checked = now
+        requests = []
+
+        for path in self.requests.iterdir():
+            if not _CAPTURE_ID.fullmatch(path.name):
+                continue
+            try:
+                mode = path.read_text(encoding="utf-8").strip()
+                path.unlink()
+            except OSError:
+                continue
+            requests.append((path.name, mode))
+
+        return requests
+
+    # ========================================================
+    # ANDERE WORKER
+    # ========================================================
+
+    def touch(self) -> None:
+        """Meldet Zuschauer in diesem Worker (hält die Kamera offen)"""
+        (self.folder / "watching").touch()
+
+    def read_preview(self, seen: Optional[int]) -> Tuple[Optional[int], Optional[bytes]]:
+        """
+        Neue Vorschau seit der Version seen
+
+        Returns:
+            (Version, JPEG-Bytes) oder (seen, None), wenn nichts Neues vorliegt
+        """
+        path = self.folder / "preview.jpg"
+
+        try:
+            version = path.stat().st_mtime_ns
+            if version == seen:
+                return seen, None
+            return version, path.read_bytes()
+        except OSError:
+            return seen, None
+
+    def read_face_events(self, after: int) -> list:
+        """Gesichts-Ereignisse mit laufender Nummer > after: [[seq, Typ, Daten], ...]"""
+        return [event for event in self._load_face_events() if event[0] > after]
+
+    def last_face_seq(self, events: list = None) -> int:
+        """Nummer des letzten Gesichts-Ereignisses (neue Zuschauer beginnen danach)"""
+        events = self._load_face_events() if events is None else events
+        return events[-1][0] if events else 0
+
+    def request_capture(self, capture_id: str, mode: str) -> None:
+        """Bittet den Kamera-Prozess um eine Aufnahme"""
+        atomic_write(self.requests / capture_id, lambda f: f.write(mode))
+
+    def cancel_request(self, capture_id: str) -> None:
+        (self.requests / capture_id).unlink(missing_ok=True)
+
+    # ========================================================
+    # AUFNAHMEN (alle Worker)
+    # ========================================================
+
+    def save_capture(self, capture_id: str, frame: np.ndarray, quality: int) -> None:
+        """Speichert eine Aufnahme und löscht die ältesten"""
+        jpeg = CameraHandler.encode_jpeg(frame, quality)
+        atomic_write(self.captures / f"{capture_id}.jpg", lambda f: f.write(jpeg), binary=True)
+
+        files = sorted(self.captures.glob("CAP_*.jpg"), key=_mtime)
+        for path in files[:-MAX_CAPTURE_FILES]:
+            path.unlink(missing_ok=True)
+
+    def load_capture(self, capture_id: str) -> Optional[np.ndarray]:
+        """Aufnahme eines beliebigen Workers (BGR) oder None"""
+        if not OPENCV_AVAILABLE or not _CAPTURE_ID.fullmatch(capture_id):
+            return None
+
+        try:
+            data = (self.captures / f"{capture_id}.jpg").read_bytes()
+        except OSError:
+            return None
+
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+    def _load_face_events(self) -> list:
+        try:
+            return json.loads((self.folder / "faces.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+
+
+def _replace(path: Path, data: bytes) -> None:
+    """Ersetzt eine Datei ohne fsync (Vorschau/Ereignisse sind kurzlebig)"""
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
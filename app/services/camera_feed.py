@@ -0,0 +1,794 @@
+"""
+Kamera-Feed - Ein gemeinsamer Aufnahme-Thread pro Kamera für alle Live-Streams
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from ..database import is_multi_process
+from .camera import CameraHandler, OPENCV_AVAILABLE
+from .camera_exchange import CameraExchange
+from .events import EventBroadcaster
+from .face_detector import FaceDetector, StableFaceTrigger
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+# Aufeinanderfolgende Lesefehler, bis die Kamera als verloren gilt
+MAX_READ_FAILURES = 30
+
+# Gemerkte Aufnahmen für die Suche (capture_id -> Frame)
+CAPTURE_CACHE_SIZE = 8
+
+# Schärfe wird auf einer verkleinerten Graustufen-Version gemessen
+SHARPNESS_WIDTH = 320
+
+# Adaptive Vorschau: pro Stufe Breite x 0.75 und Qualität - 10
+LEVEL_SCALE = 0.75
+LEVEL_QUALITY_STEP = 10
+MIN_PREVIEW_QUALITY = 30
+
+# Mindestabstand zwischen zwei Stufenwechseln eines Clients (Sekunden)
+ADAPT_COOLDOWN = 2.0
+
+# Worker ohne Kamera: Abstand zwischen zwei Blicken auf die Vorschau (Sekunden)
+RELAY_POLL = 0.02
+
+_subscription_ids = itertools.count(1)
+
+# Prozessweit, damit neu erstellte Feeds keine capture_id doppelt vergeben
+_capture_ids = itertools.count(1)
+
+
+# ============================================================
+# ABONNEMENT
+# ============================================================
+
+class FrameSubscription:
+    """
+    Ein MJPEG-Client (im Event-Loop des Clients)
+
+    Hält nur den neuesten Frame: ist der Client langsamer als die Kamera,
+    werden die dazwischenliegenden Frames übersprungen statt gepuffert.
+
+    Gemessen wird, wie lange das Senden eines Frames dauert (Zeit bis der
+    Stream den nächsten Frame abholt - bei vollem Socket-Puffer wartet
+    der Server). Reicht die Zeit nicht für die Vorschau-Rate, geht der
+    Client eine Stufe kleiner/schlechter, bei viel Reserve wieder hoch.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, levels: int = 1, interval: float = 1 / 15):
+        """
+        Args:
+            loop: Event-Loop des Clients
+            levels: Anzahl Qualitätsstufen (1 = nicht adaptiv)
+            interval: Ziel-Abstand zwischen Frames in Sekunden
+        """
+        self.loop = loop
+        self._frame: Optional[bytes] = b""
+        self._ready = asyncio.Event()
+
+        # Frame unterwegs oder noch nicht abgeholt (vom Aufnahme-Thread gelesen)
+        self.pending = False
+
+        # Adaptive Qualität (0 = beste Stufe)
+        self.id = next(_subscription_ids)
+        self.levels = levels
+        self.level = 0
+        self.interval = interval
+        self._level_changed = time.monotonic()
+
+        # Statistiken
+        self.connected_at = time.monotonic()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_sent = 0
+        self.send_ms = 0.0
+        self.latency_ms = 0.0
+        self._handed_at: Optional[float] = None
+        self._captured_at: Optional[float] = None
+
+    def push(self, frame: Optional[bytes], captured_at: float = None) -> None:
+        """
+        Legt den neuesten Frame ab (läuft im Event-Loop, None = Stream-Ende)
+
+        Args:
+            captured_at: Aufnahmezeitpunkt (time.monotonic) für die Latenz
+        """
+        self._frame = frame
+        self._captured_at = captured_at
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """
+        Wartet auf den nächsten Frame
+
+        Returns:
+            JPEG-Bytes, b"" bei Timeout oder None bei Stream-Ende
+        """
+        if self._handed_at is not None:
+            # Vorheriger Frame ist gesendet
+            self._measure(time.monotonic() - self._handed_at)
+            self._handed_at = None
+
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return b""
+
+        self._ready.clear()
+        self.pending = False
+
+        frame = self._frame
+        if frame:
+            self._handed_at = time.monotonic()
+            self.frames_sent += 1
+            self.bytes_sent += len(frame)
+
+            if self._captured_at is not None:
+                # Aufnahme bis Übergabe an den Stream (Kodieren + Warten)
+                ms = (self._handed_at - self._captured_at) * 1000
+                self.latency_ms = ms if not self.latency_ms else self.latency_ms * 0.8 + ms * 0.2
+
+        return frame
+
+    def get_stats(self) -> dict:
+        """Statistiken des Clients"""
+        elapsed = max(time.monotonic() - self.connected_at, 1e-6)
+
+        return {
+            "id": self.id,
+            "level": self.level,
+            "connected_s": round(elapsed, 1),
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "fps": round(self.frames_sent / elapsed, 1),
+            "kbps": round(self.bytes_sent * 8 / 1000 / elapsed, 1),
+            "send_ms": round(self.send_ms, 1),
+            "latency_ms": round(self.latency_ms, 1)
+        }
+
+    def _measure(self, seconds: float) -> None:
+        """Sendedauer mitteln und Stufe anpassen"""
+        ms = seconds * 1000
+        self.send_ms = ms if not self.send_ms else self.send_ms * 0.8 + ms * 0.2
+
+        now = time.monotonic()
+        if self.levels <= 1 or now - self._level_changed < ADAPT_COOLDOWN:
+            return
+
+        budget = self.interval * 1000
+
+        if self.send_ms > budget and self.level < self.levels - 1:
+            # Client kommt nicht hinterher: kleiner/stärker komprimiert
+            self.level += 1
+        elif self.send_ms < budget * 0.25 and self.level > 0:
+            # Viel Reserve: wieder eine Stufe besser
+            self.level -= 1
+        else:
+            return
+
+        self._level_changed = now
+
+
+# ============================================================
+# CAMERA FEED
+# ============================================================
+
+class CameraFeed:
+    """
+    Liest eine Kamera in einem eigenen Thread und verteilt die Frames
+
+    Die letzten Frames liegen in einem Ringpuffer, der neueste wird einmal
+    als JPEG kodiert und an alle Abonnenten verteilt. Der Thread startet
+    mit dem ersten Abonnenten und schließt die Kamera, wenn eine Weile
+    (camera.idle_timeout) niemand mehr zusieht.
+
+    Mehrere Worker-Prozesse: nur der Prozess mit data/camera-<id>.lock
+    öffnet die Kamera. Die anderen zeigen dessen Vorschau und
+    Gesichts-Ereignisse, Aufnahmen liegen als Datei für alle Worker bereit
+    (siehe CameraExchange). Schließt der Besitzer die Kamera, übernimmt
+    ein Worker, der noch Zuschauer hat.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Config-Instanz (Kamera-Einstellungen)
+        """
+        self.config = config
+        self.device_id = config.get("camera.device_id", 0)
+        self.idle_timeout = config.get("camera.idle_timeout", 5)
+
+        # Vorschau (Live-Stream): eigene Größe/Qualität, unabhängig von Aufnahmen
+        self.preview_width = config.get("camera.preview_width", 640)
+        self.preview_quality = config.get("camera.preview_quality", 70)
+        max_fps = config.get("camera.preview_max_fps", 15)
+        self.preview_interval = 1 / max_fps if max_fps else 0
+
+        # Stufen (Breite, Qualität) für langsame Clients, Stufe 0 = Vorschau
+        self.preview_levels = [
+            (
+                int(self.preview_width * LEVEL_SCALE ** level),
+                max(MIN_PREVIEW_QUALITY, self.preview_quality - LEVEL_QUALITY_STEP * level)
+            )
+            for level in range(max(1, config.get("camera.preview_levels", 4)))
+        ]
+
+        # Ringpuffer: (Zeitpunkt, BGR-Frame)
+        self._frames: deque = deque(maxlen=max(1, config.get("camera.buffer_frames", 10)))
+        self._jpeg: Optional[bytes] = None
+
+        # Sofortaufnahme: "latest" oder "sharpest" (schärfster der letzten N)
+        self.capture_mode = config.get("camera.capture_mode", "sharpest")
+        self.sharpest_of = config.get("camera.sharpest_of", 5)
+        self._captures: OrderedDict = OrderedDict()
+        self.capture_quality = config.get("camera.capture_quality", 90)
+
+        # Mehrere Worker: gemeinsame Kamera, capture_ids mit Prozess-ID
+        self._exchange: Optional[CameraExchange] = None
+        if is_multi_process(config):
+            self._exchange = CameraExchange(config.root_dir / "data", self.device_id)
+        self._capture_prefix = f"CAP_{os.getpid()}_" if self._exchange else "CAP_"
+        # Zeigt die Kamera eines anderen Workers / ein anderer Worker sieht zu
+        self._relaying = False
+        self._remote = False
+
+        # Live-Gesichtserkennung (jeder N-te Frame, nur mit Zuhörern)
+        # Ereignisse "faces" (Boxen) und "auto_capture" (capture_id)
+        self.face_events = EventBroadcaster(queue_size=10)
+        self.detect_every = max(1, config.get("camera.face_detection.every_n", 5))
+        self.auto_capture = config.get("camera.face_detection.auto_capture", True)
+        self._detector: Optional[FaceDetector] = None
+        self._trigger = StableFaceTrigger(config)
+        if config.get("camera.face_detection.enabled", True) and OPENCV_AVAILABLE:
+            self._detector = FaceDetector(config)
+        self.detect_ms = 0.0
+        self.auto_captures = 0
+
+        self._subscriptions: Set[FrameSubscription] = set()
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._previous: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_used = time.monotonic()
+
+        # Statistiken
+        self.frames_captured = 0
+        self.frames_encoded = 0
+        self.frames_skipped = 0
+        self.encode_ms = 0.0
+        self.started_at: Optional[float] = None
+
+    # ========================================================
+    # ABONNENTEN
+    # ========================================================
+
+    def subscribe(self) -> FrameSubscription:
+        """Meldet einen Client an und startet bei Bedarf die Aufnahme (im Event-Loop aufrufen)"""
+        subscription = FrameSubscription(
+            asyncio.get_running_loop(),
+            levels=len(self.preview_levels),
+            interval=self.preview_interval or 1 / 30
+        )
+
+        with self._lock:
+            self._subscriptions.add(subscription)
+            self._last_used = time.monotonic()
+            self._ensure_running()
+
+        # Letzten Frame sofort zeigen, nicht erst den nächsten abwarten
+        if self._jpeg is not None:
+            subscription.push(self._jpeg)
+
+        return subscription
+
+    def unsubscribe(self, subscription: FrameSubscription) -> None:
+        """Meldet einen Client ab (die Kamera bleibt noch idle_timeout offen)"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._last_used = time.monotonic()
+
+    # ========================================================
+    # SOFORTAUFNAHME
+    # ========================================================
+
+    def capture(self, mode: str = None, timeout: float = 3.0) -> Optional[Tuple[str, np.ndarray]]:
+        """
+        Aufnahme aus dem Frame-Puffer (blockiert nur, wenn die Kamera erst startet)
+
+        Args:
+            mode: "latest" oder "sharpest" (Standard: camera.capture_mode)
+            timeout: Maximale Wartezeit auf den ersten Frame
+
+        Returns:
+            (capture_id, BGR-Frame) oder None. Der Frame bleibt unter der
+            capture_id für captured() abrufbar (Suche ohne JPEG-Umweg).
+        """
+        mode = mode or self.capture_mode
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            self._last_used = time.monotonic()
+            self._ensure_running()
+
+            # Kamera startet gerade: auf den ersten Frame warten
+            while not self._frames and not self._relaying:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None:
+                    return None
+                self._new_frame.wait(remaining)
+
+            relaying = self._relaying
+            frames = [frame for _, frame in self._frames]
+
+        if relaying:
+            return self._request_capture(mode, deadline)
+
+        frame = self._pick(frames, mode)
+        return self._remember(frame), frame
+
+    def captured(self, capture_id: str) -> Optional[np.ndarray]:
+        """Frame einer früheren Aufnahme (BGR, auch aus anderen Workern) oder None"""
+        with self._lock:
+            frame = self._captures.get(capture_id)
+
+        if frame is None and self._exchange is not None:
+            frame = self._exchange.load_capture(capture_id)
+
+        return frame
+
+    def _pick(self, frames: list, mode: str) -> np.ndarray:
+        """Neuester oder schärfster der letzten Frames"""
+        if mode == "sharpest" and OPENCV_AVAILABLE:
+            return max(frames[-self.sharpest_of:], key=sharpness)
+        return frames[-1]
+
+    def _remember(self, frame: np.ndarray, capture_id: str = None) -> str:
+        """Merkt einen Frame unter einer (neuen) capture_id"""
+        capture_id = capture_id or f"{self._capture_prefix}{next(_capture_ids)}"
+
+        with self._lock:
+            self._captures[capture_id] = frame
+            while len(self._captures) > CAPTURE_CACHE_SIZE:
+                self._captures.popitem(last=False)
+
+        if self._exchange is not None:
+            try:
+                self._exchange.save_capture(capture_id, frame, self.capture_quality)
+            except OSError as e:
+                print(f"⚠️ Aufnahme {capture_id} nicht für andere Worker gespeichert: {e}")
+
+        return capture_id
+
+    def _request_capture(self, mode: str, deadline: float) -> Optional[Tuple[str, np.ndarray]]:
+        """Aufnahme durch den Worker mit der Kamera (wartet auf dessen Datei)"""
+        capture_id = f"{self._capture_prefix}{next(_capture_ids)}"
+        self._exchange.request_capture(capture_id, mode)
+
+        while time.monotonic() < deadline:
+            frame = self._exchange.load_capture(capture_id)
+            if frame is not None:
+                return capture_id, frame
+            time.sleep(0.05)
+
+        self._exchange.cancel_request(capture_id)
+        return None
+
+    def subscribe_faces(self):
+        """Meldet einen Client für Gesichts-Ereignisse an (im Event-Loop aufrufen)"""
+        subscription = self.face_events.subscribe()
+
+        with self._lock:
+            self._last_used = time.monotonic()
+            self._ensure_running()
+
+        return subscription
+
+    def unsubscribe_faces(self, subscription) -> None:
+        """Meldet einen Gesichts-Client ab"""
+        self.face_events.unsubscribe(subscription)
+
+        with self._lock:
+            self._last_used = time.monotonic()
+
+    def detection_available(self) -> bool:
+        """Ist die Live-Gesichtserkennung aktiv und einsatzbereit?"""
+        return self._detector is not None and self._detector.available()
+
+    def subscriber_count(self) -> int:
+        """Anzahl verbundener Clients"""
+        return len(self._subscriptions)
+
+    def is_running(self) -> bool:
+        """Läuft der Aufnahme-Thread?"""
+        return self._thread is not None
+
+    def stop(self) -> None:
+        """Beendet die Aufnahme und alle offenen Streams"""
+        with self._lock:
+            thread = self._thread
+            self._stop.set()
+
+        if thread is not None:
+            thread.join(timeout=5)
+
+        self._close_subscriptions()
+
+    def get_stats(self) -> dict:
+        """Statistiken des Feeds"""
+        running = self.started_at is not None and self.is_running()
+        elapsed = time.monotonic() - self.started_at if running else 0
+
+        return {
+            "device_id": self.device_id,
+            "running": running,
+            "subscribers": self.subscriber_count(),
+            "buffered_frames": len(self._frames),
+            "frames_captured": self.frames_captured,
+            "frames_encoded": self.frames_encoded,
+            "frames_skipped": self.frames_skipped,
+            "capture_fps": round(self.frames_captured / elapsed, 1) if elapsed else 0,
+            "preview_fps": round(self.frames_encoded / elapsed, 1) if elapsed else 0,
+            "encode_ms": round(self.encode_ms, 2),
+            "levels": [{"width": width, "quality": quality} for width, quality in self.preview_levels],
+            "face_detection": self.detection_available(),
+            "face_clients": self.face_events.client_count(),
+            "detect_ms": round(self.detect_ms, 2),
+            "auto_captures": self.auto_captures,
+            "relay": self._relaying,
+            "clients": [s.get_stats() for s in sorted(self._subscriptions, key=lambda s: s.id)]
+        }
+
+    # ========================================================
+    # AUFNAHME-THREAD
+    # ========================================================
+
+    def _ensure_running(self) -> None:
+        """Startet den Thread (Lock gehalten)"""
+        if self._thread is not None:
+            return
+
+        # Ein gerade endender Thread muss die Kamera erst freigeben
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(self._previous,), name=f"camera-{self.device_id}", daemon=True)
+        self._previous = self._thread
+        self._thread.start()
+
+    def _run(self, previous: Optional[threading.Thread]) -> None:
+        """Liest Frames, bis niemand mehr zusieht"""
+        if previous is not None:
+            previous.join()
+
+        exchange = self._exchange
+        if exchange is None:
+            self._read_camera()
+            return
+
+        # Kamera gehört einem anderen Worker: dessen Bilder zeigen, bis er sie freigibt
+        while not exchange.lock.acquire(blocking=False):
+            if not self._relay():
+                return
+
+        try:
+            exchange.begin()
+            self._read_camera()
+        finally:
+            exchange.lock.release()
+
+    def _read_camera(self) -> None:
+        """Öffnet die Kamera und verteilt ihre Frames"""
+        camera = CameraHandler(self.config)
+
+        if not camera.open():
+            self._finish()
+            return
+
+        self.frames_captured = self.frames_encoded = self.frames_skipped = 0
+        self.started_at = time.monotonic()
+        next_preview = 0.0
+        failures = 0
+
+        try:
+            while not self._stop.is_set():
+                frame = camera.read_frame()
+
+                if frame is None:
+                    failures += 1
+                    if failures >= MAX_READ_FAILURES:
+                        print(f"❌ Kamera {self.device_id} liefert keine Bilder mehr")
+                        break
+                    time.sleep(0.05)
+                    continue
+
+                failures = 0
+                now = time.monotonic()
+                self._remote = remote = self._exchange is not None and self._exchange.watched()
+
+                with self._lock:
+                    self._frames.append((now, frame))
+                    self.frames_captured += 1
+                    self._new_frame.notify_all()
+                    subscriptions = list(self._subscriptions)
+
+                    watched = subscriptions or self.face_events.client_count() or remote
+                    if not watched and now - self._last_used > self.idle_timeout:
+                        self._thread = None
+                        break
+
+                if self._exchange is not None:
+                    self._serve_requests()
+
+                if self.frames_captured % self.detect_every == 0 and (self.face_events.client_count() or remote):
+                    self._detect_faces(frame, now)
+
+                if not subscriptions and not remote:
+                    continue
+
+                # Nur kodieren, wenn ein Client den letzten Frame schon abgeholt
+                # hat und das Vorschau-Intervall um ist - sonst überspringen
+                # (etwas Spielraum, sonst fällt ein knapp zu früher Frame
+                # ganz aus und 30 fps Kamera / 15 fps Vorschau ergeben nur 10)
+                if next_preview - now > self.preview_interval / 4:
+                    self.frames_skipped += 1
+                    continue
+
+                ready = []
+                for subscription in subscriptions:
+                    if subscription.pending:
+                        subscription.frames_dropped += 1
+                    else:
+                        ready.append(subscription)
+
+                if not ready and not remote:
+                    self.frames_skipped += 1
+                    continue
+
+                # Fester Takt; wer mehr als ein Intervall hinterher ist, beginnt neu
+                next_preview = max(next_preview, now - self.preview_interval) + self.preview_interval
+                encoded = self._broadcast(frame, ready, now)
+
+                if remote:
+                    jpeg = encoded.get(0)
+                    if 0 not in encoded:
+                        jpeg = self._encode_preview(frame, 0)
+                        self.frames_encoded += 1
+                    if jpeg is not None:
+                        self._exchange.write_preview(jpeg)
+        finally:
+            camera.close()
+            self._finish()
+
+    def _serve_requests(self) -> None:
+        """Aufnahme-Wünsche anderer Worker aus dem Frame-Puffer erfüllen"""
+        requests = self._exchange.take_requests()
+        if not requests:
+            return
+
+        with self._lock:
+            frames = [frame for _, frame in self._frames]
+
+        for capture_id, mode in requests:
+            self._remember(self._pick(frames, mode), capture_id)
+
+    def _relay(self) -> bool:
+        """
+        Zeigt die Kamera eines anderen Workers (Vorschau und Gesichts-Ereignisse)
+
+        Returns:
+            True, wenn die Kamera frei geworden ist (selbst übernehmen),
+            False bei Leerlauf oder stop()
+        """
+        exchange = self._exchange
+
+        with self._lock:
+            self._relaying = True
+            self._new_frame.notify_all()
+
+        self.frames_captured = self.frames_encoded = self.frames_skipped = 0
+        self.started_at = time.monotonic()
+        preview_seen = None
+        # Nur neue Ereignisse weitergeben (alte auto_capture lösen sonst Suchen aus)
+        faces_seen = exchange.last_face_seq()
+        touched = checked = 0.0
+
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+
+                with self._lock:
+                    subscriptions = list(self._subscriptions)
+
+                    watched = subscriptions or self.face_events.client_count()
+                    if not watched and now - self._last_used > self.idle_timeout:
+                        self._thread = None
+                        break
+
+                # Hält die Kamera des Besitzers offen
+                if now - touched >= 1.0:
+                    exchange.touch()
+                    touched = now
+
+                # Besitzer hat die Kamera geschlossen (Leerlauf oder beendet)
+                if now - checked >= 1.0:
+                    checked = now
+                    if exchange.lock.acquire(blocking=False):
+                        exchange.lock.release()
+                        return True
+
+                preview_seen, jpeg = exchange.read_preview(preview_seen)
+                if jpeg is not None:
+                    self.frames_captured += 1
+                    self._jpeg = jpeg
+                    for subscription in subscriptions:
+                        if subscription.pending:
+                            subscription.frames_dropped += 1
+                        else:
+                            self._hand_over(subscription, jpeg, now)
+
+                for seq, event_type, data in exchange.read_face_events(faces_seen):
+                    faces_seen = seq
+                    self.face_events.publish(event_type, data)
+
+                time.sleep(RELAY_POLL)
+        finally:
+            with self._lock:
+                self._relaying = False
+
+        self._finish()
+        return False
+
+    def _detect_faces(self, frame: np.ndarray, now: float) -> None:
+        """Gesichter melden, bei ruhigem Einzelgesicht automatisch aufnehmen"""
+        if not self.detection_available():
+            return
+
+        start = time.perf_counter()
+        boxes = self._detector.detect(frame)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.detect_ms = elapsed if not self.detect_ms else self.detect_ms * 0.9 + elapsed * 0.1
+
+        self._publish_faces("faces", {"boxes": [[round(v, 4) for v in box] for box in boxes]})
+
+        if self.auto_capture and self._trigger.update(boxes, now):
+            self.auto_captures += 1
+            self._publish_faces("auto_capture", {
+                "capture_id": self._remember(frame),
+                "box": [round(v, 4) for v in boxes[0]]
+            })
+
+    def _publish_faces(self, event_type: str, data: dict) -> None:
+        """An die eigenen Clients und, wenn jemand zusieht, an die anderen Worker"""
+        self.face_events.publish(event_type, data)
+
+        if self._remote:
+            self._exchange.publish_face_event(event_type, data)
+
+    def _encode_preview(self, frame: np.ndarray, level: int) -> Optional[bytes]:
+        """Vorschau-JPEG einer Stufe (Dauer als gleitender Mittelwert in encode_ms)"""
+        width, quality = self.preview_levels[min(level, len(self.preview_levels) - 1)]
+
+        start = time.perf_counter()
+        jpeg = CameraHandler.encode_preview(frame, width, quality)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.encode_ms = elapsed if not self.encode_ms else self.encode_ms * 0.9 + elapsed * 0.1
+        return jpeg
+
+    def _broadcast(self, frame: np.ndarray, subscriptions: list, captured_at: float) -> Dict[int, Optional[bytes]]:
+        """
+        Kodiert einmal pro benötigter Stufe und verteilt an die Event-Loops der Clients
+
+        Returns:
+            Kodierte Vorschau pro Stufe
+        """
+        encoded: Dict[int, Optional[bytes]] = {}
+
+        for subscription in subscriptions:
+            level = subscription.level
+            if level not in encoded:
+                encoded[level] = self._encode_preview(frame, level)
+                self.frames_encoded += 1
+
+            jpeg = encoded[level]
+            if jpeg is None:
+                continue
+
+            if level == 0 or self._jpeg is None:
+                self._jpeg = jpeg
+
+            self._hand_over(subscription, jpeg, captured_at)
+
+        return encoded
+
+    def _hand_over(self, subscription: FrameSubscription, jpeg: bytes, captured_at: float) -> None:
+        """Übergibt einen Frame an den Event-Loop des Clients"""
+        subscription.pending = True
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.push, jpeg, captured_at)
+        except RuntimeError:
+            # Event-Loop bereits geschlossen
+            self.unsubscribe(subscription)
+
+    def _finish(self) -> None:
+        """Thread endet: Puffer leeren, bei Fehler/Stopp die Streams beenden"""
+        with self._lock:
+            current = self._thread is threading.current_thread()
+            if current:
+                self._thread = None
+            self._frames.clear()
+            self._jpeg = None
+            self._new_frame.notify_all()
+
+        # Ende wegen Leerlauf: keine Abonnenten; sonst Fehler oder stop()
+        if current:
+            self._close_subscriptions()
+
+    def _close_subscriptions(self) -> None:
+        self.face_events.close()
+
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, None)
+            except RuntimeError:
+                pass
+
+
+# ============================================================
+# HILFSFUNKTIONEN
+# ============================================================
+
+def sharpness(frame) -> float:
+    """Schärfe eines BGR-Frames (Varianz des Laplace-Filters, größer = schärfer)"""
+    height, width = frame.shape[:2]
+
+    if width > SHARPNESS_WIDTH:
+        frame = cv2.resize(frame, (SHARPNESS_WIDTH, height * SHARPNESS_WIDTH // width), interpolation=cv2.INTER_AREA)
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def get_camera_feed(app) -> CameraFeed:
+    """
+    Gibt den prozessweiten Feed der konfigurierten Kamera zurück (lazy erstellt)
+
+    Mit mehreren Workern hat jeder Prozess einen Feed, die Kamera öffnet
+    aber nur einer (siehe CameraFeed).
+    """
+    feeds: Dict[int, CameraFeed] = getattr(app.state, "camera_feeds", None)
+
+    if feeds is None:
+        feeds = app.state.camera_feeds = {}
+
+    config = app.state.config
+    device_id = config.get("camera.device_id", 0)
+
+    feed = feeds.get(device_id)
+    if feed is None:
+        feed = feeds[device_id] = CameraFeed(config)
+
+    return feed
+
+
+def stop_camera_feeds(app) -> None:
+    """Beendet alle Feeds (Herunterfahren oder geänderte Kamera-Einstellungen)"""
+    feeds: Dict[int, CameraFeed] = getattr(app.state, "camera_feeds", None) or {}
+
+    for feed in feeds.values():
+        feed.stop()
+
+    feeds.clear()
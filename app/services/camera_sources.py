@@ -0,0 +1,219 @@
+"""
+Kamera-Quellen - USB-Kamera, Videodatei oder Bildfolge (virtuelle Kamera)
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# OpenCV
+try:
+    import cv2
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+
+
+# Bildfolgen bis zu dieser Länge werden einmal dekodiert und im Speicher gehalten
+MAX_CACHED_IMAGES = 300
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+SOURCES = ("device", "video", "images")
+
+
+# ============================================================
+# QUELLEN
+# ============================================================
+
+def open_source(config):
+    """
+    Öffnet die konfigurierte Kamera-Quelle (camera.source)
+
+    - device: USB-Kamera (DirectShow unter Windows, sonst Standard-Backend)
+    - video:  Videodatei (camera.source_path), abgespielt mit camera.source_fps
+    - images: Ordner oder Glob-Muster mit Bildern, abgespielt mit camera.source_fps
+
+    Alle Quellen verhalten sich wie cv2.VideoCapture (isOpened, read,
+    get, set, release).
+    """
+    source = config.get("camera.source", "device")
+
+    if source == "device":
+        device_id = config.get("camera.device_id", 0)
+        backend = cv2.CAP_DSHOW if os.name == "nt" else cv2.CAP_ANY
+        return cv2.VideoCapture(device_id, backend)
+
+    path = config.get("camera.source_path", "")
+    fps = config.get("camera.source_fps", 30)
+    loop = config.get("camera.source_loop", True)
+
+    if source == "video":
+        return VideoFileSource(path, fps, loop)
+    if source == "images":
+        return ImageSequenceSource(path, fps, loop)
+
+    raise ValueError(f"Unbekannte Kamera-Quelle: {source} (erlaubt: {', '.join(SOURCES)})")
+
+
+class ReplaySource(ABC):
+    """
+    Basis für abgespielte Quellen: Takt (fps, 0 = so schnell wie möglich)
+    und Endlosschleife
+    """
+
+    def __init__(self, fps: float, loop: bool):
+        self.fps = fps
+        self.loop = loop
+        self._next_frame = 0.0
+        self._size: Tuple[int, int] = (0, 0)
+
+    def read(self) -> tuple:
+        self._pace()
+
+        frame = self._next()
+        if frame is None and self.loop and self._rewind():
+            frame = self._next()
+
+        if frame is None:
+            return False, None
+
+        self._size = (frame.shape[1], frame.shape[0])
+        return True, frame
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._size[0]
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._size[1]
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def set(self, prop: int, value: float) -> bool:
+        # Auflösung/Puffer lassen sich bei Dateien nicht einstellen
+        return False
+
+    def _pace(self) -> None:
+        """Wartet bis zum nächsten Frame (wie eine echte Kamera)"""
+        if not self.fps:
+            return
+
+        now = time.monotonic()
+        interval = 1 / self.fps
+
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+            self._next_frame += interval
+        else:
+            # Zu langsam gelesen: Takt neu beginnen statt aufzuholen
+            self._next_frame = now + interval
+
+    @abstractmethod
+    def _next(self):
+        """Nächster Frame oder None am Ende der Quelle"""
+
+    @abstractmethod
+    def _rewind(self) -> bool:
+        """Zurück an den Anfang (False, wenn nicht möglich)"""
+
+
+class VideoFileSource(ReplaySource):
+    """Spielt eine Videodatei als Kamera ab"""
+
+    def __init__(self, path: str, fps: float = 30, loop: bool = True):
+        super().__init__(fps, loop)
+        self.path = Path(path)
+        self._capture = cv2.VideoCapture(str(self.path))
+
+    def isOpened(self) -> bool:
+        return self._capture is not None and self._capture.isOpened()
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS or self._capture is None:
+            return super().get(prop)
+        return self._capture.get(prop)
+
+    def release(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def _next(self):
+        ok, frame = self._capture.read()
+        return frame if ok else None
+
+    def _rewind(self) -> bool:
+        return self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageSequenceSource(ReplaySource):
+    """Spielt die Bilder eines Ordners (oder Glob-Musters) als Kamera ab"""
+
+    def __init__(self, path: str, fps: float = 30, loop: bool = True):
+        super().__init__(fps, loop)
+        self.files = find_images(path)
+        self._position = 0
+
+        # Kurze Folgen einmal dekodieren (sonst misst ein Benchmark nur imread)
+        self._cache: Optional[list] = None
+        if 0 < len(self.files) <= MAX_CACHED_IMAGES:
+            self._cache = [frame for frame in map(self._load, self.files) if frame is not None]
+            if self._cache:
+                self._size = (self._cache[0].shape[1], self._cache[0].shape[0])
+
+    def isOpened(self) -> bool:
+        return self.files is not None and bool(self.files)
+
+    def release(self) -> None:
+        self.files = None
+        self._cache = None
+
+    def _next(self):
+        if self._cache is not None:
+            if self._position >= len(self._cache):
+                return None
+
+            self._position += 1
+            return self._cache[self._position - 1].copy()
+
+        # Nur das Ende der Liste beendet die Folge - unlesbare Bilder
+        # werden übersprungen und aus der Liste genommen (einmal gemeldet)
+        while self._position < len(self.files):
+            frame = self._load(self.files[self._position])
+
+            if frame is not None:
+                self._position += 1
+                return frame
+
+            del self.files[self._position]
+
+        return None
+
+    def _rewind(self) -> bool:
+        self._position = 0
+        return True
+
+    @staticmethod
+    def _load(path: Path):
+        frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"⚠️ Bild nicht lesbar: {path.name}")
+        return frame
+
+
+def find_images(path: str) -> List[Path]:
+    """Bilder eines Ordners oder Glob-Musters, nach Namen sortiert"""
+    if not path:
+        return []
+
+    pattern = Path(path)
+
+    if pattern.is_dir():
+        files = pattern.iterdir()
+    else:
+        files = pattern.parent.glob(pattern.name)
+
+    return sorted(f for f in files if f.suffix.lower() in IMAGE_SUFFIXES)
@@ -0,0 +1,184 @@
+"""
+Disk-Cache - Dateibasierter LRU-Cache mit Größenbudget
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+# ============================================================
+# DISK CACHE
+# ============================================================
+
+class DiskCache:
+    """
+    LRU-Cache für erzeugte Dateien (z.B. Thumbnails)
+
+    Jeder Eintrag ist eine Datei im Cache-Ordner. Die Reihenfolge der
+    letzten Zugriffe wird im Speicher gehalten; beim Start wird sie aus
+    den Änderungszeiten der vorhandenen Dateien rekonstruiert. Wird das
+    Budget überschritten, werden die am längsten nicht genutzten
+    Einträge gelöscht.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".bin"):
+        """
+        Args:
+            directory: Cache-Ordner
+            max_bytes: Maximale Gesamtgröße in Bytes
+            suffix: Dateiendung der Einträge
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+        # Dateiname -> Größe (älteste zuerst)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistiken
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._scan()
+
+    # ========================================================
+    # ZUGRIFF
+    # ========================================================
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Holt einen Eintrag
+
+        Args:
+            key: Cache-Schlüssel
+
+        Returns:
+            Pfad zur Datei oder None
+        """
+        name = self._filename(key)
+        path = self.directory / name
+
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+
+            if not path.exists():
+                # Von außen gelöscht
+                self._total_bytes -= self._entries.pop(name)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits += 1
+
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """
+        Speichert einen Eintrag (atomar über temporäre Datei)
+
+        Args:
+            key: Cache-Schlüssel
+            data: Dateiinhalt
+
+        Returns:
+            Pfad zur Datei
+        """
+        name = self._filename(key)
+        path = self.directory / name
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{name}.{threading.get_ident()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if name in self._entries:
+                self._total_bytes -= self._entries.pop(name)
+
+            self._entries[name] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+        return path
+
+    def clear(self) -> int:
+        """Löscht alle Einträge"""
+        with self._lock:
+            count = len(self._entries)
+            for name in list(self._entries):
+                self._remove(name)
+            return count
+
+    def get_stats(self) -> dict:
+        """Gibt Cache-Statistiken zurück"""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    # ========================================================
+    # HILFSFUNKTIONEN
+    # ========================================================
+
+    def _filename(self, key: str) -> str:
+        """Dateiname aus Schlüssel"""
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + self.suffix
+
+    def _scan(self) -> None:
+        """Liest vorhandene Einträge ein (älteste zuerst)"""
+        if not self.directory.exists():
+            return
+
+        files = []
+        for f in self.directory.iterdir():
+            if not f.is_file():
+                continue
+
+            if f.suffix == ".tmp":
+                # Reste eines abgebrochenen Schreibvorgangs
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+                continue
+
+            if f.suffix == self.suffix:
+                stat = f.stat()
+                files.append((stat.st_mtime, f.name, stat.st_size))
+
+        files.sort()
+        for _, name, size in files:
+            self._entries[name] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Entfernt älteste Einträge bis das Budget eingehalten wird (Lock gehalten)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            name = next(iter(self._entries))
+            self._remove(name)
+            self.evictions += 1
+
+    def _remove(self, name: str) -> None:
+        """Löscht einen Eintrag (Lock gehalten)"""
+        self._total_bytes -= self._entries.pop(name)
+        try:
+            (self.directory / name).unlink()
+        except OSError:
+            pass
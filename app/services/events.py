@@ -0,0 +1,179 @@
+"""
+Ereignisse - Push-Kanal (Server-Sent Events) für Karussell-Anzeigen
+"""
+
+import asyncio
+import json
+import threading
+from typing import Optional, Set
+
+
+# Kompakte Bildfelder für "image_added"
+IMAGE_EVENT_FIELDS = ("id", "filename", "timestamp", "face_count", "person_count")
+
+
+# ============================================================
+# ABONNEMENT
+# ============================================================
+
+class Subscription:
+    """Ein verbundener Client (eigene Queue im Event-Loop des Clients)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, message: Optional[str]) -> None:
+        """Legt Nachricht ab (läuft im Event-Loop)"""
+        if message is None:
+            # Stream beenden - Platz schaffen falls voll
+            while self.queue.full():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+
+        if self.queue.full():
+            # Client zu langsam: Rückstand verwerfen, Client lädt komplett neu
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = format_event("resync", {})
+
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """
+        Wartet auf die nächste Nachricht
+
+        Returns:
+            SSE-Nachricht, "" bei Timeout (Keepalive) oder None bei Stream-Ende
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ""
+
+
+# ============================================================
+# EVENT BROADCASTER
+# ============================================================
+
+class EventBroadcaster:
+    """Verteilt Ereignisse an alle verbundenen Anzeigen"""
+
+    def __init__(self, queue_size: int = 100):
+        """
+        Args:
+            queue_size: Maximale Anzahl wartender Nachrichten pro Client
+        """
+        self.queue_size = queue_size
+
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._event_id = 0
+
+    def subscribe(self) -> Subscription:
+        """Meldet einen Client an (muss im Event-Loop aufgerufen werden)"""
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Meldet einen Client ab"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, data: dict) -> None:
+        """
+        Sendet ein Ereignis an alle Clients (thread-sicher, z.B. aus dem Watcher)
+
+        Args:
+            event_type: Ereignistyp (image_added, image_removed, settings_changed, ...)
+            data: Kompakte Nutzdaten
+        """
+        with self._lock:
+            self._event_id += 1
+            message = format_event(event_type, data, self._event_id)
+            subscriptions = list(self._subscriptions)
+
+        self._dispatch(subscriptions, message)
+
+    def close(self) -> None:
+        """Beendet alle offenen Streams (beim Herunterfahren)"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+
+        self._dispatch(subscriptions, None)
+
+    def client_count(self) -> int:
+        """Anzahl verbundener Clients"""
+        return len(self._subscriptions)
+
+    def _dispatch(self, subscriptions: list, message: Optional[str]) -> None:
+        """Übergibt Nachricht an die Event-Loops der Clients"""
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, message)
+            except RuntimeError:
+                # Event-Loop bereits geschlossen
+                self.unsubscribe(subscription)
+
+
+# ============================================================
+# HILFSFUNKTIONEN
+# ============================================================
+
+def format_event(event_type: str, data: dict, event_id: int = None) -> str:
+    """Formatiert eine SSE-Nachricht"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def compact_image(image_data: dict) -> dict:
+    """Reduziert Bilddaten auf die Felder, die das Karussell braucht"""
+    compact = {field: image_data.get(field) for field in IMAGE_EVENT_FIELDS}
+
+    # Ergebnis von process_image enthält die ID als "image_id"
+    if not compact["id"]:
+        compact["id"] = image_data.get("image_id")
+
+    return compact
+
+
+def close_event_streams(app) -> None:
+    """
+    Beendet die offenen Streams aller Broadcaster der App (Herunterfahren)
+
+    Karussell, Druckwarteschlange und Gesichtserkennung der Kamera-Feeds -
+    die Clients bekommen ein sauberes Stream-Ende.
+    """
+    broadcasters = [getattr(app.state, "events", None)]
+
+    print_queue = getattr(app.state, "print_queue", None)
+    if print_queue is not None:
+        broadcasters.append(print_queue.events)
+
+    for feed in (getattr(app.state, "camera_feeds", None) or {}).values():
+        broadcasters.append(feed.face_events)
+
+    for broadcaster in broadcasters:
+        if broadcaster is not None:
+            broadcaster.close()
+
+
+def get_broadcaster(app) -> EventBroadcaster:
+    """Gibt den prozessweiten Broadcaster zurück (lazy erstellt)"""
+    broadcaster = getattr(app.state, "events", None)
+
+    if broadcaster is None:
+        broadcaster = EventBroadcaster()
+        app.state.events = broadcaster
+
+    return broadcaster
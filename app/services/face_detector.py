@@ -0,0 +1,137 @@
+"""
+Gesichtserkennung für die Live-Vorschau - schnell (Haar-Kaskade), nur Positionen
+"""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# OpenCV
+try:
+    import cv2
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+
+
+# Normierte Box: x, y, Breite, Höhe (Anteile der Frame-Größe)
+Box = Tuple[float, float, float, float]
+
+CASCADE_NAME = "haarcascade_frontalface_default.xml"
+
+
+# ============================================================
+# FACE DETECTOR
+# ============================================================
+
+class FaceDetector:
+    """
+    Findet Gesichter auf einer verkleinerten Graustufen-Kopie des Frames
+
+    Nur für die Vorschau (Rahmen, Auto-Auslöser) - die eigentliche
+    Suche berechnet weiterhin face_recognition-Encodings.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Config-Instanz (camera.face_detection.*)
+        """
+        self.width = config.get("camera.face_detection.width", 320)
+        self.min_neighbors = config.get("camera.face_detection.min_neighbors", 5)
+
+        self._cascade = None
+
+        if OPENCV_AVAILABLE:
+            path = Path(getattr(getattr(cv2, "data", None), "haarcascades", "")) / CASCADE_NAME
+
+            if path.exists():
+                self._cascade = cv2.CascadeClassifier(str(path))
+            else:
+                print(f"⚠️ {CASCADE_NAME} nicht gefunden - Live-Gesichtserkennung deaktiviert")
+
+    def available(self) -> bool:
+        """Ist die Erkennung einsatzbereit?"""
+        return self._cascade is not None and not self._cascade.empty()
+
+    def detect(self, frame) -> List[Box]:
+        """
+        Erkennt Gesichter in einem BGR-Frame
+
+        Returns:
+            Normierte Boxen (x, y, w, h), größte zuerst
+        """
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.width / width)
+
+        small = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        gray = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+
+        min_size = max(12, gray.shape[1] // 12)
+        faces = self._cascade.detectMultiScale(gray, scaleFactor=1.15, minNeighbors=self.min_neighbors, minSize=(min_size, min_size))
+
+        small_height, small_width = gray.shape[:2]
+        boxes = [
+            (x / small_width, y / small_height, w / small_width, h / small_height)
+            for x, y, w, h in faces
+        ]
+
+        return sorted(boxes, key=lambda box: box[2] * box[3], reverse=True)
+
+
+# ============================================================
+# AUTO-AUSLÖSER
+# ============================================================
+
+class StableFaceTrigger:
+    """
+    Löst aus, wenn genau ein ausreichend großes Gesicht über mehrere
+    Erkennungen hinweg ruhig bleibt
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: Config-Instanz (camera.face_detection.*)
+        """
+        self.min_width = config.get("camera.face_detection.min_face_width", 0.2)
+        self.stable_detections = config.get("camera.face_detection.stable_detections", 3)
+        self.tolerance = config.get("camera.face_detection.tolerance", 0.05)
+        self.cooldown = config.get("camera.face_detection.cooldown", 5)
+
+        self._previous: Optional[Box] = None
+        self._streak = 0
+        self._last_fired = -math.inf
+
+    def update(self, boxes: List[Box], now: float) -> bool:
+        """
+        Neues Erkennungsergebnis
+
+        Returns:
+            True, wenn jetzt aufgenommen werden soll
+        """
+        if len(boxes) != 1 or boxes[0][2] < self.min_width:
+            self._previous = None
+            self._streak = 0
+            return False
+
+        box = boxes[0]
+
+        if self._previous is not None and self._is_still(self._previous, box):
+            self._streak += 1
+        else:
+            self._streak = 1
+
+        self._previous = box
+
+        if self._streak < self.stable_detections or now - self._last_fired < self.cooldown:
+            return False
+
+        self._last_fired = now
+        self._streak = 0
+        return True
+
+    def _is_still(self, a: Box, b: Box) -> bool:
+        """Mittelpunkt und Größe haben sich kaum verändert"""
+        center_shift = math.hypot((a[0] + a[2] / 2) - (b[0] + b[2] / 2), (a[1] + a[3] / 2) - (b[1] + b[3] / 2))
+        return center_shift <= self.tolerance and abs(a[2] - b[2]) <= self.tolerance
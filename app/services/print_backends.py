@@ -0,0 +1,244 @@
+"""
+Druck-Backends - Windows GDI (Freigabe-Drucker) oder Spool (PNG/PDF-Dateien)
+"""
+
+import io
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+from PIL import Image
+
+from .print_layout import PageGeometry, MM_PER_INCH
+
+# Windows-Druck (pywin32)
+try:
+    import win32print
+    import win32ui
+    import win32con
+    from PIL import ImageWin
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+
+# Papierformate in mm (Hochformat)
+PAPER_SIZES = {
+    "A3": (297, 420),
+    "A4": (210, 297),
+    "A5": (148, 210),
+    "A6": (105, 148),
+    "10x15": (102, 152),
+    "13x18": (127, 178),
+}
+
+BACKENDS = ("auto", "gdi", "spool")
+
+# Rendert die Seite für den bedruckbaren Bereich des Druckers
+PageRenderer = Callable[[PageGeometry], Image.Image]
+
+
+# ============================================================
+# BASIS
+# ============================================================
+
+class PrintBackend(ABC):
+    """
+    Gibt fertige Seiten auf einem Drucker aus
+
+    print_page() fragt zuerst die Seitengeometrie ab und lässt dann die
+    Seite dafür rendern - so kennt nur das Backend das Gerät.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def print_page(self, printer, render: PageRenderer, copies: int = 1, title: str = "") -> None:
+        """
+        Druckt eine Seite copies-mal (Fehler als Exception)
+
+        Args:
+            printer: PrinterConfig
+            render: Erzeugt das Seitenbild für die Geometrie des Druckers
+            copies: Anzahl Kopien
+            title: Dokumentname in der Druckwarteschlange
+        """
+
+    def list_printers(self) -> List[str]:
+        """Verfügbare Drucker"""
+        return []
+
+    @abstractmethod
+    def test(self, printer_name: str) -> dict:
+        """Prüft, ob der Drucker erreichbar ist"""
+
+
+# ============================================================
+# WINDOWS GDI
+# ============================================================
+
+class GdiBackend(PrintBackend):
+    """Windows-Drucker über GDI (win32ui Device Context)"""
+
+    name = "gdi"
+
+    def print_page(self, printer, render: PageRenderer, copies: int = 1, title: str = "") -> None:
+        # Device Context für Drucker erstellen
+        hdc = win32ui.CreateDC()
+        hdc.CreatePrinterDC(printer.name)
+
+        try:
+            # Druckbereich (Pixel) und DPI für mm zu Pixel Konvertierung
+            page = PageGeometry(
+                width=hdc.GetDeviceCaps(win32con.HORZRES),
+                height=hdc.GetDeviceCaps(win32con.VERTRES),
+                dpi_x=hdc.GetDeviceCaps(win32con.LOGPIXELSX),
+                dpi_y=hdc.GetDeviceCaps(win32con.LOGPIXELSY)
+            )
+
+            dib = ImageWin.Dib(render(page))
+
+            for _ in range(copies):
+                hdc.StartDoc(title)
+                hdc.StartPage()
+                dib.draw(hdc.GetHandleOutput(), (0, 0, page.width, page.height))
+                hdc.EndPage()
+                hdc.EndDoc()
+        finally:
+            hdc.DeleteDC()
+
+    def list_printers(self) -> List[str]:
+        printers = []
+        for printer_info in win32print.EnumPrinters(win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS):
+            printers.append(printer_info[2])  # pPrinterName
+        return printers
+
+    def test(self, printer_name: str) -> dict:
+        available_printers = self.list_printers()
+
+        # Prüfe ob der Druckername in der Liste ist
+        if printer_name in available_printers:
+            return {"success": True, "message": "Drucker erreichbar"}
+
+        return {
+            "success": False,
+            "message": f"Drucker '{printer_name}' nicht in der Liste verfügbarer Drucker gefunden. Verfügbare Drucker: {', '.join(available_printers[:5])}..."
+        }
+
+
+# ============================================================
+# SPOOL (DATEIEN)
+# ============================================================
+
+class SpoolBackend(PrintBackend):
+    """
+    Schreibt jede gedruckte Seite als Datei (ein Ordner pro Drucker)
+
+    Ersatz für die Shop-Drucker auf Linux/Testrechnern: gleiche Seiten
+    wie über GDI, Seitengröße aus paper_size/page_orientation und dpi.
+    PNG: eine Datei pro Kopie, PDF: eine Datei mit einer Seite pro Kopie.
+    """
+
+    name = "spool"
+
+    # Laufnummer für Dateinamen, über alle Instanzen (ein Backend pro PrinterManager)
+    _lock = threading.Lock()
+    _counter = 0
+
+    def __init__(self, directory: Path, file_format: str = "png", dpi: int = 300):
+        """
+        Args:
+            directory: Spool-Ordner
+            file_format: png oder pdf
+            dpi: Auflösung der Seiten
+        """
+        self.directory = Path(directory)
+        self.format = file_format.lower()
+        self.dpi = dpi
+
+        if self.format not in ("png", "pdf"):
+            raise ValueError(f"Unbekanntes Spool-Format: {file_format} (erlaubt: png, pdf)")
+
+    def geometry(self, printer) -> PageGeometry:
+        """Seitengröße aus Papierformat und Ausrichtung"""
+        width_mm, height_mm = PAPER_SIZES.get(printer.paper_size, PAPER_SIZES["A6"])
+
+        if printer.page_orientation == "Horizontal":
+            width_mm, height_mm = height_mm, width_mm
+
+        return PageGeometry(
+            width=round(width_mm * self.dpi / MM_PER_INCH),
+            height=round(height_mm * self.dpi / MM_PER_INCH),
+            dpi_x=self.dpi,
+            dpi_y=self.dpi
+        )
+
+    def print_page(self, printer, render: PageRenderer, copies: int = 1, title: str = "") -> None:
+        sheet = render(self.geometry(printer))
+
+        target = self.directory / _safe_name(printer.name or "printer")
+        target.mkdir(parents=True, exist_ok=True)
+
+        with SpoolBackend._lock:
+            SpoolBackend._counter += 1
+            stem = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{SpoolBackend._counter:04d}_{_safe_name(Path(title).stem)}"
+
+        if self.format == "pdf":
+            sheet.save(target / f"{stem}.pdf", "PDF", resolution=self.dpi, save_all=True, append_images=[sheet] * (copies - 1))
+            return
+
+        # Einmal kodieren, pro Kopie schreiben
+        buffer = io.BytesIO()
+        sheet.save(buffer, "PNG", dpi=(self.dpi, self.dpi), compress_level=1)
+        data = buffer.getvalue()
+
+        for copy_num in range(copies):
+            (target / f"{stem}_{copy_num + 1}.png").write_bytes(data)
+
+    def list_printers(self) -> List[str]:
+        if not self.directory.exists():
+            return []
+        return sorted(d.name for d in self.directory.iterdir() if d.is_dir())
+
+    def test(self, printer_name: str) -> dict:
+        target = self.directory / _safe_name(printer_name or "printer")
+        try:
+            target.mkdir(parents=True, exist_ok=True)
+            return {"success": True, "message": f"Spool-Ordner: {target}"}
+        except OSError as e:
+            return {"success": False, "message": str(e)}
+
+
+# ============================================================
+# AUSWAHL
+# ============================================================
+
+def get_backend(config) -> PrintBackend:
+    """
+    Druck-Backend aus printers.backend
+
+    auto: GDI unter Windows mit pywin32, sonst Spool
+    """
+    backend = config.get("printers.backend", "auto")
+
+    if backend == "auto":
+        backend = "gdi" if WIN32_AVAILABLE else "spool"
+
+    if backend == "gdi":
+        if not WIN32_AVAILABLE:
+            raise RuntimeError("GDI-Druck benötigt Windows mit pywin32 (printers.backend: spool verwenden)")
+        return GdiBackend()
+
+    if backend == "spool":
+        directory = config.root_dir / config.get("printers.spool.directory", "photos/print_spool")
+        return SpoolBackend(directory, config.get("printers.spool.format", "png"), config.get("printers.spool.dpi", 300))
+
+    raise ValueError(f"Unbekanntes Druck-Backend: {backend} (erlaubt: {', '.join(BACKENDS)})")
+
+
+def _safe_name(name: str) -> str:
+    """Drucker-/Dateiname als Ordnername (z.B. \\\\PC\\Drucker -> PC_Drucker)"""
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "printer"
@@ -0,0 +1,316 @@
+"""
+Drucklayout - Foto, Ränder und Datum einmal als fertige Seite rendern
+"""
+
+import io
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .disk_cache import DiskCache
+
+
+MM_PER_INCH = 25.4
+
+# Felder der Drucker-Konfiguration, die das Seitenbild bestimmen
+LAYOUT_FIELDS = (
+    "photo_width", "photo_height", "left_margin_photo", "top_margin_photo",
+    "left_margin_text", "top_margin_text", "text_rotation_angle",
+    "text_font_name", "text_size", "text_color", "enable_print_date"
+)
+
+
+# Fotos pro Blatt -> Raster (Spalten, Zeilen), wird bei Bedarf gedreht
+SHEET_GRIDS = {1: (1, 1), 2: (2, 1), 4: (2, 2)}
+
+# Abstand zwischen den Feldern eines Blatts (Schnittkante)
+SHEET_GAP_MM = 4
+
+
+# ============================================================
+# SEITENGEOMETRIE
+# ============================================================
+
+@dataclass(frozen=True)
+class PageGeometry:
+    """Bedruckbarer Bereich eines Druckers (GetDeviceCaps)"""
+    width: int  # HORZRES in Pixel
+    height: int  # VERTRES in Pixel
+    dpi_x: int  # LOGPIXELSX
+    dpi_y: int  # LOGPIXELSY
+
+    def mm_to_px(self, x_mm: float, y_mm: float) -> tuple:
+        """Millimeter -> Pixel (x, y)"""
+        return int(x_mm * self.dpi_x / MM_PER_INCH), int(y_mm * self.dpi_y / MM_PER_INCH)
+
+    def scaled(self, scale: float) -> "PageGeometry":
+        """Verkleinerte Seite (gleiches Layout in mm, weniger Pixel pro mm)"""
+        return PageGeometry(
+            width=max(1, round(self.width * scale)),
+            height=max(1, round(self.height * scale)),
+            dpi_x=self.dpi_x * scale,
+            dpi_y=self.dpi_y * scale
+        )
+
+
+# ============================================================
+# RENDERN
+# ============================================================
+
+def render_page(image_path: Path, printer, page: PageGeometry, date_text: Optional[str] = None) -> Image.Image:
+    """
+    Setzt eine Druckseite zusammen (gleiches Layout wie bisher direkt über GDI)
+
+    Das Foto wird in den Layout-Bereich (photo_width x photo_height ab den
+    Foto-Rändern) eingepasst und zentriert, das Datum an die Text-Position
+    gesetzt.
+
+    Args:
+        image_path: Pfad zum Foto
+        printer: PrinterConfig (Layout-Einstellungen)
+        page: Bedruckbarer Bereich des Druckers
+        date_text: Aufgedruckter Text oder None
+
+    Returns:
+        RGB-Bild in der Größe des bedruckbaren Bereichs
+    """
+    sheet = Image.new("RGB", (page.width, page.height), "white")
+
+    box_width, box_height = page.mm_to_px(printer.photo_width, printer.photo_height)
+    left, top = page.mm_to_px(printer.left_margin_photo, printer.top_margin_photo)
+
+    with Image.open(image_path) as img:
+        # JPEG: Decoder skaliert bereits beim Lesen
+        img.draft("RGB", (box_width, box_height))
+        photo = img.convert("RGB")
+
+    # Seitenverhältnis beibehalten
+    scale = min(box_width / photo.width, box_height / photo.height)
+    size = (max(1, int(photo.width * scale)), max(1, int(photo.height * scale)))
+
+    if size != photo.size:
+        photo = photo.resize(size, Image.LANCZOS)
+
+    # Zentrieren innerhalb des Layout-Bereichs
+    sheet.paste(photo, (left + (box_width - size[0]) // 2, top + (box_height - size[1]) // 2))
+
+    if date_text:
+        draw_text(sheet, printer, page, date_text)
+
+    return sheet
+
+
+def draw_text(sheet: Image.Image, printer, page: PageGeometry, text: str) -> None:
+    """Zeichnet den Text (Datum) an die Text-Position, optional gedreht"""
+    x, y = page.mm_to_px(printer.left_margin_text, printer.top_margin_text)
+    _, font_size = page.mm_to_px(0, printer.text_size)
+    font = load_font(printer.text_font_name, font_size)
+
+    if not printer.text_rotation_angle:
+        ImageDraw.Draw(sheet).text((x, y), text, font=font, fill=printer.text_color)
+        return
+
+    # Gedreht: Text auf transparente Ebene, drehen, einsetzen
+    left, top, right, bottom = font.getbbox(text)
+    layer = Image.new("RGBA", (right, bottom), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((0, 0), text, font=font, fill=printer.text_color)
+    layer = layer.rotate(printer.text_rotation_angle, expand=True, resample=Image.BICUBIC)
+    sheet.paste(layer, (x, y), layer)
+
+
+def content_box(printer, page: PageGeometry, date_text: Optional[str] = None) -> Tuple[int, int, int, int]:
+    """
+    Bedruckter Bereich einer Seite (Foto-Bereich plus Text) in Pixel
+
+    Returns:
+        (left, top, right, bottom), auf die Seite begrenzt
+    """
+    left, top = page.mm_to_px(printer.left_margin_photo, printer.top_margin_photo)
+    width, height = page.mm_to_px(printer.photo_width, printer.photo_height)
+    box = [left, top, left + width, top + height]
+
+    if date_text:
+        x, y = page.mm_to_px(printer.left_margin_text, printer.top_margin_text)
+        _, font_size = page.mm_to_px(0, printer.text_size)
+        _, _, text_width, text_height = load_font(printer.text_font_name, font_size).getbbox(date_text)
+
+        if printer.text_rotation_angle:
+            angle = math.radians(printer.text_rotation_angle)
+            text_width, text_height = (
+                abs(text_width * math.cos(angle)) + abs(text_height * math.sin(angle)),
+                abs(text_width * math.sin(angle)) + abs(text_height * math.cos(angle))
+            )
+
+        box = [min(box[0], x), min(box[1], y), max(box[2], x + int(text_width)), max(box[3], y + int(text_height))]
+
+    return (
+        max(0, box[0]), max(0, box[1]),
+        min(page.width, box[2]), min(page.height, box[3])
+    )
+
+
+def sheet_grid(per_sheet: int, page: PageGeometry, content: Tuple[int, int], gap: int) -> Tuple[int, int, float]:
+    """
+    Raster für mehrere Layouts pro Blatt
+
+    Probiert beide Ausrichtungen des Rasters und nimmt die, in der das
+    verkleinerte Layout am größten bleibt.
+
+    Args:
+        per_sheet: Fotos pro Blatt (SHEET_GRIDS)
+        page: Blattgröße
+        content: Breite/Höhe des bedruckten Bereichs in voller Größe
+        gap: Abstand zwischen den Feldern in Pixel
+
+    Returns:
+        (Spalten, Zeilen, Maßstab)
+    """
+    cols, rows = SHEET_GRIDS.get(per_sheet, (1, 1))
+    best = None
+
+    for c, r in {(cols, rows), (rows, cols)}:
+        cell_width = (page.width - gap * (c - 1)) / c
+        cell_height = (page.height - gap * (r - 1)) / r
+        scale = min(1.0, cell_width / max(1, content[0]), cell_height / max(1, content[1]))
+
+        if best is None or scale > best[2]:
+            best = (c, r, scale)
+
+    return best
+
+
+def render_sheet(renderer: "PageRenderer", image_paths: List[Path], printer, page: PageGeometry) -> Image.Image:
+    """
+    Setzt mehrere Fotos auf ein Blatt (printer.photos_per_sheet)
+
+    Jedes Feld enthält das normale Layout (Foto und Datum) verkleinert,
+    auf den bedruckten Bereich zugeschnitten und im Feld zentriert.
+    Leere Felder bleiben weiß.
+
+    Args:
+        renderer: Seiten-Renderer (verkleinerte Layouts kommen aus dem Cache)
+        image_paths: Fotos (höchstens photos_per_sheet)
+        printer: PrinterConfig
+        page: Blattgröße des Druckers
+
+    Returns:
+        RGB-Bild in der Größe des bedruckbaren Bereichs
+    """
+    date_text = print_date(printer)
+    left, top, right, bottom = content_box(printer, page, date_text)
+    gap, _ = page.mm_to_px(SHEET_GAP_MM, 0)
+
+    cols, rows, scale = sheet_grid(printer.photos_per_sheet, page, (right - left, bottom - top), gap)
+    small = page.scaled(scale)
+    crop = content_box(printer, small, date_text)
+
+    cell_width = (page.width - gap * (cols - 1)) / cols
+    cell_height = (page.height - gap * (rows - 1)) / rows
+
+    sheet = Image.new("RGB", (page.width, page.height), "white")
+    fields = {}
+
+    for i, image_path in enumerate(image_paths[:cols * rows]):
+        # Gleiches Foto mehrfach (Kopien): nur einmal holen
+        if image_path not in fields:
+            fields[image_path] = renderer.render(image_path, printer, small).crop(crop)
+        field = fields[image_path]
+
+        col, row = i % cols, i // cols
+        x = col * (cell_width + gap) + (cell_width - field.width) / 2
+        y = row * (cell_height + gap) + (cell_height - field.height) / 2
+        sheet.paste(field, (round(x), round(y)))
+
+    return sheet
+
+
+def print_date(printer) -> Optional[str]:
+    """Aufgedrucktes Datum (None, wenn abgeschaltet)"""
+    return datetime.now().strftime("%d.%m.%Y") if printer.enable_print_date else None
+
+
+def load_font(name: str, size: int) -> ImageFont.ImageFont:
+    """Lädt eine TrueType-Schrift (Name wie unter Windows, z.B. "Arial")"""
+    for candidate in (name, f"{name}.ttf", f"{name.lower()}.ttf"):
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+
+    return ImageFont.load_default(size)
+
+
+# ============================================================
+# SEITEN-CACHE
+# ============================================================
+
+class PageRenderer:
+    """
+    Rendert Druckseiten einmal und hält sie im Disk-Cache
+
+    Schlüssel: Bild (Pfad, Größe, Änderungszeit), Layout des Druckers,
+    Seitengeometrie und aufgedrucktes Datum. Alle Kopien und spätere
+    Nachdrucke verwenden dieselbe Seite.
+    """
+
+    def __init__(self, cache: DiskCache):
+        """
+        Args:
+            cache: Disk-Cache für die fertigen Seiten (PNG)
+        """
+        self.cache = cache
+
+    def render(self, image_path: Path, printer, page: PageGeometry) -> Image.Image:
+        """
+        Fertige Seite aus dem Cache oder neu gerendert
+
+        Returns:
+            RGB-Bild in der Größe des bedruckbaren Bereichs
+        """
+        date_text = print_date(printer)
+        key = page_key(image_path, printer, page, date_text)
+
+        path = self.cache.get(key)
+        if path is not None:
+            try:
+                with Image.open(path) as cached:
+                    return cached.convert("RGB")
+            except OSError:
+                # Defekter Eintrag: neu rendern
+                pass
+
+        sheet = render_page(image_path, printer, page, date_text)
+
+        # PNG verlustfrei, schnelle Kompression (Seiten werden selten gelesen)
+        buffer = io.BytesIO()
+        sheet.save(buffer, "PNG", compress_level=1)
+        self.cache.put(key, buffer.getvalue())
+
+        return sheet
+
+    def get_stats(self) -> dict:
+        """Cache-Statistiken"""
+        return self.cache.get_stats()
+
+
+def page_key(image_path: Path, printer, page: PageGeometry, date_text: Optional[str]) -> str:
+    """Cache-Schlüssel einer Druckseite"""
+    stat = Path(image_path).stat()
+    layout = {field: getattr(printer, field) for field in LAYOUT_FIELDS}
+
+    return json.dumps([
+        str(Path(image_path).resolve()), stat.st_size, stat.st_mtime_ns,
+        layout, [page.width, page.height, page.dpi_x, page.dpi_y], date_text
+    ], sort_keys=True)
+
+
+def create_page_renderer(config) -> PageRenderer:
+    """Seiten-Renderer mit Cache unter paths.temp/print_pages (printers.page_cache_mb)"""
+    max_mb = config.get("printers.page_cache_mb", 300)
+    cache = DiskCache(config.get_path("temp") / "print_pages", int(max_mb * 1024 * 1024), ".png")
+    return PageRenderer(cache)
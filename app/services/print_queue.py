@@ -0,0 +1,438 @@
+"""
+Druckwarteschlange - dauerhaft gespeicherte Aufträge, ein Worker pro Drucker
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..database import is_multi_process
+from ..interprocess import FileLock
+from .events import EventBroadcaster
+from .print_layout import create_page_renderer
+from .printer import PrinterManager
+
+
+# Abgeschlossene Aufträge
+FINAL_STATES = ("completed", "failed")
+
+
+# ============================================================
+# PRINT QUEUE
+# ============================================================
+
+class PrintQueue:
+    """
+    Nimmt Druckaufträge an und druckt sie der Reihe nach
+
+    Jeder Auftrag wird vor der Rückmeldung an den Kiosk gespeichert
+    (print_jobs.json bzw. Journal). Pro Drucker (Freigabename) arbeitet
+    ein Thread die Aufträge nacheinander ab und setzt den Status:
+    pending -> printing -> completed / failed.
+
+    Beim Start werden offene Aufträge wieder eingereiht - auch solche,
+    die beim Absturz gerade gedruckt wurden (lieber doppelt als gar nicht).
+
+    Mehrere Worker-Prozesse: nur der Prozess mit data/print_queue.lock
+    druckt. Die anderen speichern nur und geben Statusmeldungen an ihre
+    Clients weiter; stirbt der druckende Prozess, übernimmt ein anderer.
+    """
+
+    def __init__(self, config, database):
+        """
+        Args:
+            config: Config-Instanz
+            database: Database-Instanz
+        """
+        self.config = config
+        self.db = database
+
+        # Statusmeldungen für Kiosk-Clients (SSE)
+        self.events = EventBroadcaster()
+
+        # Fertige Druckseiten (für Kopien und Nachdrucke)
+        self.pages = create_page_renderer(config)
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, queue.Queue] = {}
+        self._workers: Dict[str, threading.Thread] = {}
+        # Eingereihte oder gerade gedruckte Aufträge (nie doppelt einreihen)
+        self._held: set = set()
+        self._stopping = False
+        self._owner = False
+        self._started = False
+
+        self._file_lock = FileLock(config.root_dir / "data" / "print_queue.lock") if is_multi_process(config) else None
+
+        # Zähler seit dem Start
+        self.completed = 0
+        self.failed = 0
+
+    # ========================================================
+    # START / STOP
+    # ========================================================
+
+    def start(self) -> None:
+        """Übernimmt die Warteschlange (oder wartet darauf, siehe Klasse)"""
+        if self._started:
+            return
+
+        self._started = True
+        self.db.add_listener(self._on_change)
+
+        if self._file_lock is None or self._file_lock.acquire(blocking=False):
+            self._take_over()
+            return
+
+        # Ein anderer Prozess druckt: warten, bis er sich beendet
+        threading.Thread(target=self._wait_for_lock, name="print-queue-standby", daemon=True).start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Laufende Aufträge beenden, wartende bleiben gespeichert (pending)"""
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers.values())
+
+            for jobs in self._queues.values():
+                jobs.put(None)
+
+        for worker in workers:
+            worker.join(timeout)
+
+        self.events.close()
+
+    def _wait_for_lock(self) -> None:
+        self._file_lock.acquire()
+
+        if not self._stopping:
+            print("🖨️ Druckwarteschlange von anderem Worker übernommen")
+            self._take_over()
+
+    def _take_over(self) -> None:
+        """Wird druckender Prozess: offene Aufträge wieder einreihen"""
+        with self._lock:
+            self._owner = True
+
+        jobs = self.db.get_open_print_jobs()
+
+        for job in jobs:
+            if job.get("status") == "printing":
+                print(f"⚠️ Druckauftrag {job['id']} wurde unterbrochen - wird erneut gedruckt")
+            self._enqueue(job)
+
+        if jobs:
+            print(f"🖨️ {len(jobs)} offene Druckaufträge wieder eingereiht")
+
+    # ========================================================
+    # AUFTRÄGE
+    # ========================================================
+
+    def submit(self, image_id: str, image_path: str, printer_type: str = "small", copies: int = 1) -> dict:
+        """
+        Speichert einen Druckauftrag und reiht ihn ein
+
+        Kehrt erst zurück, wenn der Auftrag auf der Platte ist.
+
+        Returns:
+            dict mit success und job (Datensatz) bzw. error
+        """
+        manager = PrinterManager(self.config, self.db)
+
+        error = manager.check(image_path, printer_type)
+        if error:
+            return {"success": False, "error": error}
+
+        printer = manager.printers[printer_type]
+        path = Path(image_path)
+
+        job_id = self.db.add_print_job({
+            "image_id": image_id,
+            "image_filename": path.name,
+            "image_path": str(path),
+            "printer_type": printer_type,
+            "printer_name": printer.name,
+            "price": printer.price * copies,
+            "copies": copies
+        }, wait=True)
+
+        job = self.db.get_print_job(job_id)
+
+        self.events.publish("print_job", job)
+        self._enqueue(job)
+
+        return {"success": True, "job": job, "position": self.position(job_id)}
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Druckauftrag mit Warteposition (0 = wird gedruckt)"""
+        job = self.db.get_print_job(job_id)
+
+        if job is not None and job.get("status") not in FINAL_STATES:
+            job["position"] = self.position(job_id)
+
+        return job
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        Position eines offenen Auftrags in der Warteschlange seines Druckers
+
+        Returns:
+            0 = wird gedruckt, 1 = als nächstes, ... (None: unbekannt)
+        """
+        open_jobs = self.db.get_open_print_jobs()
+        job = next((j for j in open_jobs if j["id"] == job_id), None)
+
+        if job is None:
+            return None
+
+        same_printer = [j for j in open_jobs if _device(j) == _device(job)]
+        printing = any(j.get("status") == "printing" for j in same_printer)
+
+        return same_printer.index(job) + (0 if printing else 1)
+
+    def _enqueue(self, job: dict) -> None:
+        """Reiht einen Auftrag beim Worker seines Druckers ein (nur druckender Prozess)"""
+        device = _device(job)
+
+        with self._lock:
+            # Schon eingereiht oder in Arbeit (z.B. erneut gemeldet nach "reload")
+            if not self._owner or self._stopping or job["id"] in self._held:
+                return
+
+            jobs = self._queues.get(device)
+            if jobs is None:
+                jobs = self._queues[device] = queue.Queue()
+
+            worker = self._workers.get(device)
+            if worker is None or not worker.is_alive():
+                if worker is not None:
+                    print(f"⚠️ Druck-Worker {device} war beendet - wird neu gestartet")
+                # Gleiche Queue: bereits eingereihte Aufträge bleiben erhalten
+                worker = threading.Thread(target=self._run, args=(device, jobs), name=f"print-{device}", daemon=True)
+                self._workers[device] = worker
+                worker.start()
+
+            self._held.add(job["id"])
+            jobs.put(job["id"])
+
+    def _release(self, job_ids: List[str]) -> None:
+        """Aufträge sind erledigt bzw. übersprungen und dürfen wieder eingereiht werden"""
+        with self._lock:
+            self._held.difference_update(job_ids)
+
+    def _run(self, device: str, jobs: queue.Queue) -> None:
+        """Worker eines Druckers: Aufträge nacheinander drucken"""
+        # Beim Sammeln entnommen, aber nicht aufs Blatt gepasst
+        backlog: List[Optional[str]] = []
+
+        while True:
+            job_id = backlog.pop(0) if backlog else jobs.get()
+
+            if job_id is None:
+                break
+
+            batch: List[dict] = []
+
+            # Fehler (Datenbank, Konfiguration) dürfen den Worker nicht beenden -
+            # sonst bleiben alle weiteren Aufträge des Druckers liegen
+            try:
+                job = self._open_job(job_id)
+                if job is None:
+                    continue
+
+                batch.append(job)
+
+                manager = PrinterManager(self.config, self.db, self.pages)
+                printer = manager.printers.get(job.get("printer_type"))
+                sheets = printer is not None and printer.photos_per_sheet > 1
+
+                if sheets:
+                    backlog.extend(self._collect(jobs, batch, printer.photos_per_sheet, printer.sheet_timeout))
+
+                self._print(manager, batch, sheets)
+
+            except Exception as e:
+                print(f"❌ Fehler im Druck-Worker {device}: {e}")
+                self._fail([job["id"] for job in batch] or [job_id], str(e))
+
+            finally:
+                self._release([job_id] + [job["id"] for job in batch])
+
+    def _collect(self, jobs: queue.Queue, batch: List[dict], per_sheet: int, timeout: float) -> List[Optional[str]]:
+        """
+        Sammelt weitere Aufträge desselben Drucker-Typs, bis ein Blatt voll
+        ist oder timeout Sekunden seit dem ersten vergangen sind
+
+        Returns:
+            Entnommene IDs, die nicht aufs Blatt gehören (anderer Typ, Stopp)
+        """
+        deadline = time.monotonic() + timeout
+        photos = batch[0].get("copies", 1)
+
+        while photos % per_sheet:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                job_id = jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if job_id is None:
+                return [None]
+
+            try:
+                job = self._open_job(job_id)
+            except Exception:
+                # Im nächsten Durchlauf von _run erneut (mit Fehlerbehandlung)
+                return [job_id]
+
+            if job is None:
+                self._release([job_id])
+                continue
+
+            # Jeder Auftrag genau einmal aufs Blatt
+            if any(queued["id"] == job_id for queued in batch):
+                continue
+
+            if job.get("printer_type") != batch[0].get("printer_type"):
+                return [job_id]
+
+            batch.append(job)
+            photos += job.get("copies", 1)
+
+        return []
+
+    def _open_job(self, job_id: str) -> Optional[dict]:
+        """Auftrag, falls noch zu drucken (doppelt eingereiht oder inzwischen erledigt: None)"""
+        job = self.db.get_print_job(job_id)
+
+        if job is None or job.get("status") in FINAL_STATES:
+            return None
+
+        return job
+
+    def _print(self, manager: PrinterManager, batch: List[dict], sheets: bool) -> None:
+        """Druckt Aufträge (sheets: gemeinsam auf Blätter) und speichert die Ergebnisse"""
+        started = []
+        for job in batch:
+            job = self.db.update_print_job(
+                job["id"],
+                status="printing",
+                started_at=datetime.now().isoformat(),
+                attempts=job.get("attempts", 0) + 1
+            )
+            # Inzwischen nicht mehr vorhanden
+            if job is None:
+                continue
+            self.events.publish("print_job", job)
+            started.append(job)
+
+        if not started:
+            return
+
+        try:
+            if sheets:
+                results = manager.print_sheets(started)
+            else:
+                results = {job["id"]: manager.print_job(job) for job in started}
+        except Exception as e:
+            results = {job["id"]: {"success": False, "error": str(e)} for job in started}
+
+        for job in started:
+            result = results[job["id"]]
+
+            if result["success"]:
+                changes = {"status": "completed", "error": None}
+                self.completed += 1
+            else:
+                changes = {"status": "failed", "error": result.get("error", "Unbekannter Fehler")}
+                self.failed += 1
+                print(f"❌ Druckauftrag {job['id']} fehlgeschlagen: {changes['error']}")
+
+            # Nicht auf das Speichern warten (hält sonst den Drucker auf) - geht
+            # der Status bei einem Absturz verloren, wird nur nochmal gedruckt
+            job = self.db.update_print_job(job["id"], completed_at=datetime.now().isoformat(), **changes)
+            if job is not None:
+                self.events.publish("print_job", job)
+
+    def _fail(self, job_ids: List[str], error: str) -> None:
+        """Markiert offene Aufträge nach einem Fehler im Worker als fehlgeschlagen"""
+        for job_id in job_ids:
+            try:
+                if self._open_job(job_id) is None:
+                    continue
+
+                job = self.db.update_print_job(job_id, status="failed", error=error, completed_at=datetime.now().isoformat())
+                self.failed += 1
+                if job is not None:
+                    self.events.publish("print_job", job)
+            except Exception as e:
+                print(f"⚠️ Druckauftrag {job_id} konnte nicht als fehlgeschlagen markiert werden: {e}")
+
+    def _on_change(self, op: str, entry: dict) -> None:
+        """Änderungen anderer Worker-Prozesse (Datenbank-Listener)"""
+        if op == "print_job":
+            self.events.publish("print_job", entry["job"])
+            self._enqueue(entry["job"])
+
+        elif op == "print_job_update":
+            job = self.db.get_print_job(entry["id"])
+            if job is not None:
+                self.events.publish("print_job", job)
+
+        elif op == "reload":
+            # Neu geladen (verdichtet): nichts verpassen - erledigte werden beim
+            # Drucken übersprungen, eingereihte und laufende von _enqueue
+            for job in self.db.get_open_print_jobs():
+                self._enqueue(job)
+
+    # ========================================================
+    # STATISTIKEN
+    # ========================================================
+
+    def get_stats(self) -> dict:
+        """Zustand der Warteschlange"""
+        open_jobs = self.db.get_open_print_jobs()
+
+        devices: Dict[str, dict] = {}
+        for job in open_jobs:
+            counters = devices.setdefault(_device(job), {"waiting": 0, "printing": None})
+            if job.get("status") == "printing":
+                counters["printing"] = job["id"]
+            else:
+                counters["waiting"] += 1
+
+        return {
+            "active": self._owner,
+            "open_jobs": len(open_jobs),
+            "completed": self.completed,
+            "failed": self.failed,
+            "printers": devices,
+            "page_cache": self.pages.get_stats(),
+            "clients": self.events.client_count()
+        }
+
+    def get_open_jobs(self) -> List[dict]:
+        """Offene Aufträge (älteste zuerst)"""
+        return self.db.get_open_print_jobs()
+
+
+def _device(job: dict) -> str:
+    """Gerät eines Auftrags (mehrere Typen können denselben Drucker nutzen)"""
+    return job.get("printer_name") or job.get("printer_type", "small")
+
+
+def get_print_queue(app) -> PrintQueue:
+    """Gibt die prozessweite Druckwarteschlange zurück (lazy erstellt und gestartet)"""
+    print_queue = getattr(app.state, "print_queue", None)
+
+    if print_queue is None:
+        print_queue = PrintQueue(app.state.config, app.state.db)
+        print_queue.start()
+        app.state.print_queue = print_queue
+
+    return print_queue
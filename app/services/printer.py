@@ -1,23 +1,15 @@
 """
 Drucker-Manager - Windows Freigabe-Drucker
-Verwendet win32print für direkten Zugriff auf Windows-Drucker
+Ausgabe über ein Druck-Backend (GDI unter Windows, sonst Spool-Dateien)
 """
 
-import os
-import win32print
-import win32api
-import win32ui
-import win32con
-import subprocess
 from pathlib import Path
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import Dict, Optional, List
 from dataclasses import dataclass
-import tempfile
 import logging
 
-# PIL für Bildverarbeitung
-from PIL import Image, ImageWin
+from .print_backends import GdiBackend, PrintBackend, WIN32_AVAILABLE, get_backend
+from .print_layout import SHEET_GRIDS, PageRenderer, create_page_renderer, render_sheet
 
 
 # ============================================================
@@ -49,6 +41,10 @@ class PrinterConfig:
     text_color: str = "#000000"  # Textfarbe (#rrggbb)
     enable_print_date: bool = True  # Datum drucken ja/nein
 
+    # Mehrere Fotos pro Blatt (Layout verkleinert im Raster)
+    photos_per_sheet: int = 1  # 1, 2 oder 4
+    sheet_timeout: float = 10.0  # Sekunden warten, bis ein Blatt voll ist
+
 
 @dataclass
 class PrintJob:
@@ -71,15 +67,19 @@ class PrintJob:
 class PrinterManager:
     """Verwaltet Druckaufträge für Windows Freigabe-Drucker"""
 
-    def __init__(self, config, database):
+    def __init__(self, config, database, pages: PageRenderer = None, backend: PrintBackend = None):
         """
         Args:
             config: Config-Instanz
             database: Database-Instanz
+            pages: Seiten-Renderer mit Cache (wird sonst bei Bedarf erstellt)
+            backend: Druck-Backend (sonst aus printers.backend)
         """
         self.config = config
         self.db = database
         self.logger = logging.getLogger(__name__)
+        self._pages = pages
+        self._backend = backend
 
         # Drucker laden (später können mehr hinzugefügt werden)
         self.printers = {
@@ -104,7 +104,11 @@ class PrinterManager:
                 text_font_name=config.get("printers.small.text_font_name", "Arial"),
                 text_size=config.get("printers.small.text_size", 11.0),
                 text_color=config.get("printers.small.text_color", "#000000"),
-                enable_print_date=config.get("printers.small.enable_print_date", True)
+                enable_print_date=config.get("printers.small.enable_print_date", True),
+
+                # Mehrere Fotos pro Blatt
+                photos_per_sheet=config.get("printers.small.photos_per_sheet", 1),
+                sheet_timeout=config.get("printers.small.sheet_timeout", 10.0)
             ),
             "big": PrinterConfig(
                 name=config.get("printers.big.name", ""),  # Später hinzufügen
@@ -127,7 +131,11 @@ class PrinterManager:
                 text_font_name=config.get("printers.big.text_font_name", "Arial"),
                 text_size=config.get("printers.big.text_size", 11.0),
                 text_color=config.get("printers.big.text_color", "#000000"),
-                enable_print_date=config.get("printers.big.enable_print_date", True)
+                enable_print_date=config.get("printers.big.enable_print_date", True),
+
+                # Mehrere Fotos pro Blatt
+                photos_per_sheet=config.get("printers.big.photos_per_sheet", 1),
+                sheet_timeout=config.get("printers.big.sheet_timeout", 10.0)
             )
         }
 
@@ -157,269 +165,215 @@ class PrinterManager:
         """
         self.logger.info(f"Druckauftrag gestartet: {Path(image_path).name} -> {printer_type} (Kopien: {copies})")
 
-        # Prüfungen
-        if not self.enabled:
-            self.logger.error("Drucken ist deaktiviert")
-            return {"success": False, "error": "Drucken ist deaktiviert"}
-
-        if printer_type not in self.printers:
-            self.logger.error(f"Unbekannter Drucker-Typ: {printer_type}")
-            return {"success": False, "error": f"Unbekannter Drucker-Typ: {printer_type}"}
+        error = self.check(image_path, printer_type)
+        if error:
+            return {"success": False, "error": error}
 
         printer = self.printers[printer_type]
-
-        if not printer.enabled:
-            self.logger.error(f"Drucker '{printer.display_name}' ist deaktiviert")
-            return {"success": False, "error": f"Drucker '{printer.display_name}' ist deaktiviert"}
-
-        if not printer.name:
-            self.logger.error("Kein Drucker konfiguriert")
-            return {"success": False, "error": "Kein Drucker konfiguriert"}
-
         path = Path(image_path)
-        if not path.exists():
-            self.logger.error(f"Bilddatei nicht gefunden: {path}")
-            return {"success": False, "error": "Bilddatei nicht gefunden"}
-
-        self.logger.info(f"Bild gefunden: {path}, Größe: {path.stat().st_size} bytes")
 
         # Druckauftrag erstellen
         try:
             job_id = self.db.add_print_job({
                 "image_id": path.stem,
                 "image_filename": path.name,
+                "image_path": str(path),
                 "printer_type": printer_type,
                 "printer_name": printer.name,
-                "price": printer.price * copies
+                "price": printer.price * copies,
+                "copies": copies
             })
             self.logger.info(f"Druckauftrag erstellt: {job_id}")
         except Exception as e:
             self.logger.error(f"Fehler beim Erstellen des Druckauftrags: {e}")
             return {"success": False, "error": f"Druckauftrag konnte nicht erstellt werden: {e}"}
 
-        try:
-            # Bild für Druck vorbereiten (Größenanpassung)
-            self.logger.info(f"Bereite Bild vor für Papierformat: {printer.paper_size}")
-            print_path = self._prepare_image_for_print(path, printer.paper_size)
-            self.logger.info(f"Vorbereitetes Bild: {print_path}, Größe: {print_path.stat().st_size} bytes")
+        result = self._print(path, printer, copies)
 
-            # An Windows-Drucker senden
-            self.logger.info(f"Sende an Drucker: {printer.name}")
-            success = self._send_to_printer(print_path, printer.name, copies)
-
-            if success:
-                self.logger.info(f"✅ Druckauftrag erfolgreich: {path.name} -> {printer.display_name}")
-                print(f"✅ Druckauftrag gesendet: {path.name} -> {printer.display_name}")
-                return {
-                    "success": True,
-                    "job_id": job_id,
-                    "printer": printer.display_name,
-                    "price": printer.price * copies,
-                    "copies": copies
-                }
-            else:
-                self.logger.error(f"❌ Druckbefehl fehlgeschlagen: {path.name}")
-                return {"success": False, "error": "Druckbefehl fehlgeschlagen"}
+        if result["success"]:
+            result.update({
+                "job_id": job_id,
+                "printer": printer.display_name,
+                "price": printer.price * copies,
+                "copies": copies
+            })
 
-        except Exception as e:
-            self.logger.error(f"❌ Druckfehler: {e}")
-            print(f"❌ Druckfehler: {e}")
-            return {"success": False, "error": str(e)}
+        return result
 
-    def _prepare_image_for_print(self, image_path: Path, paper_size: str) -> Path:
+    def print_job(self, job: dict) -> dict:
         """
-        Bereitet Bild für Druck vor (ohne Größenanpassung - Drucker übernimmt Skalierung)
+        Druckt einen bereits gespeicherten Auftrag (aus der Druckwarteschlange)
 
         Args:
-            image_path: Pfad zum Bild
-            paper_size: Papiergröße (wird nicht verwendet)
+            job: Datensatz aus Database.add_print_job
 
         Returns:
-            Pfad zum vorbereiteten Bild
+            dict mit Ergebnis
         """
-        # Bild öffnen und als JPEG speichern (für Kompatibilität mit Druckern)
-        image = Image.open(image_path)
-
-        # Temporäre Datei erstellen
-        temp_dir = Path(tempfile.gettempdir()) / "photo_software"
-        temp_dir.mkdir(exist_ok=True)
+        image_path = job.get("image_path") or ""
+        printer_type = job.get("printer_type", "small")
 
-        temp_path = temp_dir / f"print_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
-        image.save(temp_path, "JPEG", quality=95)
+        error = self.check(image_path, printer_type)
+        if error:
+            return {"success": False, "error": error}
 
-        return temp_path
+        return self._print(Path(image_path), self.printers[printer_type], job.get("copies", 1))
 
-    def _send_to_printer(self, image_path: Path, printer_name: str, copies: int = 1) -> bool:
+    def print_sheets(self, jobs: List[dict]) -> Dict[str, dict]:
         """
-        Sendet Bild an Windows-Drucker über GDI mit benutzerdefinierten Layout-Einstellungen
+        Druckt Aufträge desselben Drucker-Typs gemeinsam auf Blätter
+        (photos_per_sheet Fotos pro Blatt, jede Kopie ein Feld)
+
+        Gleiche Blätter hintereinander gehen als Kopien an den Drucker.
 
         Args:
-            image_path: Pfad zum Bild
-            printer_name: Windows Freigabename
-            copies: Anzahl Kopien
+            jobs: Datensätze aus Database.add_print_job
 
         Returns:
-            True bei Erfolg
+            {job_id: Ergebnis}
         """
+        results = {}
+        printed = []
+        photos = []
+
+        for job in jobs:
+            error = self.check(job.get("image_path") or "", job.get("printer_type", "small"))
+
+            if error:
+                results[job["id"]] = {"success": False, "error": error}
+                continue
+
+            printed.append(job)
+            photos += [Path(job["image_path"])] * job.get("copies", 1)
+
+        if not printed:
+            return results
+
+        printer = self.printers[printed[0].get("printer_type", "small")]
+        per_sheet = max(1, printer.photos_per_sheet)
+
+        sheets = [photos[i:i + per_sheet] for i in range(0, len(photos), per_sheet)]
+
+        # Aufeinanderfolgende gleiche Blätter zusammenfassen
+        runs = []
+        for sheet in sheets:
+            if runs and runs[-1][0] == sheet:
+                runs[-1][1] += 1
+            else:
+                runs.append([sheet, 1])
+
         try:
-            self.logger.info(f"Drucke {image_path} auf {printer_name} mit GDI")
-
-            # Bild laden
-            img = Image.open(image_path)
-            self.logger.info(f"Bild geladen: {img.size}, Mode: {img.mode}")
-
-            for copy_num in range(copies):
-                self.logger.info(f"Drucke Kopie {copy_num + 1}/{copies}")
-
-                # Device Context für Drucker erstellen
-                hdc = win32ui.CreateDC()
-                hdc.CreatePrinterDC(printer_name)
-                self.logger.info("Printer DC erstellt")
-
-                try:
-                    # Dokument starten
-                    hdc.StartDoc(str(image_path))
-                    hdc.StartPage()
-                    self.logger.info("Dokument und Seite gestartet")
-
-                    # Druckbereich ermitteln (in Pixel)
-                    printable_width = hdc.GetDeviceCaps(win32con.HORZRES)
-                    printable_height = hdc.GetDeviceCaps(win32con.VERTRES)
-
-                    # DPI ermitteln für mm zu Pixel Konvertierung
-                    dpi_x = hdc.GetDeviceCaps(win32con.LOGPIXELSX)
-                    dpi_y = hdc.GetDeviceCaps(win32con.LOGPIXELSY)
-                    self.logger.info(f"Druckbereich: {printable_width}x{printable_height} Pixel bei {dpi_x}x{dpi_y} DPI")
-
-                    # Welcher Drucker wird verwendet? (bestimmen aus printer_name)
-                    printer_config = None
-                    for printer_type, config in self.printers.items():
-                        if config.name == printer_name:
-                            printer_config = config
-                            break
-
-                    if not printer_config:
-                        # Fallback auf small printer
-                        printer_config = self.printers["small"]
-                        self.logger.warning(f"Drucker-Konfiguration nicht gefunden für {printer_name}, verwende small")
-
-                    # Layout-Einstellungen anwenden
-                    photo_width_mm = printer_config.photo_width  # mm
-                    photo_height_mm = printer_config.photo_height  # mm
-                    left_margin_mm = printer_config.left_margin_photo  # mm
-                    top_margin_mm = printer_config.top_margin_photo  # mm
-
-                    # mm zu Pixel konvertieren
-                    photo_width_px = int((photo_width_mm * dpi_x) / 25.4)  # 25.4 mm = 1 inch
-                    photo_height_px = int((photo_height_mm * dpi_y) / 25.4)
-                    left_margin_px = int((left_margin_mm * dpi_x) / 25.4)
-                    top_margin_px = int((top_margin_mm * dpi_y) / 25.4)
-
-                    self.logger.info(f"Layout: Foto {photo_width_px}x{photo_height_px} Pixel bei ({left_margin_px}, {top_margin_px})")
-
-                    # Bild skalieren und positionieren
-                    img_width, img_height = img.size
-
-                    # Skalierung basierend auf Layout-Größe
-                    scale_x = photo_width_px / img_width
-                    scale_y = photo_height_px / img_height
-                    scale = min(scale_x, scale_y)  # Seitenverhältnis beibehalten
-
-                    new_width = int(img_width * scale)
-                    new_height = int(img_height * scale)
-
-                    # Zentrieren innerhalb des Layout-Bereichs
-                    x = left_margin_px + (photo_width_px - new_width) // 2
-                    y = top_margin_px + (photo_height_px - new_height) // 2
-
-                    self.logger.info(f"Bild-Skalierung: {img_width}x{img_height} -> {new_width}x{new_height} bei ({x},{y})")
-
-                    # Bild zeichnen
-                    dib = ImageWin.Dib(img)
-                    dib.draw(hdc.GetHandleOutput(), (x, y, x + new_width, y + new_height))
-                    self.logger.info("Bild gezeichnet")
-
-                    # Text hinzufügen falls aktiviert
-                    if printer_config.enable_print_date:
-                        self._draw_text_on_printer(hdc, printer_config, dpi_x, dpi_y)
-                        self.logger.info("Datum hinzugefügt")
-
-                    # Seite beenden
-                    hdc.EndPage()
-                    hdc.EndDoc()
-                    self.logger.info("Seite und Dokument beendet")
-
-                finally:
-                    hdc.DeleteDC()
-                    self.logger.info("DC gelöscht")
+            for sheet, copies in runs:
+                self.backend.print_page(
+                    printer,
+                    lambda page, sheet=sheet: render_sheet(self.pages, sheet, printer, page),
+                    copies,
+                    f"{len(sheet)} Fotos ({', '.join(dict.fromkeys(p.name for p in sheet))})"
+                )
 
-            return True
+            print(f"✅ {len(sheets)} Blätter mit {len(photos)} Fotos gesendet -> {printer.display_name}")
+            result = {"success": True, "sheets": len(sheets)}
 
         except Exception as e:
-            self.logger.error(f"❌ GDI Druckfehler: {e}")
-            print(f"❌ GDI Druckfehler: {e}")
-            return False
+            self.logger.error(f"❌ Druckfehler ({self.backend.name}): {e}")
+            print(f"❌ Druckfehler ({self.backend.name}): {e}")
+            result = {"success": False, "error": str(e)}
+
+        for job in printed:
+            results[job["id"]] = result
+
+        return results
 
-    def _draw_text_on_printer(self, hdc, printer_config, dpi_x: int, dpi_y: int) -> None:
+    def check(self, image_path: str, printer_type: str) -> Optional[str]:
         """
-        Zeichnet Text (z.B. Datum) auf den Drucker
+        Prüft, ob gedruckt werden kann
 
-        Args:
-            hdc: Device Context
-            printer_config: Drucker-Konfiguration
-            dpi_x, dpi_y: DPI-Werte
+        Returns:
+            Fehlermeldung oder None
         """
+        if not self.enabled:
+            error = "Drucken ist deaktiviert"
+        elif printer_type not in self.printers:
+            error = f"Unbekannter Drucker-Typ: {printer_type}"
+        elif not self.printers[printer_type].enabled:
+            error = f"Drucker '{self.printers[printer_type].display_name}' ist deaktiviert"
+        elif not self.printers[printer_type].name:
+            error = "Kein Drucker konfiguriert"
+        elif not image_path or not Path(image_path).exists():
+            error = "Bilddatei nicht gefunden"
+        else:
+            return None
+
+        self.logger.error(f"{error} ({image_path})")
+        return error
+
+    def _print(self, path: Path, printer: PrinterConfig, copies: int) -> dict:
+        """Sendet das Bild an den Drucker"""
+        self.logger.info(f"Bild gefunden: {path}, Größe: {path.stat().st_size} bytes")
+
         try:
-            from datetime import datetime
+            # An Windows-Drucker senden
+            self.logger.info(f"Sende an Drucker: {printer.name}")
+            success = self._send_to_printer(path, printer, copies)
 
-            # Text-Einstellungen
-            text = datetime.now().strftime("%d.%m.%Y")
-            font_name = printer_config.text_font_name
-            font_size_mm = printer_config.text_size  # mm
-            text_color = printer_config.text_color  # #rrggbb
-            rotation = printer_config.text_rotation_angle  # Grad
-
-            # Position in mm zu Pixel konvertieren
-            left_margin_px = int((printer_config.left_margin_text * dpi_x) / 25.4)
-            top_margin_px = int((printer_config.top_margin_text * dpi_y) / 25.4)
-
-            # Schriftgröße in mm zu Pixel konvertieren (ungefähr)
-            font_size_px = int((font_size_mm * dpi_y) / 25.4)
-
-            # Farbe parsen (#rrggbb -> RGB)
-            r = int(text_color[1:3], 16)
-            g = int(text_color[3:5], 16)
-            b = int(text_color[5:7], 16)
-
-            # Font erstellen
-            font = win32ui.CreateFont({
-                "name": font_name,
-                "height": font_size_px,
-                "weight": 400,  # Normal
-            })
+            if success:
+                self.logger.info(f"✅ Druckauftrag erfolgreich: {path.name} -> {printer.display_name}")
+                print(f"✅ Druckauftrag gesendet: {path.name} -> {printer.display_name}")
+                return {"success": True}
+            else:
+                self.logger.error(f"❌ Druckbefehl fehlgeschlagen: {path.name}")
+                return {"success": False, "error": "Druckbefehl fehlgeschlagen"}
 
-            # Alte Font speichern
-            old_font = hdc.SelectObject(font)
+        except Exception as e:
+            self.logger.error(f"❌ Druckfehler: {e}")
+            print(f"❌ Druckfehler: {e}")
+            return {"success": False, "error": str(e)}
 
-            # Textfarbe setzen
-            hdc.SetTextColor(win32api.RGB(r, g, b))
-            hdc.SetBkMode(win32con.TRANSPARENT)
+    def _send_to_printer(self, image_path: Path, printer: PrinterConfig, copies: int = 1) -> bool:
+        """
+        Sendet Bild an den Drucker (Backend) mit benutzerdefinierten Layout-Einstellungen
 
-            # Rotation anwenden falls nötig
-            if rotation != 0:
-                # Für Rotation müssten wir komplexere GDI-Operationen verwenden
-                # Vereinfacht: Rotation ignorieren für jetzt
-                pass
+        Die Seite (Foto, Ränder, Datum) wird einmal in Druckerauflösung
+        gerendert (bzw. aus dem Seiten-Cache geholt) und für jede Kopie
+        nur noch ausgegeben.
 
-            # Text zeichnen
-            hdc.TextOut(left_margin_px, top_margin_px, text)
+        Args:
+            image_path: Pfad zum Bild
+            printer: Drucker-Konfiguration
+            copies: Anzahl Kopien
 
-            # Font zurücksetzen
-            hdc.SelectObject(old_font)
-            font.DeleteObject()
+        Returns:
+            True bei Erfolg
+        """
+        try:
+            self.logger.info(f"Drucke {image_path} auf {printer.name} ({self.backend.name})")
+
+            self.backend.print_page(
+                printer,
+                lambda page: self.pages.render(image_path, printer, page),
+                copies,
+                str(image_path)
+            )
+            return True
 
         except Exception as e:
-            self.logger.error(f"Fehler beim Zeichnen des Textes: {e}")
+            self.logger.error(f"❌ Druckfehler ({self.backend.name}): {e}")
+            print(f"❌ Druckfehler ({self.backend.name}): {e}")
+            return False
+
+    @property
+    def backend(self) -> PrintBackend:
+        """Druck-Backend (printers.backend)"""
+        if self._backend is None:
+            self._backend = get_backend(self.config)
+        return self._backend
+
+    @property
+    def pages(self) -> PageRenderer:
+        """Seiten-Renderer (lazy, nur beim Drucken gebraucht)"""
+        if self._pages is None:
+            self._pages = create_page_renderer(self.config)
+        return self._pages
 
     # ========================================================
     # DRUCKER-VERWALTUNG
@@ -454,7 +408,11 @@ class PrinterManager:
             "text_font_name": printer.text_font_name,
             "text_size": printer.text_size,
             "text_color": printer.text_color,
-            "enable_print_date": printer.enable_print_date
+            "enable_print_date": printer.enable_print_date,
+
+            # Mehrere Fotos pro Blatt
+            "photos_per_sheet": printer.photos_per_sheet,
+            "sheet_timeout": printer.sheet_timeout
         }
 
     def get_all_printers(self) -> List[dict]:
@@ -482,7 +440,9 @@ class PrinterManager:
         text_font_name: str = None,
         text_size: float = None,
         text_color: str = None,
-        enable_print_date: bool = None
+        enable_print_date: bool = None,
+        photos_per_sheet: int = None,
+        sheet_timeout: float = None
     ) -> bool:
         """Aktualisiert Drucker-Einstellungen"""
         if printer_type not in self.printers:
@@ -557,6 +517,16 @@ class PrinterManager:
             printer.enable_print_date = enable_print_date
             self.config.set(f"printers.{printer_type}.enable_print_date", enable_print_date)
 
+        # Mehrere Fotos pro Blatt
+        if photos_per_sheet is not None:
+            photos_per_sheet = photos_per_sheet if photos_per_sheet in SHEET_GRIDS else 1
+            printer.photos_per_sheet = photos_per_sheet
+            self.config.set(f"printers.{printer_type}.photos_per_sheet", photos_per_sheet)
+
+        if sheet_timeout is not None:
+            printer.sheet_timeout = sheet_timeout
+            self.config.set(f"printers.{printer_type}.sheet_timeout", sheet_timeout)
+
         self.config.save()
         return True
 
@@ -591,21 +561,19 @@ class PrinterManager:
         Listet alle installierten Windows-Drucker auf
 
         Returns:
-            Liste der Druckernamen
+            Liste der Druckernamen (leer ohne pywin32)
         """
-        try:
-            printers = []
-            for printer_info in win32print.EnumPrinters(win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS):
-                printers.append(printer_info[2])  # pPrinterName
+        if not WIN32_AVAILABLE:
+            return []
 
-            return printers
+        try:
+            return GdiBackend().list_printers()
 
         except Exception as e:
             print(f"❌ Fehler beim Auflisten der Drucker: {e}")
             return []
 
-    @staticmethod
-    def test_printer(printer_name: str) -> dict:
+    def test_printer(self, printer_name: str) -> dict:
         """
         Testet ob Drucker erreichbar ist
 
@@ -616,17 +584,7 @@ class PrinterManager:
             dict mit Testergebnis
         """
         try:
-            # Liste aller verfügbaren Drucker
-            available_printers = PrinterManager.list_windows_printers()
-
-            # Prüfe ob der Druckername in der Liste ist
-            if printer_name in available_printers:
-                return {"success": True, "message": "Drucker erreichbar"}
-            else:
-                return {
-                    "success": False,
-                    "message": f"Drucker '{printer_name}' nicht in der Liste verfügbarer Drucker gefunden. Verfügbare Drucker: {', '.join(available_printers[:5])}..."
-                }
+            return self.backend.test(printer_name)
 
         except Exception as e:
             return {"success": False, "message": str(e)}
@@ -13,6 +13,8 @@ from datetime import datetime
 from PIL import Image
 import io
 
+from .thumbnails import generate_thumbnails, DEFAULT_SIZES
+
 # Watchdog für Ordnerüberwachung
 try:
     from watchdog.observers import Observer
@@ -49,6 +51,7 @@ class ImageProcessor:
         self.temp_path = config.get_path("temp")
         self.processed_path = config.get_path("processed")
         self.output_path = config.get_path("output")
+        self.thumbnails_path = config.get_path("thumbnails")
         
         # Statistiken
         self.stats = {
@@ -80,7 +83,8 @@ class ImageProcessor:
         4. Analysieren (Face, YOLO, Clothing)
         5. Annotiertes Bild speichern (mit Markierungen)
         6. Sauberes Bild speichern (ohne Markierungen)
-        7. In Datenbank speichern
+        7. Thumbnails erzeugen (Größenstufen)
+        8. In Datenbank speichern
         
         Args:
             image_path: Pfad zum Eingabebild
@@ -149,8 +153,12 @@ class ImageProcessor:
             image.save(output_file, "JPEG", quality=quality)
             print(f"   Gespeichert: {output_file.name}")
             
-            # 7. In Datenbank speichern
-            print("7️⃣ In Datenbank speichern...")
+            # 7. Thumbnails erzeugen
+            print("7️⃣ Thumbnails erzeugen...")
+            thumbnails = self._create_thumbnails(image_path, output_file)
+            
+            # 8. In Datenbank speichern
+            print("8️⃣ In Datenbank speichern...")
             
             # Timestamp aus Datei extrahieren
             try:
@@ -167,6 +175,7 @@ class ImageProcessor:
                 "timestamp": timestamp,
                 "width": image.size[0],
                 "height": image.size[1],
+                "thumbnails": thumbnails,
                 
                 # Analyse-Daten
                 "faces": analysis.get("faces", []) if analysis else [],
@@ -324,6 +333,46 @@ class ImageProcessor:
         
         return output.getvalue()
     
+    # ========================================================
+    # THUMBNAILS
+    # ========================================================
+    
+    def _create_thumbnails(self, original_file: Path, output_file: Path) -> dict:
+        """
+        Erzeugt die Größenstufen für Output- und Originalbild
+        
+        Args:
+            original_file: Pfad zum Originalbild
+            output_file: Pfad zum (zugeschnittenen) Output-Bild
+            
+        Returns:
+            dict {"output": {Größe: Pfad}, "original": {Größe: Pfad}}
+        """
+        if not self.config.get("thumbnails.enabled", True):
+            print("   Thumbnails deaktiviert")
+            return {}
+        
+        sizes = self.config.get("thumbnails.sizes", DEFAULT_SIZES)
+        quality = self.config.get("thumbnails.quality", 80)
+        
+        thumbnails = {}
+        sources = {"output": output_file, "original": original_file}
+        
+        for variant, source in sources.items():
+            try:
+                thumbnails[variant] = generate_thumbnails(
+                    source,
+                    self.thumbnails_path,
+                    f"{output_file.stem}_{variant}",
+                    sizes,
+                    quality
+                )
+            except Exception as e:
+                print(f"   ⚠️ Thumbnails ({variant}) fehlgeschlagen: {e}")
+        
+        print(f"   Stufen: {', '.join(str(s) for s in sorted(sizes))}")
+        return thumbnails
+    
     # ========================================================
     # HILFSFUNKTIONEN
     # ========================================================
@@ -17,6 +17,10 @@ except ImportError:
     FACE_RECOGNITION_AVAILABLE = False
 
 
+# Felder, die für die Suche gebraucht werden (Rest bleibt kompakt in der DB)
+SEARCH_FIELDS = ("id", "filename", "face_encodings", "clothing_colors")
+
+
 # ============================================================
 # DATENKLASSEN
 # ============================================================
@@ -93,13 +97,8 @@ class ImageSearcher:
         limit = limit or self.max_results
         results = []
         
-        # Alle Bilder aus Datenbank
-        all_images = self.db.get_all_images()
-        
-        if not all_images:
-            return []
-        
-        for image_data in all_images:
+        # Alle Bilder aus Datenbank (partitioned: Tag für Tag, nicht alle im Speicher)
+        for image_data in self.db.iter_images(fields=SEARCH_FIELDS):
             face_score = 0.0
             color_score = 0.0
             match_details = {}
@@ -455,17 +454,13 @@ class ImageSearcher:
     
     def get_search_stats(self) -> dict:
         """Gibt Such-Statistiken zurück"""
-        all_images = self.db.get_all_images()
-        
-        total_faces = sum(img.get("face_count", 0) for img in all_images)
-        total_with_faces = sum(1 for img in all_images if img.get("face_count", 0) > 0)
-        total_with_colors = sum(1 for img in all_images if img.get("clothing_colors"))
+        stats = self.db.get_image_stats()
         
         return {
-            "total_images": len(all_images),
-            "images_with_faces": total_with_faces,
-            "images_with_colors": total_with_colors,
-            "total_faces": total_faces,
+            "total_images": stats["total_images"],
+            "images_with_faces": stats["images_with_faces"],
+            "images_with_colors": stats["images_with_colors"],
+            "total_faces": stats["total_faces"],
             "face_threshold": self.face_threshold,
             "color_threshold": self.color_threshold,
             "max_results": self.max_results
@@ -0,0 +1,126 @@
+"""
+Thumbnails - Vorberechnete Größenstufen für Galerie und Karussell
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+
+# Standard-Größenstufen (längste Kante in Pixel)
+DEFAULT_SIZES = [200, 480, 1080]
+
+
+# ============================================================
+# THUMBNAIL PYRAMIDE
+# ============================================================
+
+def generate_thumbnails(
+    source_path: Path,
+    target_dir: Path,
+    name: str,
+    sizes: List[int] = None,
+    quality: int = 80
+) -> Dict[str, str]:
+    """
+    Erzeugt alle Größenstufen eines Bildes
+
+    Das JPEG wird im Draft-Modus dekodiert, d.h. der Decoder skaliert
+    bereits beim Lesen (1/2, 1/4, 1/8). Die Stufen werden von groß nach
+    klein erzeugt, jede kleinere Stufe entsteht aus der vorherigen.
+
+    Args:
+        source_path: Pfad zum Quellbild
+        target_dir: Zielordner
+        name: Basisname der Dateien (z.B. "IMG_0815_output")
+        sizes: Längste Kante pro Stufe
+        quality: JPEG-Qualität
+
+    Returns:
+        dict {Größe als String: Pfad}
+    """
+    sizes = sorted(set(sizes or DEFAULT_SIZES), reverse=True)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    thumbnails = {}
+
+    with Image.open(source_path) as img:
+        # Decoder direkt auf die größte Stufe reduzieren lassen
+        img.draft("RGB", (sizes[0], sizes[0]))
+        current = img.convert("RGB")
+
+    for size in sizes:
+        current.thumbnail((size, size))
+
+        thumb_path = target_dir / f"{name}_{size}.jpg"
+        current.save(thumb_path, "JPEG", quality=quality)
+        thumbnails[str(size)] = str(thumb_path)
+
+    return thumbnails
+
+
+def pick_thumbnail(thumbnails: Dict[str, str], size: int, tolerance: float = None) -> Optional[str]:
+    """
+    Wählt die passende vorberechnete Stufe für eine angefragte Größe
+
+    Es wird die kleinste Stufe genommen, die mindestens so groß ist wie
+    angefragt. Ist keine groß genug, wird die größte Stufe geliefert.
+    Mit tolerance werden nur Stufen bis tolerance * size akzeptiert
+    (sonst None, die Größe wird dann einzeln erzeugt).
+
+    Args:
+        thumbnails: dict {Größe als String: Pfad}
+        size: Angefragte Größe (längste Kante)
+        tolerance: Maximales Verhältnis Stufe / angefragte Größe
+
+    Returns:
+        Pfad oder None
+    """
+    if not thumbnails:
+        return None
+
+    available = sorted(int(s) for s in thumbnails)
+
+    for stored in available:
+        if stored >= size:
+            if tolerance is not None and stored > size * tolerance:
+                return None
+            return thumbnails[str(stored)]
+
+    if tolerance is not None:
+        return None
+
+    return thumbnails[str(available[-1])]
+
+
+def pick_source(thumbnails: Dict[str, str], size: int) -> Optional[str]:
+    """Kleinste vorberechnete Stufe, aus der size ohne Hochskalieren erzeugt werden kann"""
+    for stored in sorted(int(s) for s in thumbnails or {}):
+        if stored >= size:
+            return thumbnails[str(stored)]
+    return None
+
+
+def render_thumbnail(source_path: str, size: int, quality: int = 80) -> bytes:
+    """
+    Erzeugt ein einzelnes Thumbnail als JPEG-Bytes
+
+    Args:
+        source_path: Pfad zum Quellbild
+        size: Längste Kante
+        quality: JPEG-Qualität
+
+    Returns:
+        JPEG-Bytes
+    """
+    with Image.open(source_path) as img:
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+
+    img.thumbnail((size, size))
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
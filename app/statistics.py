@@ -0,0 +1,159 @@
+"""
+Statistiken - Inkrementell gepflegte Zähler für Bilder und Druckaufträge
+"""
+
+from typing import Dict, Iterable
+
+from .image_index import day_of
+
+
+# Zähler pro Tag (Bilder)
+IMAGE_COUNTERS = ("images", "faces", "persons", "with_faces", "with_colors")
+
+# Zähler pro Tag / Drucker (Druckaufträge)
+PRINT_COUNTERS = ("jobs", "revenue")
+
+
+def _add(target: Dict[str, dict], key: str, counters: Iterable[str], values: dict, sign: int) -> None:
+    """Addiert Werte auf einen Bucket (legt ihn bei Bedarf an, leere Buckets fallen weg)"""
+    bucket = target.get(key)
+
+    if bucket is None:
+        bucket = target[key] = dict.fromkeys(counters, 0)
+
+    for name, value in values.items():
+        bucket[name] += sign * value
+
+    if bucket[next(iter(bucket))] <= 0:
+        del target[key]
+
+
+def image_counters(image: dict) -> dict:
+    """Beitrag eines Bildes zu den Zählern"""
+    face_count = image.get("face_count", 0) or 0
+
+    return {
+        "images": 1,
+        "faces": face_count,
+        "persons": image.get("person_count", 0) or 0,
+        "with_faces": 1 if face_count > 0 else 0,
+        "with_colors": 1 if image.get("clothing_colors") else 0
+    }
+
+
+def summarize(images: Iterable[dict]) -> dict:
+    """Zähler sowie erster/letzter Timestamp einer Menge von Bildern (z.B. ein Tag)"""
+    summary = dict.fromkeys(IMAGE_COUNTERS, 0)
+    timestamps = []
+
+    for image in images:
+        for name, value in image_counters(image).items():
+            summary[name] += value
+        if image.get("timestamp"):
+            timestamps.append(image["timestamp"])
+
+    summary["first"] = min(timestamps) if timestamps else None
+    summary["last"] = max(timestamps) if timestamps else None
+    return summary
+
+
+# ============================================================
+# BILD-STATISTIKEN
+# ============================================================
+
+class ImageStatistics:
+    """
+    Aggregate über die Bilddatenbank
+
+    Wird bei jedem Hinzufügen/Löschen aktualisiert, Abfragen sind O(1)
+    bzw. O(Anzahl Tage). Die Tages-Buckets sind nach Aufnahmedatum
+    (YYYY-MM-DD, "" ohne lesbaren Timestamp) geschlüsselt.
+    """
+
+    def __init__(self):
+        self.totals = dict.fromkeys(IMAGE_COUNTERS, 0)
+        self.days: Dict[str, dict] = {}
+
+    def rebuild(self, images: Iterable[dict]) -> None:
+        """Berechnet alle Zähler neu"""
+        self.clear()
+        for image in images:
+            self.add(image)
+
+    def add(self, image: dict) -> None:
+        """Zählt ein Bild hinzu"""
+        self._apply(image, 1)
+
+    def remove(self, image: dict) -> None:
+        """Zieht ein Bild ab"""
+        self._apply(image, -1)
+
+    def clear(self) -> None:
+        """Setzt alle Zähler zurück"""
+        self.totals = dict.fromkeys(IMAGE_COUNTERS, 0)
+        self.days = {}
+
+    def day(self, day: str) -> dict:
+        """Zähler eines Tages (YYYY-MM-DD)"""
+        return dict(self.days.get(day) or dict.fromkeys(IMAGE_COUNTERS, 0))
+
+    def seed_day(self, day: str, counters: dict) -> None:
+        """Übernimmt vorberechnete Zähler eines nicht geladenen Tages (Manifest)"""
+        values = {name: counters.get(name, 0) for name in IMAGE_COUNTERS}
+
+        for name, value in values.items():
+            self.totals[name] += value
+
+        _add(self.days, day, IMAGE_COUNTERS, values, 1)
+
+    def _apply(self, image: dict, sign: int) -> None:
+        values = image_counters(image)
+
+        for name, value in values.items():
+            self.totals[name] += sign * value
+
+        _add(self.days, day_of(image.get("timestamp", "")), IMAGE_COUNTERS, values, sign)
+
+
+# ============================================================
+# DRUCK-STATISTIKEN
+# ============================================================
+
+class PrintStatistics:
+    """Aggregate über die Druckaufträge (pro Tag und pro Drucker)"""
+
+    def __init__(self):
+        self.total_jobs = 0
+        self.total_revenue = 0
+        self.days: Dict[str, dict] = {}
+        self.printers: Dict[str, dict] = {}
+
+    def rebuild(self, jobs: Iterable[dict]) -> None:
+        """Berechnet alle Zähler neu"""
+        self.total_jobs = 0
+        self.total_revenue = 0
+        self.days = {}
+        self.printers = {}
+
+        for job in jobs:
+            self.add(job)
+
+    def add(self, job: dict) -> None:
+        """Zählt einen Druckauftrag hinzu"""
+        values = {"jobs": 1, "revenue": job.get("price", 0) or 0}
+
+        self.total_jobs += 1
+        self.total_revenue += values["revenue"]
+
+        _add(self.days, day_of(job.get("created_at", "")), PRINT_COUNTERS, values, 1)
+        _add(self.printers, job.get("printer_type", "unknown"), PRINT_COUNTERS, values, 1)
+
+    def day(self, day: str) -> dict:
+        """Zähler eines Tages (YYYY-MM-DD)"""
+        return dict(self.days.get(day) or dict.fromkeys(PRINT_COUNTERS, 0))
+
+    def popular_printer(self) -> str:
+        """Drucker mit den meisten Aufträgen"""
+        if not self.printers:
+            return "-"
+        return max(self.printers, key=lambda p: self.printers[p]["jobs"])
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark für Live-Stream und Sofortaufnahme (ohne Kamera-Hardware)
+
+Spielt eine Videodatei oder Bildfolge als virtuelle Kamera ab
+(camera.source = video / images) und misst:
+
+- Kodierung: PIL (alter Pfad) vs. cv2.imencode pro Vorschau-Stufe
+- Stream: Frames/s und Latenz pro Client, CPU-Last des Prozesses
+- Aufnahme: Kaltstart vs. aus dem Frame-Puffer (latest / sharpest)
+
+Ohne --source wird eine synthetische Bildfolge erzeugt.
+
+Aufruf:
+    python benchmark_camera.py
+    python benchmark_camera.py --clients 1 4 16 --duration 5
+    python benchmark_camera.py --source aufnahme.mp4 --fps 0
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.services.camera import CameraHandler
+from app.services.camera_feed import CameraFeed
+
+
+def make_sequence(directory: Path, count: int = 60, width: int = 1280, height: int = 720) -> Path:
+    """Erzeugt eine Bildfolge: strukturierter Hintergrund + wanderndes "Gesicht" """
+    rng = np.random.default_rng(42)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (7, 7), 2)
+
+    for i in range(count):
+        frame = background.copy()
+        x = int(width * (0.3 + 0.4 * i / count))
+        cv2.ellipse(frame, (x, height // 2), (90, 120), 0, 0, 360, (170, 190, 230), -1)
+        cv2.putText(frame, f"{i:03d}", (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        cv2.imwrite(str(directory / f"frame_{i:04d}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+    return directory
+
+
+def make_config(tmp: Path, source: Path, fps: float) -> Config:
+    """Config mit virtueller Kamera (eigene config.json im Temp-Ordner)"""
+    config = Config(str(tmp / "config.json"))
+    config.load()
+
+    config.set("camera.source", "video" if source.is_file() else "images")
+    config.set("camera.source_path", str(source))
+    config.set("camera.source_fps", fps)
+    config.set("camera.flip_horizontal", True)
+    config.set("camera.face_detection.enabled", False)
+
+    return config
+
+
+def first_frame(config: Config) -> np.ndarray:
+    camera = CameraHandler(config)
+    camera.open()
+    frame = camera.read_frame()
+    camera.close()
+    return frame
+
+
+def timed(fn, repeat: int) -> float:
+    """Mittlere Dauer in ms"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run_encode_benchmark(config: Config, frame: np.ndarray) -> None:
+    """Vorschau-Kodierung: alter PIL-Pfad vs. cv2.imencode je Stufe"""
+    feed = CameraFeed(config)
+    height, width = frame.shape[:2]
+
+    print("=" * 66)
+    print(f"{'Kodierung':<30}{'Größe':>14}{'Zeit':>10}{'JPEG':>12}")
+    print("=" * 66)
+
+    jpeg = CameraHandler.encode_jpeg(frame, 90)
+    print(f"{'PIL, Qualität 90':<30}{f'{width}x{height}':>14}{timed(lambda: CameraHandler.encode_jpeg(frame, 90), 30):>8.2f}ms{len(jpeg) / 1024:>10.0f}KB")
+
+    for level, (level_width, quality) in enumerate(feed.preview_levels):
+        jpeg = CameraHandler.encode_preview(frame, level_width, quality)
+        elapsed = timed(lambda: CameraHandler.encode_preview(frame, level_width, quality), 30)
+        name = f"imencode Stufe {level}, Qualität {quality}"
+        print(f"{name:<30}{f'{level_width}px':>14}{elapsed:>8.2f}ms{len(jpeg) / 1024:>10.0f}KB")
+
+
+async def stream(config: Config, clients: int, duration: float) -> dict:
+    """Verbindet N Clients und liest duration Sekunden lang"""
+    feed = CameraFeed(config)
+    subscriptions = [feed.subscribe() for _ in range(clients)]
+
+    # Ersten Frame abwarten (Kamera öffnen zählt nicht zur Messung)
+    await subscriptions[0].get(timeout=5)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    end = time.monotonic() + duration
+
+    async def consume(subscription):
+        while time.monotonic() < end:
+            if await subscription.get(timeout=1) is None:
+                break
+
+    await asyncio.gather(*(consume(s) for s in subscriptions))
+
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start) * 100
+    stats = feed.get_stats()
+
+    for subscription in subscriptions:
+        feed.unsubscribe(subscription)
+    feed.stop()
+
+    clients_stats = stats["clients"]
+    return {
+        "capture_fps": stats["capture_fps"],
+        "client_fps": sum(c["fps"] for c in clients_stats) / len(clients_stats),
+        "latency_ms": sum(c["latency_ms"] for c in clients_stats) / len(clients_stats),
+        "encode_ms": stats["encode_ms"],
+        "cpu": cpu
+    }
+
+
+def run_stream_benchmark(config: Config, clients_list: list, duration: float) -> None:
+    """Gemeinsamer Feed mit 1..N Clients"""
+    print("=" * 66)
+    print(f"{'Clients':<10}{'Kamera fps':>12}{'Client fps':>12}{'Latenz':>10}{'Kodieren':>11}{'CPU':>9}")
+    print("=" * 66)
+
+    for clients in clients_list:
+        result = asyncio.run(stream(config, clients, duration))
+        print(
+            f"{clients:<10}{result['capture_fps']:>12.1f}{result['client_fps']:>12.1f}"
+            f"{result['latency_ms']:>8.1f}ms{result['encode_ms']:>9.2f}ms{result['cpu']:>8.0f}%"
+        )
+
+
+def run_capture_benchmark(config: Config, repeat: int = 20) -> None:
+    """Aufnahme: Kaltstart (Kamera öffnen) vs. aus dem laufenden Puffer"""
+    print("=" * 66)
+    print(f"{'Aufnahme':<30}{'Zeit':>12}")
+    print("=" * 66)
+
+    feed = CameraFeed(config)
+
+    start = time.perf_counter()
+    feed.capture("latest")
+    print(f"{'Kaltstart (Quelle öffnen)':<30}{(time.perf_counter() - start) * 1000:>10.1f}ms")
+
+    # Puffer füllen
+    time.sleep(0.5)
+
+    for mode in ("latest", "sharpest"):
+        print(f"{'Puffer, ' + mode:<30}{timed(lambda: feed.capture(mode), repeat):>10.2f}ms")
+
+    feed.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für Kamera-Stream und Aufnahme")
+    parser.add_argument("--source", help="Videodatei, Bildordner oder Glob-Muster (Standard: synthetisch)")
+    parser.add_argument("--fps", type=float, default=30, help="Abspielrate der Quelle (0 = so schnell wie möglich)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16], help="Anzahl Stream-Clients")
+    parser.add_argument("--duration", type=float, default=5, help="Messdauer pro Lauf in Sekunden")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        if args.source:
+            source = Path(args.source)
+        else:
+            source = tmp / "frames"
+            source.mkdir()
+            make_sequence(source)
+            print(f"🎞️ Synthetische Bildfolge: {len(list(source.iterdir()))} Frames, 1280x720")
+
+        config = make_config(tmp, source, args.fps)
+
+        frame = first_frame(config)
+        if frame is None:
+            print(f"❌ Quelle liefert keine Bilder: {source}")
+            return
+
+        run_encode_benchmark(config, frame)
+        run_stream_benchmark(config, args.clients, args.duration)
+        run_capture_benchmark(config)
+
+
+if __name__ == "__main__":
+    main()
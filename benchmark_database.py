@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Dateiformate der Bilddatenbank
+
+Erzeugt synthetische Bild-Datensätze (inkl. Face-Encodings und
+Kleiderfarben) und misst pro Format Speicher-/Ladezeit und Dateigröße.
+Mit --memory wird der Arbeitsspeicher pro 10.000 Bilder verglichen
+(dicts wie geladen vs. kompakte ImageRecords).
+
+Aufruf:
+    python benchmark_database.py
+    python benchmark_database.py --sizes 1000 10000 --formats json orjson
+    python benchmark_database.py --memory
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.records import compact_all
+from app.serializers import available_formats, get_serializer, dump_file, load_file
+
+
+COLOR_NAMES = ["Rot", "Blau", "Grün", "Schwarz", "Weiß", "Grau", "Gelb", "Orange"]
+
+
+def make_records(count: int, seed: int = 42) -> dict:
+    """Erzeugt synthetische Datensätze wie Database.add_image"""
+    rng = random.Random(seed)
+    start = datetime(2026, 5, 1, 9, 0, 0)
+    images = {}
+
+    for i in range(count):
+        timestamp = (start + timedelta(seconds=i * 7)).isoformat()
+        image_id = f"IMG_{timestamp.replace('-', '').replace(':', '').replace('T', '')}_{i:08x}"
+        face_count = rng.choice([0, 1, 1, 2, 3])
+
+        faces = []
+        for _ in range(face_count):
+            top, left = rng.randint(0, 2000), rng.randint(0, 3000)
+            faces.append({
+                "location": {"top": top, "right": left + 200, "bottom": top + 200, "left": left},
+                "width": 200,
+                "height": 200,
+                "center": {"x": left + 100, "y": top + 100}
+            })
+
+        colors = []
+        for _ in range(rng.randint(0, 3)):
+            rgb = [rng.randint(0, 255) for _ in range(3)]
+            colors.append({
+                "rgb": rgb,
+                "hex": "#{:02x}{:02x}{:02x}".format(*rgb),
+                "percentage": round(rng.uniform(5, 60), 1),
+                "name": rng.choice(COLOR_NAMES),
+                "brightness": round(sum(rgb) / 3, 1)
+            })
+
+        images[image_id] = {
+            "id": image_id,
+            "filename": f"DSC_{i:05d}.JPG",
+            "original_path": f"C:/photos/input/DSC_{i:05d}.JPG",
+            "processed_path": f"C:/photos/processed/DSC_{i:05d}.JPG",
+            "output_path": f"C:/photos/output/DSC_{i:05d}_output.jpg",
+            "thumbnails": {},
+            "timestamp": timestamp,
+            "faces": faces,
+            "face_count": face_count,
+            "face_encodings": [[rng.uniform(-0.3, 0.3) for _ in range(128)] for _ in range(face_count)],
+            "persons": [],
+            "person_count": face_count,
+            "clothing_colors": colors,
+            "width": 6000,
+            "height": 4000,
+            "created_at": timestamp
+        }
+
+    return images
+
+
+def run_benchmark(sizes: list, formats: list) -> None:
+    """Misst Speichern/Laden pro Format und Größe"""
+    print("=" * 66)
+    print(f"{'Format':<10}{'Datensätze':>12}{'Speichern':>12}{'Laden':>12}{'Größe':>14}")
+    print("=" * 66)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            records = make_records(size)
+
+            for fmt in formats:
+                serializer = get_serializer(fmt)
+                if serializer.name != fmt:
+                    print(f"{fmt:<10}{'nicht installiert':>50}")
+                    continue
+
+                path = Path(tmp) / f"images_{fmt}{serializer.suffix}"
+
+                start = time.perf_counter()
+                dump_file(path, records, serializer)
+                save_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                loaded = load_file(path)
+                load_time = time.perf_counter() - start
+
+                assert len(loaded) == size
+
+                size_mb = path.stat().st_size / 1024 / 1024
+                print(f"{fmt:<10}{size:>12}{save_time * 1000:>10.0f}ms{load_time * 1000:>10.0f}ms{size_mb:>11.1f} MB")
+
+            print("-" * 66)
+
+
+def measure(build) -> tuple:
+    """Speicher (Bytes) des Ergebnisses von build() und Dauer"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def run_memory_benchmark(sizes: list) -> None:
+    """Vergleicht den Speicherbedarf von dicts und ImageRecords"""
+    print("=" * 66)
+    print(f"{'Darstellung':<14}{'Datensätze':>12}{'Speicher':>12}{'pro 10k':>12}{'Aufbau':>12}")
+    print("=" * 66)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp) / "images.json"
+            dump_file(path, make_records(size), get_serializer("orjson"))
+
+            # Wie beim Laden: frisch geparste dicts (kein gemeinsamer Zustand mit make_records)
+            plain, plain_bytes, plain_time = measure(lambda: load_file(path))
+            compact, compact_bytes, compact_time = measure(lambda: compact_all(load_file(path)))
+
+            assert all(compact[key].to_dict() == plain[key] for key in plain)
+            del plain, compact
+
+            for name, used, elapsed in (("dict", plain_bytes, plain_time), ("ImageRecord", compact_bytes, compact_time)):
+                per_10k = used / size * 10000 / 1024 / 1024
+                print(f"{name:<14}{size:>12}{used / 1024 / 1024:>10.1f}MB{per_10k:>10.1f}MB{elapsed * 1000:>10.0f}ms")
+
+            print(f"{'Ersparnis':<14}{'':>12}{(1 - compact_bytes / plain_bytes) * 100:>11.0f}%")
+            print("-" * 66)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Datenbank-Formate")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Anzahl Datensätze")
+    parser.add_argument("--formats", nargs="+", default=["json", "orjson", "msgpack"], help="Formate")
+    parser.add_argument("--memory", action="store_true", help="Arbeitsspeicher dict vs. ImageRecord messen")
+    args = parser.parse_args()
+
+    if args.memory:
+        run_memory_benchmark(args.sizes)
+        return
+
+    print(f"📦 Verfügbare Formate: {', '.join(available_formats())}")
+    run_benchmark(args.sizes, args.formats)
+
+
+if __name__ == "__main__":
+    main()
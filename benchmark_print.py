@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark für Druckwarteschlange und Seiten-Rendering (ohne Drucker)
+
+Druckt über das Spool-Backend (PNG/PDF-Dateien in einem Temp-Ordner)
+und misst:
+
+- Rendern einer Seite: neu vs. aus dem Seiten-Cache
+- Warteschlange: Bestätigung (Auftrag gespeichert), Wartezeit bis zum
+  Druckbeginn, Gesamtzeit und Durchsatz - erst neue Bilder, dann
+  Nachdrucke derselben Bilder
+
+Aufruf:
+    python benchmark_print.py
+    python benchmark_print.py --jobs 50 --copies 2 --format pdf
+    python benchmark_print.py --same-printer
+    python benchmark_print.py --per-sheet 4
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.config import Config
+from app.database import Database
+from app.services.print_queue import PrintQueue, FINAL_STATES
+from app.services.printer import PrinterManager
+
+
+def make_photos(directory: Path, count: int, width: int, height: int) -> list:
+    """Erzeugt Testfotos (weiches Rauschen, komprimiert ähnlich wie Fotos)"""
+    rng = np.random.default_rng(42)
+    paths = []
+
+    for i in range(count):
+        noise = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+        photo = Image.fromarray(noise).resize((width, height), Image.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+
+        path = directory / f"DSC_{i:05d}.jpg"
+        photo.save(path, "JPEG", quality=90)
+        paths.append(path)
+
+    return paths
+
+
+def make_config(tmp: Path, file_format: str, same_printer: bool, per_sheet: int) -> Config:
+    """Config im Temp-Ordner mit Spool-Backend"""
+    config = Config(str(tmp / "config.json"))
+    config.load()
+    config.root_dir = tmp
+
+    config.set("printers.backend", "spool")
+    config.set("printers.spool.directory", "spool")
+    config.set("printers.spool.format", file_format)
+    config.set("printers.small.name", "Shop-Small")
+    config.set("printers.big.name", "Shop-Small" if same_printer else "Shop-Big")
+
+    for printer_type in ("small", "big"):
+        config.set(f"printers.{printer_type}.photos_per_sheet", per_sheet)
+        config.set(f"printers.{printer_type}.sheet_timeout", 1.0)
+
+    return config
+
+
+def run_render_benchmark(queue: PrintQueue, photo: Path) -> None:
+    """Eine Seite rendern: neu vs. Cache"""
+    manager = PrinterManager(queue.config, queue.db, queue.pages)
+    printer = manager.printers["small"]
+    page = manager.backend.geometry(printer)
+
+    print("=" * 66)
+    print(f"{'Seite rendern':<30}{'Zeit':>12}{'Seite':>20}")
+    print("=" * 66)
+
+    for label in ("neu", "aus Cache"):
+        start = time.perf_counter()
+        manager.pages.render(photo, printer, page)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<30}{elapsed:>10.0f}ms{f'{page.width}x{page.height} @ {page.dpi_x} dpi':>20}")
+
+
+def run_queue(queue: PrintQueue, db: Database, photos: list, jobs: int, copies: int, submitters: int) -> dict:
+    """Reicht jobs Aufträge parallel ein und wartet, bis alle gedruckt sind"""
+    rng = random.Random(1)
+    orders = [(rng.choice(photos), rng.choice(["small", "big"])) for _ in range(jobs)]
+
+    def submit(order):
+        photo, printer_type = order
+        start = time.perf_counter()
+        result = queue.submit(photo.stem, str(photo), printer_type, copies)
+        return result["job"]["id"], (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(submitters) as pool:
+        submitted = list(pool.map(submit, orders))
+
+    job_ids = [job_id for job_id, _ in submitted]
+    while any(db.get_print_job(job_id)["status"] not in FINAL_STATES for job_id in job_ids):
+        time.sleep(0.02)
+    elapsed = time.perf_counter() - start
+
+    done = [db.get_print_job(job_id) for job_id in job_ids]
+    times = lambda a, b: [(_ts(job[b]) - _ts(job[a])) * 1000 for job in done]
+
+    return {
+        "ack_ms": statistics.median(ms for _, ms in submitted),
+        "wait_ms": statistics.median(times("created_at", "started_at")),
+        "total_ms": statistics.median(times("created_at", "completed_at")),
+        "print_ms": statistics.median(times("started_at", "completed_at")),
+        "failed": sum(job["status"] == "failed" for job in done),
+        "per_minute": jobs / elapsed * 60
+    }
+
+
+def run_queue_benchmark(queue: PrintQueue, db: Database, photos: list, jobs: int, copies: int, submitters: int) -> None:
+    """Neue Bilder, dann dieselben Bilder nochmal (Nachdrucke aus dem Cache)"""
+    print("=" * 66)
+    print(f"{'Aufträge':<12}{'Bestätigung':>12}{'Warten':>10}{'Drucken':>10}{'Gesamt':>10}{'/Minute':>10}")
+    print("=" * 66)
+
+    for label in ("neu", "Nachdruck"):
+        result = run_queue(queue, db, photos, jobs, copies, submitters)
+        failed = f"  ({result['failed']} fehlgeschlagen)" if result["failed"] else ""
+        print(
+            f"{label:<12}{result['ack_ms']:>10.0f}ms{result['wait_ms']:>8.0f}ms{result['print_ms']:>8.0f}ms"
+            f"{result['total_ms']:>8.0f}ms{result['per_minute']:>10.0f}{failed}"
+        )
+
+    print("-" * 66)
+    print("Median pro Auftrag; Bestätigung = Auftrag gespeichert (database.save_delay_ms)")
+    print(f"Seiten-Cache: {queue.pages.get_stats()}")
+
+
+def _ts(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für Druckwarteschlange und Seiten-Rendering")
+    parser.add_argument("--jobs", type=int, default=20, help="Aufträge pro Durchlauf")
+    parser.add_argument("--photos", type=int, default=10, help="Anzahl verschiedener Fotos")
+    parser.add_argument("--copies", type=int, default=1, help="Kopien pro Auftrag")
+    parser.add_argument("--submitters", type=int, default=4, help="Gleichzeitig einreichende Kiosks")
+    parser.add_argument("--format", choices=["png", "pdf"], default="png", help="Spool-Format")
+    parser.add_argument("--size", type=int, nargs=2, default=[4000, 3000], metavar=("W", "H"), help="Fotogröße")
+    parser.add_argument("--same-printer", action="store_true", help="small und big auf demselben Drucker")
+    parser.add_argument("--per-sheet", type=int, choices=[1, 2, 4], default=1, help="Fotos pro Blatt (Sammelzeit 1 s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "photos").mkdir()
+
+        photos = make_photos(tmp / "photos", args.photos, *args.size)
+        print(f"🖼️ {len(photos)} Testfotos {args.size[0]}x{args.size[1]}, Spool: {args.format}, {args.per_sheet} pro Blatt")
+
+        config = make_config(tmp, args.format, args.same_printer, args.per_sheet)
+        db = Database(config)
+        db.load()
+
+        queue = PrintQueue(config, db)
+        queue.start()
+
+        try:
+            run_render_benchmark(queue, photos[0])
+            queue.pages.cache.clear()
+            run_queue_benchmark(queue, db, photos, args.jobs, args.copies, args.submitters)
+        finally:
+            queue.stop()
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Importiert eine (alte) Bilddatenbank Datensatz für Datensatz
+
+Die Quelldatei wird gestreamt statt komplett geladen und blockweise in
+die konfigurierte Ablage (database.storage / database.format)
+übernommen. Mit --verify wird nur geprüft, nichts geschrieben.
+
+Aufruf:
+    python import_images.py alt/images.json
+    python import_images.py alt/images.json --batch 2000
+    python import_images.py --verify                # aktuelle Datenbank prüfen
+    python import_images.py --verify alt/images.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from app.config import Config
+from app.database import Database
+from app.image_index import day_of
+from app.importer import RecordReader
+from app.partitions import PartitionStore
+from app.serializers import find_data_file
+
+
+def current_files(db: Database) -> list:
+    """Dateien der aktuellen Bilddatenbank (eine Datei oder alle Tagesdateien)"""
+    store = PartitionStore(db.partitions_dir, db.serializer)
+
+    if db.partitions is not None and store.exists():
+        store.load_manifest()
+        return [store.directory / info["file"] for info in store.days.values()]
+
+    path = find_data_file(db.db_path.parent, "images", db.serializer)
+    return [path] if path is not None else []
+
+
+def progress(reader: RecordReader, count: int, start: float) -> None:
+    """Fortschritt in einer Zeile"""
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    percent = reader.bytes_read * 100 / reader.size if reader.size else 100
+    rate = count / elapsed
+
+    print(f"\r   {reader.path.name}: {count} Datensätze, {percent:5.1f}% ({rate:.0f}/s)", end="", flush=True)
+
+
+def verify(paths: list) -> bool:
+    """
+    Prüfdurchlauf: liest alle Datensätze und meldet Auffälligkeiten
+
+    Returns:
+        True, wenn keine Fehler gefunden wurden
+    """
+    seen = set()
+    days = set()
+    count = undated = faces = 0
+    problems = []
+    start = time.perf_counter()
+
+    for path in paths:
+        reader = RecordReader(path)
+
+        try:
+            for key, image in reader:
+                count += 1
+
+                if not isinstance(image, dict):
+                    problems.append(f"{key}: kein Datensatz ({type(image).__name__})")
+                    continue
+                if image.get("id", key) != key:
+                    problems.append(f"{key}: ID im Datensatz ist {image.get('id')}")
+                if key in seen:
+                    problems.append(f"{key}: doppelt")
+                seen.add(key)
+
+                day = day_of(image.get("timestamp", ""))
+                if day:
+                    days.add(day)
+                else:
+                    undated += 1
+
+                faces += image.get("face_count", 0) or 0
+
+                if count % 1000 == 0:
+                    progress(reader, count, start)
+        except ValueError as e:
+            problems.append(str(e))
+
+        progress(reader, count, start)
+        print()
+
+    print(f"📊 {count} Datensätze, {len(days)} Tage, {faces} Gesichter, {undated} ohne lesbaren Timestamp")
+    print(f"⏱️ {time.perf_counter() - start:.1f}s")
+
+    for problem in problems[:20]:
+        print(f"⚠️ {problem}")
+    if len(problems) > 20:
+        print(f"⚠️ ... und {len(problems) - 20} weitere")
+
+    if not problems:
+        print("✅ Keine Fehler gefunden")
+
+    return not problems
+
+
+def import_file(db: Database, path: Path, batch_size: int) -> int:
+    """Importiert eine Datei blockweise in die Datenbank"""
+    reader = RecordReader(path)
+    partitioned = db.partitions is not None
+    batch = {}
+    count = 0
+    start = time.perf_counter()
+
+    print(f"📥 Importiere {path.name} ({reader.format}, {reader.size / 1024 / 1024:.1f} MB)")
+
+    for key, image in reader:
+        batch[key] = image
+
+        if len(batch) >= batch_size:
+            # Partitionen: Block schreiben, damit ältere Tage wieder entladen werden können
+            count += db.import_images(batch, wait=partitioned)
+            batch = {}
+            progress(reader, count, start)
+
+    if batch:
+        count += db.import_images(batch, wait=partitioned)
+
+    progress(reader, count, start)
+    print()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bilddatenbank streamend importieren / prüfen")
+    parser.add_argument("source", nargs="?", help="Quelldatei (images.json / images.msgpack)")
+    parser.add_argument("--verify", action="store_true", help="Nur prüfen, nichts schreiben")
+    parser.add_argument("--batch", type=int, default=1000, help="Datensätze pro Block")
+    args = parser.parse_args()
+
+    config = Config()
+    config.load()
+
+    db = Database(config)
+
+    if args.verify:
+        paths = [Path(args.source)] if args.source else current_files(db)
+        if not paths:
+            print("❌ Keine Bilddatenbank gefunden")
+            sys.exit(1)
+        sys.exit(0 if verify(paths) else 1)
+
+    if not args.source:
+        parser.error("Quelldatei fehlt (oder --verify angeben)")
+
+    source = Path(args.source)
+    if not source.exists():
+        print(f"❌ {source} nicht gefunden")
+        sys.exit(1)
+
+    db.load()
+    before = db.count_images()
+
+    try:
+        count = import_file(db, source, args.batch)
+    except ValueError as e:
+        print(f"\n❌ Import abgebrochen: {e}")
+        db.close()
+        sys.exit(1)
+
+    db.save()
+    db.close()
+
+    print(f"✅ {count} Datensätze importiert ({before} → {db.count_images()} Bilder)")
+
+
+if __name__ == "__main__":
+    main()
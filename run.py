@@ -232,12 +232,18 @@ def start_server(host='0.0.0.0', port=8000, reload=False, workers=1):
         'port': port,
         'reload': reload,
         'log_level': 'info',
-        'access_log': True
+        'access_log': True,
+        # Offene Push-Verbindungen (SSE) nicht endlos abwarten
+        'timeout_graceful_shutdown': 5
     }
 
     # Workers nur ohne Reload
     if not reload and workers > 1:
         config_kwargs['workers'] = workers
+        # Datenbank der Worker über gemeinsames Journal abgleichen
+        # (database.multi_process: "auto")
+        os.environ['PHOTO_WORKERS'] = str(workers)
+        print("[INFO] {} Worker-Prozesse - Datenbank im Multi-Prozess-Modus".format(workers))
 
     print("\n[SERVER] Server läuft auf: http://{}:{}".format(host, port))
     print("[ADMIN] Admin-Panel:     http://{}:{}/admin/".format(host, port))